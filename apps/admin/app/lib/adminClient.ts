@@ -4,6 +4,9 @@ const API_BASE_URL =
 const ADMIN_TOKEN =
   process.env.NEXT_PUBLIC_ADMIN_TOKEN ?? "admin-secret";
 
+// Echoed so that reads right after a write see it (API read replica).
+let lastWrite: string | null = null;
+
 export type AdminCheckItem = {
   id: string;
   stage_id: string;
@@ -32,9 +35,11 @@ async function adminRequest<T>(
     headers: {
       "Content-Type": "application/json",
       "X-Admin-Token": ADMIN_TOKEN,
+      ...(lastWrite ? { "X-Last-Write": lastWrite } : {}),
       ...(options.headers || {})
     }
   });
+  lastWrite = res.headers.get("X-Last-Write") ?? lastWrite;
   if (!res.ok) {
     const text = await res.text();
     throw new Error(`Admin request failed: ${res.status} ${text}`);
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+# revision identifiers, used by Alembic.
+revision = "0002_notes_search"
+down_revision = "0001_initial_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Hebrew has no Postgres dictionary, so the 'simple' config (lowercase +
+    # split, no stemming) is used for both the column and the queries.
+    op.add_column(
+        "project_notes",
+        sa.Column(
+            "search_vector",
+            pg.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', body)", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_project_notes_search_vector",
+        "project_notes",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_project_notes_project_id",
+        "project_notes",
+        ["project_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_project_notes_project_id", table_name="project_notes")
+    op.drop_index("ix_project_notes_search_vector", table_name="project_notes")
+    op.drop_column("project_notes", "search_vector")
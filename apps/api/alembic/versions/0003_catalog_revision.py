@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003_catalog_revision"
+down_revision = "0002_notes_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Single-row counter bumped by statement-level triggers on every write to
+    # the catalog tables, so in-memory catalog caches can revalidate with one
+    # primary-key lookup whoever changed the data (admin API, seed, psql).
+    op.create_table(
+        "catalog_revision",
+        sa.Column("id", sa.SmallInteger(), primary_key=True, nullable=False),
+        sa.Column("revision", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO catalog_revision (id, revision, updated_at) VALUES (1, 1, now())"
+    )
+    op.execute(
+        """
+        CREATE FUNCTION bump_catalog_revision() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE catalog_revision
+            SET revision = revision + 1, updated_at = now()
+            WHERE id = 1;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table in ("stages", "stage_check_items"):
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table}_catalog_revision
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_revision()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in ("stages", "stage_check_items"):
+        op.execute(f"DROP TRIGGER trg_{table}_catalog_revision ON {table}")
+    op.execute("DROP FUNCTION bump_catalog_revision()")
+    op.drop_table("catalog_revision")
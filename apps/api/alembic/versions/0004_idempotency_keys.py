@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004_idempotency_keys"
+down_revision = "0003_catalog_revision"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Responses of POSTs made with an Idempotency-Key, replayed to retries
+    # until expires_at; see app/infrastructure/idempotency.py.
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("user_id", sa.Text(), primary_key=True, nullable=False),
+        sa.Column("key", sa.Text(), primary_key=True, nullable=False),
+        sa.Column("fingerprint", sa.Text(), nullable=False),
+        sa.Column("status_code", sa.SmallInteger(), nullable=True),
+        sa.Column("headers", sa.JSON(), nullable=True),
+        sa.Column("body", sa.LargeBinary(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_keys_expires_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
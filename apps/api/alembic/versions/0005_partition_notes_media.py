@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005_partition_notes_media"
+down_revision = "0004_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+# Every read of these tables filters on one project_id, so hash partitions
+# on it let each query (and each autovacuum run) touch one sixteenth of the
+# rows and index. The count is fixed: changing it means repartitioning.
+PARTITIONS = 16
+
+_NOTES_COLUMNS = """
+    id uuid NOT NULL,
+    project_id uuid NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    stage_id uuid REFERENCES stages (id) ON DELETE SET NULL,
+    body text NOT NULL,
+    created_at timestamptz NOT NULL,
+    search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED
+"""
+_NOTES_COPY = "id, project_id, stage_id, body, created_at"
+
+_MEDIA_COLUMNS = """
+    id uuid NOT NULL,
+    project_id uuid NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    stage_id uuid REFERENCES stages (id) ON DELETE SET NULL,
+    storage_path text NOT NULL,
+    caption text,
+    taken_at timestamptz,
+    created_at timestamptz NOT NULL
+"""
+_MEDIA_COPY = "id, project_id, stage_id, storage_path, caption, taken_at, created_at"
+
+_NOTES_INDEXES = (
+    "CREATE INDEX ix_project_notes_project_id ON project_notes (project_id)",
+    "CREATE INDEX ix_project_notes_search_vector ON project_notes "
+    "USING gin (search_vector)",
+)
+_MEDIA_INDEXES = (
+    "CREATE INDEX ix_project_media_project_id ON project_media (project_id)",
+)
+
+
+def _rebuild(
+    table: str,
+    columns: str,
+    copy_columns: str,
+    indexes: tuple[str, ...],
+    *,
+    partitioned: bool,
+) -> None:
+    """Recreate `table` with the same columns and move its rows over.
+
+    The copy runs in the migration's transaction and holds an exclusive
+    lock on the table throughout: on a large database, run it in a
+    maintenance window (about a minute per ten million rows).
+    """
+    old = f"{table}_old"
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey")
+    for statement in indexes:
+        name = statement.split()[2]
+        op.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_old")
+
+    if partitioned:
+        # A partitioned table's primary key must contain the partition key.
+        op.execute(
+            f"CREATE TABLE {table} ({columns}, PRIMARY KEY (id, project_id))"
+            " PARTITION BY HASH (project_id)"
+        )
+        for remainder in range(PARTITIONS):
+            op.execute(
+                f"CREATE TABLE {table}_p{remainder:02d} PARTITION OF {table}"
+                f" FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+            )
+    else:
+        op.execute(f"CREATE TABLE {table} ({columns}, PRIMARY KEY (id))")
+
+    op.execute(
+        f"INSERT INTO {table} ({copy_columns}) SELECT {copy_columns} FROM {old}"
+    )
+    op.execute(f"DROP TABLE {old}")
+    # Built after the load, which is much faster than maintaining them.
+    op.execute("SET LOCAL maintenance_work_mem = '512MB'")
+    for statement in indexes:
+        op.execute(statement)
+    op.execute(f"ANALYZE {table}")
+
+
+def upgrade() -> None:
+    _rebuild(
+        "project_notes", _NOTES_COLUMNS, _NOTES_COPY, _NOTES_INDEXES, partitioned=True
+    )
+    _rebuild(
+        "project_media", _MEDIA_COLUMNS, _MEDIA_COPY, _MEDIA_INDEXES, partitioned=True
+    )
+
+
+def downgrade() -> None:
+    _rebuild("project_media", _MEDIA_COLUMNS, _MEDIA_COPY, (), partitioned=False)
+    _rebuild(
+        "project_notes", _NOTES_COLUMNS, _NOTES_COPY, _NOTES_INDEXES, partitioned=False
+    )
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0006_project_archives"
+down_revision = "0005_partition_notes_media"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One zlib-compressed snapshot per inactive project, replacing its rows
+    # in the per-project tables; see app/infrastructure/archive.py.
+    op.create_table(
+        "project_archives",
+        sa.Column(
+            "project_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("projects.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column("format", sa.SmallInteger(), nullable=False),
+        sa.Column("snapshot", sa.LargeBinary(), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.TIMESTAMP(timezone=True), nullable=False),
+    )
+    # Already compressed: TOAST would only spend CPU trying again.
+    op.execute(
+        "ALTER TABLE project_archives ALTER COLUMN snapshot SET STORAGE EXTERNAL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("project_archives")
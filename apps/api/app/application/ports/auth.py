@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping, Protocol
+
+
+class InvalidToken(Exception):
+    """The bearer token is malformed, expired or not signed by a known key."""
+
+
+@dataclass(frozen=True)
+class VerifiedToken:
+    user_id: str
+    expires_at: float
+    claims: Mapping[str, Any]
+
+
+class TokenVerifier(Protocol):
+    def verify(self, token: str) -> VerifiedToken: ...
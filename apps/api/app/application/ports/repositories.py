@@ -29,14 +29,18 @@ class StageRepo(Protocol):
         self, stage_ids: Iterable[str]
     ) -> Sequence[CheckItem]: ...
 
-    # Admin operations
-    def create_stage(self, stage: Stage) -> Stage: ...
+    def list_check_items_for_stage_or_ids(
+        self, stage_ids: Iterable[str], check_ids: Iterable[str]
+    ) -> Sequence[CheckItem]:
+        """Items under any of `stage_ids` plus those with any of `check_ids`."""
+        ...
 
-    def update_stage(self, stage: Stage) -> Stage: ...
+    def get_catalog_revision(self) -> int: ...
 
-    def create_check_item(self, item: CheckItem) -> CheckItem: ...
+    def get_stage(self, stage_id: str) -> Stage | None: ...
 
-    def update_check_item(self, item: CheckItem) -> CheckItem: ...
+    # Admin operations
+    def apply_catalog_diff(self, diff: CatalogDiff) -> None: ...
 
 
 class StageStatusRepo(Protocol):
@@ -56,6 +60,16 @@ class NotesRepo(Protocol):
 
     def list_for_project(self, project_id: str) -> Sequence[Note]: ...
 
+    def search(
+        self,
+        project_id: str,
+        query: str,
+        *,
+        stage_ids: Sequence[str],
+        limit: int,
+        offset: int,
+    ) -> NoteSearchPage: ...
+
 
 class MediaRepo(Protocol):
     def add(self, media: Media) -> Media: ...
@@ -63,6 +77,30 @@ class MediaRepo(Protocol):
     def list_for_project(self, project_id: str) -> Sequence[Media]: ...
 
 
+@dataclass(frozen=True)
+class CatalogDiff:
+    stages_to_insert: Sequence[Stage]
+    stages_to_update: Sequence[Stage]
+    # Updated stages whose slug changes; renamed in two steps so that slugs can
+    # be swapped between stages without tripping the unique constraint.
+    renamed_stage_ids: Sequence[str]
+    stage_ids_to_delete: Sequence[str]
+    checks_to_insert: Sequence[CheckItem]
+    checks_to_update: Sequence[CheckItem]
+    check_ids_to_delete: Sequence[str]
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.stages_to_insert
+            or self.stages_to_update
+            or self.stage_ids_to_delete
+            or self.checks_to_insert
+            or self.checks_to_update
+            or self.check_ids_to_delete
+        )
+
+
 @dataclass(frozen=True)
 class ProjectStageView:
     project: Project
@@ -73,3 +111,15 @@ class ProjectStageView:
     notes: Sequence[Note]
     media: Sequence[Media]
 
+
+@dataclass(frozen=True)
+class NoteSearchHit:
+    note: Note
+    rank: float
+    snippet: str
+
+
+@dataclass(frozen=True)
+class NoteSearchPage:
+    hits: Sequence[NoteSearchHit]
+    total: int
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Protocol, Sequence
+
+from app.domain.entities import CheckItem, Stage
+
+
+@dataclass(frozen=True)
+class CatalogSearchHit:
+    stage: Stage
+    checks: Sequence[CheckItem]
+    score: float
+
+
+class CatalogSearchIndex(Protocol):
+    def search(self, query: str, *, limit: int) -> Sequence[CatalogSearchHit]: ...
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import uuid
+
+from app.application.ports.repositories import CatalogDiff, CheckItem, Stage, StageRepo
+from app.application.use_cases.admin_stages import AdminStageWithChecks, ListAdminStages
+
+
+@dataclass
+class CatalogCheckItemInput:
+    id: str | None
+    title: str
+    description: str | None
+    order_index: int
+
+
+@dataclass
+class CatalogStageInput:
+    id: str | None
+    slug: str
+    title: str
+    short_explanation: str
+    common_mistakes: str
+    must_document: str
+    order_index: int
+    checks: list[CatalogCheckItemInput]
+
+
+def compute_catalog_diff(
+    current: list[AdminStageWithChecks], desired: list[CatalogStageInput]
+) -> CatalogDiff:
+    """Diff a full catalog document against the stored catalog.
+
+    Stages are matched by id, falling back to slug; check items by id,
+    falling back to their order within the matched stage, so documents
+    without ids keep existing ids (and the project results hanging off them).
+    Anything in the store but not in the document is deleted.
+    """
+    _ensure_unique([s.slug for s in desired], "stage slug")
+    _ensure_unique([s.id for s in desired if s.id], "stage id")
+    _ensure_unique(
+        [c.id for s in desired for c in s.checks if c.id], "check item id"
+    )
+
+    current_by_id = {sc.stage.id: sc for sc in current}
+    current_by_slug = {sc.stage.slug: sc for sc in current}
+    current_checks = {c.id: c for sc in current for c in sc.checks}
+    claimed_by_id = {s.id for s in desired if s.id and s.id in current_by_id}
+    claimed_check_ids = {
+        c.id for s in desired for c in s.checks if c.id and c.id in current_checks
+    }
+
+    stages_to_insert: list[Stage] = []
+    stages_to_update: list[Stage] = []
+    renamed_stage_ids: list[str] = []
+    checks_to_insert: list[CheckItem] = []
+    checks_to_update: list[CheckItem] = []
+    kept_stage_ids: set[str] = set()
+    kept_check_ids: set[str] = set()
+
+    for d in desired:
+        existing: AdminStageWithChecks | None = None
+        if d.id:
+            existing = current_by_id.get(d.id)
+        else:
+            by_slug = current_by_slug.get(d.slug)
+            if by_slug is not None and by_slug.stage.id not in claimed_by_id:
+                existing = by_slug
+        stage = Stage(
+            id=existing.stage.id if existing else (d.id or str(uuid.uuid4())),
+            slug=d.slug,
+            title=d.title,
+            short_explanation=d.short_explanation,
+            common_mistakes=d.common_mistakes,
+            must_document=d.must_document,
+            order_index=d.order_index,
+        )
+        kept_stage_ids.add(stage.id)
+        if existing is None:
+            stages_to_insert.append(stage)
+        elif stage != existing.stage:
+            stages_to_update.append(stage)
+            if stage.slug != existing.stage.slug:
+                renamed_stage_ids.append(stage.id)
+
+        by_order = {
+            c.order_index: c
+            for c in (existing.checks if existing else [])
+            if c.id not in claimed_check_ids
+        }
+        for dc in d.checks:
+            prior = current_checks.get(dc.id) if dc.id else by_order.pop(
+                dc.order_index, None
+            )
+            item = CheckItem(
+                id=prior.id if prior else (dc.id or str(uuid.uuid4())),
+                stage_id=stage.id,
+                title=dc.title,
+                description=dc.description,
+                order_index=dc.order_index,
+            )
+            kept_check_ids.add(item.id)
+            if prior is None:
+                checks_to_insert.append(item)
+            elif item != prior:
+                checks_to_update.append(item)
+
+    stage_ids_to_delete = [
+        sc.stage.id for sc in current if sc.stage.id not in kept_stage_ids
+    ]
+    # Checks of deleted stages go with them (ON DELETE CASCADE).
+    check_ids_to_delete = [
+        c.id
+        for sc in current
+        if sc.stage.id in kept_stage_ids
+        for c in sc.checks
+        if c.id not in kept_check_ids
+    ]
+    return CatalogDiff(
+        stages_to_insert=stages_to_insert,
+        stages_to_update=stages_to_update,
+        renamed_stage_ids=renamed_stage_ids,
+        stage_ids_to_delete=stage_ids_to_delete,
+        checks_to_insert=checks_to_insert,
+        checks_to_update=checks_to_update,
+        check_ids_to_delete=check_ids_to_delete,
+    )
+
+
+def _ensure_unique(values: list[str], what: str) -> None:
+    seen: set[str] = set()
+    for value in values:
+        if value in seen:
+            raise ValueError(f"Duplicate {what} in catalog: {value}")
+        seen.add(value)
+
+
+@dataclass
+class ImportCatalogInput:
+    stages: list[CatalogStageInput]
+    dry_run: bool
+
+
+@dataclass
+class ImportCatalogOutput:
+    diff: CatalogDiff
+    applied: bool
+    # Ids minted for inserted rows the document gave none. A dry run would
+    # mint others when applied, so they are not worth reporting.
+    minted_ids: frozenset[str]
+
+
+class ImportCatalog:
+    def __init__(self, stage_repo: StageRepo) -> None:
+        self._stages = stage_repo
+
+    def execute(self, data: ImportCatalogInput) -> ImportCatalogOutput:
+        current = ListAdminStages(stage_repo=self._stages).execute().stages
+        diff = compute_catalog_diff(current, data.stages)
+        applied = not data.dry_run and not diff.is_empty
+        if applied:
+            self._stages.apply_catalog_diff(diff)
+        supplied = {s.id for s in data.stages} | {
+            c.id for s in data.stages for c in s.checks
+        }
+        minted = {s.id for s in diff.stages_to_insert if s.id not in supplied} | {
+            c.id for c in diff.checks_to_insert if c.id not in supplied
+        }
+        return ImportCatalogOutput(
+            diff=diff, applied=applied, minted_ids=frozenset(minted)
+        )
@@ -3,7 +3,12 @@ from __future__ import annotations
 from dataclasses import dataclass
 import uuid
 
-from app.application.ports.repositories import CheckItem, Stage, StageRepo
+from app.application.ports.repositories import (
+    CatalogDiff,
+    CheckItem,
+    Stage,
+    StageRepo,
+)
 
 
 @dataclass
@@ -36,7 +41,15 @@ class ListAdminStages:
 
 
 @dataclass
-class UpsertStageInput:
+class SaveAdminStageCheckInput:
+  id: str | None
+  title: str
+  description: str | None
+  order_index: int
+
+
+@dataclass
+class SaveAdminStageInput:
   id: str | None
   slug: str
   title: str
@@ -44,13 +57,23 @@ class UpsertStageInput:
   common_mistakes: str
   must_document: str
   order_index: int
+  checks: list[SaveAdminStageCheckInput]
 
 
-class UpsertStage:
+class SaveAdminStage:
+  """Upsert one stage with its check items in a constant number of queries.
+
+  The stage's check items and those with a supplied id are loaded in one
+  query (a supplied id from another stage moves that item). Changes are
+  written through `apply_catalog_diff` (bulk statements), and the result is
+  built from data already in hand instead of re-listing the catalog. Check
+  items missing from the input are left untouched.
+  """
+
   def __init__(self, stage_repo: StageRepo) -> None:
       self._stages = stage_repo
 
-  def execute(self, data: UpsertStageInput) -> Stage:
+  def execute(self, data: SaveAdminStageInput) -> AdminStageWithChecks:
       stage = Stage(
           id=data.id or str(uuid.uuid4()),
           slug=data.slug,
@@ -60,33 +83,53 @@ class UpsertStage:
           must_document=data.must_document,
           order_index=data.order_index,
       )
-      if data.id:
-          return self._stages.update_stage(stage)
-      return self._stages.create_stage(stage)
-
-
-@dataclass
-class UpsertCheckItemInput:
-  id: str | None
-  stage_id: str
-  title: str
-  description: str | None
-  order_index: int
-
-
-class UpsertCheckItem:
-  def __init__(self, stage_repo: StageRepo) -> None:
-      self._stages = stage_repo
-
-  def execute(self, data: UpsertCheckItemInput) -> CheckItem:
-      item = CheckItem(
-          id=data.id or str(uuid.uuid4()),
-          stage_id=data.stage_id,
-          title=data.title,
-          description=data.description,
-          order_index=data.order_index,
+      existing_stage = self._stages.get_stage(data.id) if data.id else None
+      # The stage's own checks, and any supplied id wherever it lives now: an
+      # id from another stage moves that check here.
+      known_checks = {
+          c.id: c
+          for c in self._stages.list_check_items_for_stage_or_ids(
+              [stage.id] if existing_stage is not None else [],
+              [c.id for c in data.checks if c.id],
+          )
+      }
+
+      checks_to_insert: list[CheckItem] = []
+      checks_to_update: list[CheckItem] = []
+      saved_checks = {
+          c.id: c for c in known_checks.values() if c.stage_id == stage.id
+      }
+      for c in data.checks:
+          item = CheckItem(
+              id=c.id or str(uuid.uuid4()),
+              stage_id=stage.id,
+              title=c.title,
+              description=c.description,
+              order_index=c.order_index,
+          )
+          prior = known_checks.get(item.id)
+          if prior is None:
+              checks_to_insert.append(item)
+          elif item != prior:
+              checks_to_update.append(item)
+          saved_checks[item.id] = item
+
+      self._stages.apply_catalog_diff(
+          CatalogDiff(
+              stages_to_insert=[stage] if existing_stage is None else [],
+              stages_to_update=(
+                  [stage]
+                  if existing_stage is not None and stage != existing_stage
+                  else []
+              ),
+              renamed_stage_ids=[],
+              stage_ids_to_delete=[],
+              checks_to_insert=checks_to_insert,
+              checks_to_update=checks_to_update,
+              check_ids_to_delete=[],
+          )
+      )
+      return AdminStageWithChecks(
+          stage=stage,
+          checks=sorted(saved_checks.values(), key=lambda c: c.order_index),
       )
-      if data.id:
-          return self._stages.update_check_item(item)
-      return self._stages.create_check_item(item)
-
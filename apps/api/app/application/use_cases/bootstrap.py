@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Sequence
+
+from app.application.ports.repositories import (
+    CheckResultRepo,
+    ProjectRepo,
+    StageStatusRepo,
+)
+from app.domain.entities import CheckItem, Project, Stage, StageStatusValue
+
+
+@dataclass(frozen=True)
+class StageProgress:
+    stage_id: str
+    status: StageStatusValue
+    checks_done: int
+    checks_total: int
+    updated_at: datetime | None
+
+
+@dataclass
+class GetBootstrapInput:
+    owner_user_id: str
+    # Catalog as cached by the caller, so that it costs no queries here.
+    stages: Sequence[Stage]
+    checks: Sequence[CheckItem]
+    project_id: str | None = None
+    include_projects: bool = True
+
+
+@dataclass
+class GetBootstrapOutput:
+    projects: list[Project] | None
+    progress: list[StageProgress] | None
+
+
+class GetBootstrap:
+    """Everything the app shows on launch, in a fixed number of queries.
+
+    Projects come from one query whatever their number, and the selected
+    project's progress over the whole catalog from two more.
+    """
+
+    def __init__(
+        self,
+        project_repo: ProjectRepo,
+        stage_status_repo: StageStatusRepo,
+        check_result_repo: CheckResultRepo,
+    ) -> None:
+        self._projects = project_repo
+        self._stage_statuses = stage_status_repo
+        self._check_results = check_result_repo
+
+    def execute(self, data: GetBootstrapInput) -> GetBootstrapOutput:
+        if not data.include_projects and data.project_id is None:
+            return GetBootstrapOutput(projects=None, progress=None)
+
+        projects = list(self._projects.list_for_owner(data.owner_user_id))
+        progress = None
+        if data.project_id is not None:
+            # The owner's list doubles as the access check.
+            if not any(p.id == data.project_id for p in projects):
+                raise PermissionError("Project not found for owner")
+            progress = self._progress(data.project_id, data.stages, data.checks)
+
+        return GetBootstrapOutput(
+            projects=projects if data.include_projects else None,
+            progress=progress,
+        )
+
+    def _progress(
+        self,
+        project_id: str,
+        stages: Sequence[Stage],
+        checks: Sequence[CheckItem],
+    ) -> list[StageProgress]:
+        statuses = {
+            s.stage_id: s for s in self._stage_statuses.get_for_project(project_id)
+        }
+        done_ids = {
+            r.check_item_id
+            for r in self._check_results.get_for_project(project_id)
+            if r.is_done
+        }
+        totals: dict[str, int] = {}
+        done: dict[str, int] = {}
+        for c in checks:
+            totals[c.stage_id] = totals.get(c.stage_id, 0) + 1
+            if c.id in done_ids:
+                done[c.stage_id] = done.get(c.stage_id, 0) + 1
+
+        progress = []
+        for stage in stages:
+            status = statuses.get(stage.id)
+            progress.append(
+                StageProgress(
+                    stage_id=stage.id,
+                    status=(
+                        status.status if status else StageStatusValue.NOT_STARTED
+                    ),
+                    checks_done=done.get(stage.id, 0),
+                    checks_total=totals.get(stage.id, 0),
+                    updated_at=status.updated_at if status else None,
+                )
+            )
+        return progress
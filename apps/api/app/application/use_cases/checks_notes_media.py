@@ -8,6 +8,7 @@ from app.application.ports.media import MediaStorage
 from app.application.ports.repositories import (
     CheckResultRepo,
     MediaRepo,
+    NoteSearchPage,
     NotesRepo,
     ProjectRepo,
     StageRepo,
@@ -161,3 +162,35 @@ class ListNotesForProject:
             raise PermissionError("Project not found for owner")
         return list(self._notes.list_for_project(data.project_id))
 
+
+@dataclass
+class SearchNotesForProjectInput:
+    owner_user_id: str
+    project_id: str
+    query: str
+    stage_ids: list[str]
+    limit: int
+    offset: int
+
+
+class SearchNotesForProject:
+    def __init__(self, project_repo: ProjectRepo, notes_repo: NotesRepo) -> None:
+        self._projects = project_repo
+        self._notes = notes_repo
+
+    def execute(self, data: SearchNotesForProjectInput) -> NoteSearchPage:
+        project = self._projects.get_by_id_for_owner(
+            data.project_id, owner_user_id=data.owner_user_id
+        )
+        if project is None:
+            raise PermissionError("Project not found for owner")
+        query = data.query.strip()
+        if not query:
+            return NoteSearchPage(hits=[], total=0)
+        return self._notes.search(
+            data.project_id,
+            query,
+            stage_ids=data.stage_ids,
+            limit=data.limit,
+            offset=data.offset,
+        )
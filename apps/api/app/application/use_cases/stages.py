@@ -11,6 +11,7 @@ from app.application.ports.repositories import (
     StageStatusRepo,
     MediaRepo,
 )
+from app.application.ports.search import CatalogSearchHit, CatalogSearchIndex
 from app.domain.entities import Stage
 
 
@@ -29,6 +30,27 @@ class ListStages:
         return ListStagesOutput(stages=stages)
 
 
+@dataclass
+class SearchCatalogInput:
+    query: str
+    limit: int
+
+
+@dataclass
+class SearchCatalogOutput:
+    hits: list[CatalogSearchHit]
+
+
+class SearchCatalog:
+    def __init__(self, index: CatalogSearchIndex) -> None:
+        self._index = index
+
+    def execute(self, data: SearchCatalogInput) -> SearchCatalogOutput:
+        return SearchCatalogOutput(
+            hits=list(self._index.search(data.query, limit=data.limit))
+        )
+
+
 @dataclass
 class GetProjectStageViewInput:
     owner_user_id: str
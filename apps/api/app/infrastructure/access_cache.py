@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Sequence
+
+from app.application.ports.repositories import ProjectRepo
+from app.domain.entities import Project
+from app.infrastructure.metrics import CACHE_LOOKUPS
+
+
+class ProjectAccessCache:
+    """Process-wide cache of granted (project, owner) access checks.
+
+    Only grants are kept: a denial is never cached, so a freshly created
+    project is reachable at once. Entries live `ttl_seconds` at most, which
+    also bounds how long another worker's ownership change takes to show;
+    in-process changes call `invalidate_project`. `ttl_seconds=0` disables
+    the cache.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        # A project has one owner, so entries are keyed by project id alone.
+        self._entries: OrderedDict[str, tuple[Project, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, project_id: str, owner_user_id: str) -> Project | None:
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry is not None:
+                project, expires_at = entry
+                if expires_at <= self._clock():
+                    del self._entries[project_id]
+                elif project.owner_user_id == owner_user_id:
+                    self._entries.move_to_end(project_id)
+                    CACHE_LOOKUPS.labels("project_access", "hit").inc()
+                    return project
+        CACHE_LOOKUPS.labels("project_access", "miss").inc()
+        return None
+
+    def put(self, project: Project) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[project.id] = (project, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(project.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_project(self, project_id: str) -> None:
+        with self._lock:
+            self._entries.pop(project_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class CachedProjectRepo(ProjectRepo):
+    """ProjectRepo whose access checks go through a ProjectAccessCache.
+
+    Build one per request: it also memoizes every decision it made, so
+    several use cases run in one request check each project only once,
+    whatever the shared cache holds.
+    """
+
+    def __init__(self, inner: ProjectRepo, access: ProjectAccessCache) -> None:
+        self._inner = inner
+        self._access = access
+        self._memo: dict[tuple[str, str], Project | None] = {}
+
+    def list_for_owner(self, owner_user_id: str) -> Sequence[Project]:
+        return self._inner.list_for_owner(owner_user_id)
+
+    def create(self, project: Project) -> Project:
+        created = self._inner.create(project)
+        self._memo[(created.id, created.owner_user_id)] = created
+        return created
+
+    def get_by_id_for_owner(
+        self, project_id: str, owner_user_id: str
+    ) -> Project | None:
+        key = (project_id, owner_user_id)
+        if key in self._memo:
+            return self._memo[key]
+        project = self._access.get(project_id, owner_user_id)
+        if project is None:
+            project = self._inner.get_by_id_for_owner(
+                project_id, owner_user_id=owner_user_id
+            )
+            if project is not None:
+                self._access.put(project)
+        self._memo[key] = project
+        return project
@@ -0,0 +1,577 @@
+"""Archival of inactive projects into one compressed snapshot each.
+
+A project whose stage statuses, check results, notes and media have not
+changed since `idle_since` can be archived: those rows are encoded into a
+single zlib-compressed JSON document in project_archives and deleted from
+their tables, in one transaction. Most projects go quiet once built, and a
+row per project is far cheaper to keep than thousands spread over four
+tables and their indexes.
+
+The ArchiveAware* repos wrap the SQL ones so that reads of an archived
+project are served from its snapshot, and the first write to it moves the
+rows back first. Reads only look for a snapshot when the hot tables have
+nothing for the project, and the answer is kept for the request; a read
+that found rows settles it too, as an archived project has none. So an
+active project pays at most one primary-key lookup per request, and only
+when its first read comes back empty (no media yet, a search without hits).
+
+archive() locks the project row FOR UPDATE and writes lock it FOR KEY SHARE
+(in ensure_hot) before looking for a snapshot, so a write either commits
+first, and the archive sees it and skips the project, or waits for the
+archive and restores.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Sequence
+
+import orjson
+from sqlalchemy import ColumnElement, delete, exists, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.application.ports.repositories import (
+    CheckResultRepo,
+    MediaRepo,
+    NoteSearchHit,
+    NoteSearchPage,
+    NotesRepo,
+    StageStatusRepo,
+)
+from app.domain.entities import (
+    CheckResult,
+    Media,
+    Note,
+    StageStatus,
+    StageStatusValue,
+)
+from app.infrastructure.db.models import (
+    ProjectArchiveModel,
+    ProjectCheckResultModel,
+    ProjectMediaModel,
+    ProjectModel,
+    ProjectNoteModel,
+    ProjectStageStatusModel,
+    StageCheckItemModel,
+    StageModel,
+)
+from app.infrastructure.metrics import PROJECT_ARCHIVE_OPERATIONS
+from app.infrastructure.repositories import (
+    SqlAlchemyCheckResultRepo,
+    SqlAlchemyMediaRepo,
+    SqlAlchemyNotesRepo,
+    SqlAlchemyStageStatusRepo,
+)
+
+# Version of the snapshot encoding, stored with each archive.
+FORMAT = 1
+_ZLIB_LEVEL = 9
+
+_PER_PROJECT = (
+    ProjectStageStatusModel,
+    ProjectCheckResultModel,
+    ProjectNoteModel,
+    ProjectMediaModel,
+)
+
+
+@dataclass(frozen=True)
+class ProjectSnapshot:
+    project_id: str
+    archived_at: datetime
+    stage_statuses: Sequence[StageStatus]
+    check_results: Sequence[CheckResult]
+    notes: Sequence[Note]
+    media: Sequence[Media]
+
+    @property
+    def row_count(self) -> int:
+        return (
+            len(self.stage_statuses)
+            + len(self.check_results)
+            + len(self.notes)
+            + len(self.media)
+        )
+
+
+@dataclass(frozen=True)
+class ArchiveResult:
+    project_id: str
+    rows: int
+    snapshot_bytes: int
+
+
+def _time(value: str | None) -> datetime | None:
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def encode_snapshot(snapshot: ProjectSnapshot) -> bytes:
+    # Rows as arrays rather than objects; the project id is the archive's key.
+    document = {
+        "stage_statuses": [
+            [s.id, s.stage_id, s.status.value, s.updated_at]
+            for s in snapshot.stage_statuses
+        ],
+        "check_results": [
+            [r.id, r.check_item_id, r.is_done, r.note, r.updated_at]
+            for r in snapshot.check_results
+        ],
+        "notes": [[n.id, n.stage_id, n.body, n.created_at] for n in snapshot.notes],
+        "media": [
+            [m.id, m.stage_id, m.storage_path, m.caption, m.taken_at, m.created_at]
+            for m in snapshot.media
+        ],
+    }
+    return zlib.compress(orjson.dumps(document), _ZLIB_LEVEL)
+
+
+def decode_snapshot(
+    project_id: str, archived_at: datetime, data: bytes
+) -> ProjectSnapshot:
+    document: dict[str, list[list[Any]]] = orjson.loads(zlib.decompress(data))
+    return ProjectSnapshot(
+        project_id=project_id,
+        archived_at=archived_at,
+        stage_statuses=[
+            StageStatus(
+                id=id_,
+                project_id=project_id,
+                stage_id=stage_id,
+                status=StageStatusValue(status),
+                updated_at=datetime.fromisoformat(updated_at),
+            )
+            for id_, stage_id, status, updated_at in document["stage_statuses"]
+        ],
+        check_results=[
+            CheckResult(
+                id=id_,
+                project_id=project_id,
+                check_item_id=check_item_id,
+                is_done=is_done,
+                note=note,
+                updated_at=datetime.fromisoformat(updated_at),
+            )
+            for id_, check_item_id, is_done, note, updated_at in document[
+                "check_results"
+            ]
+        ],
+        notes=[
+            Note(
+                id=id_,
+                project_id=project_id,
+                stage_id=stage_id,
+                body=body,
+                created_at=datetime.fromisoformat(created_at),
+            )
+            for id_, stage_id, body, created_at in document["notes"]
+        ],
+        media=[
+            Media(
+                id=id_,
+                project_id=project_id,
+                stage_id=stage_id,
+                storage_path=storage_path,
+                caption=caption,
+                taken_at=_time(taken_at),
+                created_at=datetime.fromisoformat(created_at),
+            )
+            for id_, stage_id, storage_path, caption, taken_at, created_at in (
+                document["media"]
+            )
+        ],
+    )
+
+
+def _has_rows(project_id: Any) -> ColumnElement[bool]:
+    return or_(
+        *(exists().where(model.project_id == project_id) for model in _PER_PROJECT)
+    )
+
+
+def _changed_since(project_id: Any, since: datetime) -> ColumnElement[bool]:
+    return or_(
+        exists().where(
+            ProjectStageStatusModel.project_id == project_id,
+            ProjectStageStatusModel.updated_at >= since,
+        ),
+        exists().where(
+            ProjectCheckResultModel.project_id == project_id,
+            ProjectCheckResultModel.updated_at >= since,
+        ),
+        exists().where(
+            ProjectNoteModel.project_id == project_id,
+            ProjectNoteModel.created_at >= since,
+        ),
+        exists().where(
+            ProjectMediaModel.project_id == project_id,
+            ProjectMediaModel.created_at >= since,
+        ),
+    )
+
+
+class SqlAlchemyProjectArchiveRepo:
+    """Archives and restores projects within the session's transaction.
+
+    Snapshots read through get() are memoized, so build one per request.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+        self._snapshots: dict[str, ProjectSnapshot | None] = {}
+        self._hot: set[str] = set()
+
+    def list_inactive(self, idle_since: datetime, limit: int) -> list[str]:
+        """Unarchived projects with rows, none of them changed since `idle_since`."""
+        return list(
+            self._session.scalars(
+                select(ProjectModel.id)
+                .where(
+                    ProjectModel.created_at < idle_since,
+                    ~exists().where(ProjectArchiveModel.project_id == ProjectModel.id),
+                    _has_rows(ProjectModel.id),
+                    ~_changed_since(ProjectModel.id, idle_since),
+                )
+                .order_by(ProjectModel.created_at)
+                .limit(limit)
+            )
+        )
+
+    def archive(self, project_id: str, idle_since: datetime) -> ArchiveResult | None:
+        """Move the project's rows into a snapshot.
+
+        Returns None, changing nothing, if the project is gone, already
+        archived, empty, or changed since `idle_since`.
+        """
+        locked = self._session.scalar(
+            select(ProjectModel.id)
+            .where(ProjectModel.id == project_id)
+            .with_for_update()
+        )
+        if locked is None:
+            return None
+        if self._session.scalar(
+            select(
+                or_(
+                    exists().where(ProjectArchiveModel.project_id == project_id),
+                    _changed_since(project_id, idle_since),
+                )
+            )
+        ):
+            return None
+
+        snapshot = ProjectSnapshot(
+            project_id=project_id,
+            archived_at=datetime.now(timezone.utc),
+            stage_statuses=SqlAlchemyStageStatusRepo(self._session).get_for_project(
+                project_id
+            ),
+            check_results=SqlAlchemyCheckResultRepo(self._session).get_for_project(
+                project_id
+            ),
+            notes=SqlAlchemyNotesRepo(self._session).list_for_project(project_id),
+            media=SqlAlchemyMediaRepo(self._session).list_for_project(project_id),
+        )
+        if not snapshot.row_count:
+            return None
+
+        data = encode_snapshot(snapshot)
+        self._session.add(
+            ProjectArchiveModel(
+                project_id=project_id,
+                format=FORMAT,
+                snapshot=data,
+                row_count=snapshot.row_count,
+                archived_at=snapshot.archived_at,
+            )
+        )
+        for model in _PER_PROJECT:
+            self._session.execute(delete(model).where(model.project_id == project_id))
+        self._session.flush()
+        self._snapshots[project_id] = snapshot
+        PROJECT_ARCHIVE_OPERATIONS.labels("archive").inc()
+        return ArchiveResult(project_id, snapshot.row_count, len(data))
+
+    def get(self, project_id: str) -> ProjectSnapshot | None:
+        if project_id not in self._snapshots:
+            row = self._session.scalar(
+                select(ProjectArchiveModel).where(
+                    ProjectArchiveModel.project_id == project_id
+                )
+            )
+            self._snapshots[project_id] = None if row is None else self._decode(row)
+            if row is not None:
+                PROJECT_ARCHIVE_OPERATIONS.labels("snapshot_read").inc()
+        return self._snapshots[project_id]
+
+    def fallback(self, project_id: str, *, found: bool) -> ProjectSnapshot | None:
+        """Snapshot to read from when a hot table had nothing for the project."""
+        if found:
+            self._snapshots.setdefault(project_id, None)
+            return None
+        return self.get(project_id)
+
+    def ensure_hot(self, project_id: str) -> None:
+        """Restore the project if archived; call before writing its rows."""
+        if project_id in self._hot:
+            return
+        # Waits for an archive of this project in progress (see module doc).
+        self._session.execute(
+            select(ProjectModel.id)
+            .where(ProjectModel.id == project_id)
+            .with_for_update(key_share=True)
+        )
+        self.restore(project_id)
+        self._hot.add(project_id)
+
+    def restore(self, project_id: str) -> bool:
+        """Move an archived project's rows back; False if it was not archived."""
+        row = self._session.scalar(
+            select(ProjectArchiveModel)
+            .where(ProjectArchiveModel.project_id == project_id)
+            .with_for_update()
+        )
+        if row is None:
+            return False
+        snapshot = self._decode(row)
+
+        # Catalog rows deleted since the archive: their statuses and results
+        # go, like ON DELETE CASCADE would have; notes and media lose the
+        # stage, like ON DELETE SET NULL.
+        stage_ids = set(
+            self._session.scalars(
+                select(StageModel.id).where(
+                    StageModel.id.in_(
+                        {s.stage_id for s in snapshot.stage_statuses}
+                        | {n.stage_id for n in snapshot.notes if n.stage_id}
+                        | {m.stage_id for m in snapshot.media if m.stage_id}
+                    )
+                )
+            )
+        )
+        check_ids = set(
+            self._session.scalars(
+                select(StageCheckItemModel.id).where(
+                    StageCheckItemModel.id.in_(
+                        {r.check_item_id for r in snapshot.check_results}
+                    )
+                )
+            )
+        )
+        batches: list[tuple[Any, list[dict[str, Any]]]] = [
+            (
+                ProjectStageStatusModel,
+                [
+                    {
+                        "id": s.id,
+                        "project_id": project_id,
+                        "stage_id": s.stage_id,
+                        "status": s.status.value,
+                        "updated_at": s.updated_at,
+                    }
+                    for s in snapshot.stage_statuses
+                    if s.stage_id in stage_ids
+                ],
+            ),
+            (
+                ProjectCheckResultModel,
+                [
+                    {
+                        "id": r.id,
+                        "project_id": project_id,
+                        "check_item_id": r.check_item_id,
+                        "is_done": r.is_done,
+                        "note": r.note,
+                        "updated_at": r.updated_at,
+                    }
+                    for r in snapshot.check_results
+                    if r.check_item_id in check_ids
+                ],
+            ),
+            (
+                ProjectNoteModel,
+                [
+                    {
+                        "id": n.id,
+                        "project_id": project_id,
+                        "stage_id": n.stage_id if n.stage_id in stage_ids else None,
+                        "body": n.body,
+                        "created_at": n.created_at,
+                    }
+                    for n in snapshot.notes
+                ],
+            ),
+            (
+                ProjectMediaModel,
+                [
+                    {
+                        "id": m.id,
+                        "project_id": project_id,
+                        "stage_id": m.stage_id if m.stage_id in stage_ids else None,
+                        "storage_path": m.storage_path,
+                        "caption": m.caption,
+                        "taken_at": m.taken_at,
+                        "created_at": m.created_at,
+                    }
+                    for m in snapshot.media
+                ],
+            ),
+        ]
+        for model, rows in batches:
+            if rows:
+                self._session.execute(insert(model), rows)
+        self._session.delete(row)
+        self._session.flush()
+        self._snapshots[project_id] = None
+        PROJECT_ARCHIVE_OPERATIONS.labels("restore").inc()
+        return True
+
+    def _decode(self, row: ProjectArchiveModel) -> ProjectSnapshot:
+        if row.format != FORMAT:
+            raise ValueError(f"unknown project snapshot format {row.format}")
+        return decode_snapshot(row.project_id, row.archived_at, row.snapshot)
+
+
+_QUERY_TERM = re.compile(r"(-?)(\w+)")
+
+
+def search_snapshot_notes(
+    notes: Sequence[Note],
+    query: str,
+    *,
+    stage_ids: Sequence[str],
+    limit: int,
+    offset: int,
+) -> NoteSearchPage:
+    """NotesRepo.search over an archived project's notes.
+
+    Approximates websearch_to_tsquery with the 'simple' config: every term
+    must appear as a word, "-term" must not; quotes and "or" are ignored.
+    Rank is the number of matching words.
+    """
+    wanted: set[str] = set()
+    unwanted: set[str] = set()
+    for sign, term in _QUERY_TERM.findall(query.casefold()):
+        if term != "or":
+            (unwanted if sign else wanted).add(term)
+    if not wanted:
+        return NoteSearchPage(hits=[], total=0)
+
+    matches: list[tuple[float, Note, list[str]]] = []
+    for note in notes:
+        if stage_ids and note.stage_id not in stage_ids:
+            continue
+        words = note.body.split()
+        folded = [m.group(2) for w in words if (m := _QUERY_TERM.search(w.casefold()))]
+        present = set(folded)
+        if wanted <= present and not unwanted & present:
+            rank = float(sum(1 for w in folded if w in wanted))
+            matches.append((rank, note, words))
+    matches.sort(key=lambda m: (m[0], m[1].created_at), reverse=True)
+
+    hits = []
+    for rank, note, words in matches[offset : offset + limit]:
+        first = next(
+            i
+            for i, w in enumerate(words)
+            if (m := _QUERY_TERM.search(w.casefold())) and m.group(2) in wanted
+        )
+        window = words[max(0, first - 8) : max(0, first - 8) + 25]
+        # Escaped like highlight_snippet(): notes are user text.
+        snippet = " ".join(
+            f"<mark>{html.escape(w, quote=False)}</mark>"
+            if (m := _QUERY_TERM.search(w.casefold())) and m.group(2) in wanted
+            else html.escape(w, quote=False)
+            for w in window
+        )
+        hits.append(NoteSearchHit(note=note, rank=rank, snippet=snippet))
+    return NoteSearchPage(hits=hits, total=len(matches))
+
+
+class ArchiveAwareStageStatusRepo(StageStatusRepo):
+    def __init__(
+        self, inner: StageStatusRepo, archive: SqlAlchemyProjectArchiveRepo
+    ) -> None:
+        self._inner = inner
+        self._archive = archive
+
+    def get_for_project(self, project_id: str) -> Sequence[StageStatus]:
+        rows = self._inner.get_for_project(project_id)
+        if snapshot := self._archive.fallback(project_id, found=bool(rows)):
+            return snapshot.stage_statuses
+        return rows
+
+    def upsert(self, status: StageStatus) -> StageStatus:
+        self._archive.ensure_hot(status.project_id)
+        return self._inner.upsert(status)
+
+
+class ArchiveAwareCheckResultRepo(CheckResultRepo):
+    def __init__(
+        self, inner: CheckResultRepo, archive: SqlAlchemyProjectArchiveRepo
+    ) -> None:
+        self._inner = inner
+        self._archive = archive
+
+    def get_for_project(self, project_id: str) -> Sequence[CheckResult]:
+        rows = self._inner.get_for_project(project_id)
+        if snapshot := self._archive.fallback(project_id, found=bool(rows)):
+            return snapshot.check_results
+        return rows
+
+    def upsert(self, result: CheckResult) -> CheckResult:
+        self._archive.ensure_hot(result.project_id)
+        return self._inner.upsert(result)
+
+
+class ArchiveAwareNotesRepo(NotesRepo):
+    def __init__(self, inner: NotesRepo, archive: SqlAlchemyProjectArchiveRepo) -> None:
+        self._inner = inner
+        self._archive = archive
+
+    def add(self, note: Note) -> Note:
+        self._archive.ensure_hot(note.project_id)
+        return self._inner.add(note)
+
+    def list_for_project(self, project_id: str) -> Sequence[Note]:
+        rows = self._inner.list_for_project(project_id)
+        if snapshot := self._archive.fallback(project_id, found=bool(rows)):
+            return snapshot.notes
+        return rows
+
+    def search(
+        self,
+        project_id: str,
+        query: str,
+        *,
+        stage_ids: Sequence[str],
+        limit: int,
+        offset: int,
+    ) -> NoteSearchPage:
+        page = self._inner.search(
+            project_id, query, stage_ids=stage_ids, limit=limit, offset=offset
+        )
+        if snapshot := self._archive.fallback(project_id, found=bool(page.total)):
+            return search_snapshot_notes(
+                snapshot.notes, query, stage_ids=stage_ids, limit=limit, offset=offset
+            )
+        return page
+
+
+class ArchiveAwareMediaRepo(MediaRepo):
+    def __init__(self, inner: MediaRepo, archive: SqlAlchemyProjectArchiveRepo) -> None:
+        self._inner = inner
+        self._archive = archive
+
+    def add(self, media: Media) -> Media:
+        self._archive.ensure_hot(media.project_id)
+        return self._inner.add(media)
+
+    def list_for_project(self, project_id: str) -> Sequence[Media]:
+        rows = self._inner.list_for_project(project_id)
+        if snapshot := self._archive.fallback(project_id, found=bool(rows)):
+            return snapshot.media
+        return rows
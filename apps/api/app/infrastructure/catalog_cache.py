@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from app.application.ports.repositories import StageRepo
+from app.domain.entities import CheckItem, Stage
+from app.infrastructure.catalog_search import InMemoryCatalogIndex
+from app.infrastructure.metrics import CACHE_LOOKUPS
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    revision: int
+    stages: Sequence[Stage]
+    checks: Sequence[CheckItem]
+    search_index: InMemoryCatalogIndex
+    # Encoded response bodies derived from this revision (see
+    # app/web/compression.py); they go away with the snapshot.
+    bodies: dict[str, bytes] = field(default_factory=dict, compare=False, repr=False)
+
+
+class CatalogCache:
+    """Process-wide copy of the stage catalog and its search index.
+
+    The snapshot is revalidated against `catalog_revision` (bumped by database
+    triggers on any catalog write) at most once per `revalidate_seconds`;
+    in between, reads never touch the database. `invalidate()` drops the
+    snapshot immediately after an in-process admin write.
+    """
+
+    def __init__(self, revalidate_seconds: float) -> None:
+        self._revalidate_seconds = revalidate_seconds
+        self._snapshot: CatalogSnapshot | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return time.monotonic() - self._checked_at < self._revalidate_seconds
+
+    def get(self, stage_repo: StageRepo) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and self._is_fresh():
+            CACHE_LOOKUPS.labels("catalog", "hit").inc()
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and self._is_fresh():
+                CACHE_LOOKUPS.labels("catalog", "hit").inc()
+                return snapshot
+            revision = stage_repo.get_catalog_revision()
+            # Revisions only grow; an older one comes from a lagging replica.
+            if snapshot is None or revision > snapshot.revision:
+                CACHE_LOOKUPS.labels("catalog", "miss").inc()
+                snapshot = self._load(stage_repo, revision)
+                self._snapshot = snapshot
+            else:
+                CACHE_LOOKUPS.labels("catalog", "revalidated").inc()
+            self._checked_at = time.monotonic()
+            return snapshot
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    @staticmethod
+    def _load(stage_repo: StageRepo, revision: int) -> CatalogSnapshot:
+        stages = sorted(stage_repo.list_all(), key=lambda s: s.order_index)
+        checks = sorted(
+            stage_repo.list_check_items_for_stage_ids([]),
+            key=lambda c: (c.stage_id, c.order_index),
+        )
+        return CatalogSnapshot(
+            revision=revision,
+            stages=stages,
+            checks=checks,
+            search_index=InMemoryCatalogIndex(stages, checks),
+        )
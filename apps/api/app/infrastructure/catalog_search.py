@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import bisect
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from app.application.ports.search import CatalogSearchHit, CatalogSearchIndex
+from app.domain.entities import CheckItem, Stage
+
+# Maqaf (U+05BE) sits inside the niqqud/cantillation block, so word joiners
+# are turned into spaces before the marks are stripped.
+_WORD_JOINERS = re.compile("[\u05be\\-\u2013\u2014/]")
+_NIQQUD = re.compile("[\u0591-\u05c7]")
+_QUOTES = re.compile("[\"'`\u05f3\u05f4]")
+_WORD = re.compile(r"\w+")
+_FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+_HEBREW_LETTER = re.compile("[\u05d0-\u05ea]")
+
+# One-letter proclitics (ו, ה, ב, כ, ל, מ, ש) stack, e.g. "וכשהקבלן". Suffixes
+# are the regular plurals, written with final letters already normalized.
+_PROCLITICS = frozenset("והבכלמש")
+_MAX_PROCLITICS = 3
+_SUFFIXES = ("יות", "ימ", "ות")
+_MIN_STEM = 2
+
+_TITLE_WEIGHT = 3.0
+_CHECK_TITLE_WEIGHT = 2.0
+_TEXT_WEIGHT = 1.0
+_CHECK_DESCRIPTION_WEIGHT = 0.5
+
+_EXACT = 1.0
+_AFFIX = 0.8
+_AFFIX_BOTH = 0.6
+_PREFIX = 0.5
+_FUZZY = 0.4
+
+_MAX_PREFIX_EXPANSIONS = 64
+_MIN_FUZZY_SIMILARITY = 0.3
+_MAX_FUZZY_EXPANSIONS = 3
+
+
+def normalize(text: str) -> str:
+    text = _WORD_JOINERS.sub(" ", text.lower())
+    text = _NIQQUD.sub("", text)
+    text = _QUOTES.sub("", text)
+    return text.translate(_FINAL_LETTERS)
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(normalize(text))
+
+
+def affix_variants(token: str) -> set[str]:
+    """Forms of a normalized token with proclitics and plural suffixes removed.
+
+    Over-generates on purpose ("מימ" also yields "ימ"); matches through a
+    variant score lower than exact ones, so the noise only affects ranking.
+    """
+    if not _HEBREW_LETTER.match(token):
+        return set()
+    stems = [token]
+    stem = token
+    for _ in range(_MAX_PROCLITICS):
+        if stem[0] not in _PROCLITICS or len(stem) - 1 < _MIN_STEM:
+            break
+        stem = stem[1:]
+        stems.append(stem)
+    variants: set[str] = set()
+    for stem in stems:
+        variants.add(stem)
+        for suffix in _SUFFIXES:
+            if stem.endswith(suffix) and len(stem) - len(suffix) >= _MIN_STEM:
+                variants.add(stem[: -len(suffix)])
+                break
+    variants.discard(token)
+    return variants
+
+
+def _trigrams(term: str) -> set[str]:
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class _Posting:
+    weight: float = 0.0
+    check_ids: set[str] = field(default_factory=set)
+
+
+Postings = dict[str, dict[int, _Posting]]
+
+
+class InMemoryCatalogIndex(CatalogSearchIndex):
+    """Inverted index over the stage catalog, built once per catalog revision.
+
+    Results are stages; a stage also reports the check items whose titles
+    matched. A query token is looked up exactly, through its affix variants,
+    as a prefix when it is the token being typed, and finally through
+    trigram similarity when nothing else matched (typos).
+    """
+
+    def __init__(self, stages: Sequence[Stage], checks: Sequence[CheckItem]) -> None:
+        self._stages = sorted(stages, key=lambda s: s.order_index)
+        self._checks = {c.id: c for c in checks}
+        self._exact: Postings = {}
+        self._affix: Postings = {}
+
+        position = {s.id: i for i, s in enumerate(self._stages)}
+        for i, stage in enumerate(self._stages):
+            self._add(i, stage.title, _TITLE_WEIGHT)
+            self._add(i, stage.short_explanation, _TEXT_WEIGHT)
+            self._add(i, stage.common_mistakes, _TEXT_WEIGHT)
+            self._add(i, stage.must_document, _TEXT_WEIGHT)
+        for check in checks:
+            pos = position.get(check.stage_id)
+            if pos is None:
+                continue
+            self._add(pos, check.title, _CHECK_TITLE_WEIGHT, check.id)
+            if check.description:
+                self._add(pos, check.description, _CHECK_DESCRIPTION_WEIGHT)
+
+        self._vocabulary = sorted(set(self._exact) | set(self._affix))
+        self._trigram_terms: dict[str, list[str]] = {}
+        for term in self._exact:
+            if len(term) >= 3:
+                for gram in _trigrams(term):
+                    self._trigram_terms.setdefault(gram, []).append(term)
+
+    def _add(
+        self, stage_pos: int, text: str, weight: float, check_id: str | None = None
+    ) -> None:
+        for token in tokenize(text):
+            self._post(self._exact, token, stage_pos, weight, check_id)
+            for variant in affix_variants(token):
+                self._post(self._affix, variant, stage_pos, weight, check_id)
+
+    @staticmethod
+    def _post(
+        postings: Postings,
+        term: str,
+        stage_pos: int,
+        weight: float,
+        check_id: str | None,
+    ) -> None:
+        posting = postings.setdefault(term, {}).setdefault(stage_pos, _Posting())
+        posting.weight = max(posting.weight, weight)
+        if check_id is not None:
+            posting.check_ids.add(check_id)
+
+    def search(self, query: str, *, limit: int) -> Sequence[CatalogSearchHit]:
+        tokens = list(dict.fromkeys(tokenize(query)))
+        typing_last = bool(query) and not query[-1].isspace()
+
+        matched: Counter[int] = Counter()
+        scores: dict[int, float] = {}
+        check_ids: dict[int, set[str]] = {}
+        for n, token in enumerate(tokens):
+            is_typing = typing_last and n == len(tokens) - 1
+            if len(token) < 2 and not is_typing:
+                continue
+            best: dict[int, float] = {}
+            for postings, quality in self._lookups(token, is_typing):
+                for stage_pos, posting in postings.items():
+                    score = quality * posting.weight
+                    if score > best.get(stage_pos, 0.0):
+                        best[stage_pos] = score
+                    if posting.check_ids:
+                        check_ids.setdefault(stage_pos, set()).update(
+                            posting.check_ids
+                        )
+            for stage_pos, score in best.items():
+                matched[stage_pos] += 1
+                scores[stage_pos] = scores.get(stage_pos, 0.0) + score
+
+        if not matched:
+            return []
+        # Stages matching the most query tokens win; within them, by score.
+        most = max(matched.values())
+        ranked = sorted(
+            (pos for pos, count in matched.items() if count == most),
+            key=lambda pos: (-scores[pos], self._stages[pos].order_index),
+        )
+        return [
+            CatalogSearchHit(
+                stage=self._stages[pos],
+                checks=sorted(
+                    (self._checks[cid] for cid in check_ids.get(pos, ())),
+                    key=lambda c: c.order_index,
+                ),
+                score=round(scores[pos], 3),
+            )
+            for pos in ranked[:limit]
+        ]
+
+    def _lookups(
+        self, token: str, is_typing: bool
+    ) -> list[tuple[dict[int, _Posting], float]]:
+        lookups: list[tuple[dict[int, _Posting], float]] = []
+        if token in self._exact:
+            lookups.append((self._exact[token], _EXACT))
+        if token in self._affix:
+            lookups.append((self._affix[token], _AFFIX))
+        for variant in affix_variants(token):
+            if variant in self._exact:
+                lookups.append((self._exact[variant], _AFFIX))
+            if variant in self._affix:
+                lookups.append((self._affix[variant], _AFFIX_BOTH))
+        if is_typing:
+            start = bisect.bisect_left(self._vocabulary, token)
+            for term in self._vocabulary[start : start + _MAX_PREFIX_EXPANSIONS]:
+                if not term.startswith(token):
+                    break
+                if term == token:
+                    continue
+                for postings in (self._exact, self._affix):
+                    if term in postings:
+                        lookups.append((postings[term], _PREFIX))
+        if not lookups and len(token) >= 3:
+            for term, similarity in self._similar_terms(token):
+                lookups.append((self._exact[term], _FUZZY * similarity))
+        return lookups
+
+    def _similar_terms(self, token: str) -> list[tuple[str, float]]:
+        grams = _trigrams(token)
+        shared: Counter[str] = Counter()
+        for gram in grams:
+            shared.update(self._trigram_terms.get(gram, ()))
+        similar = []
+        for term, common in shared.items():
+            similarity = common / (len(grams) + len(_trigrams(term)) - common)
+            if similarity >= _MIN_FUZZY_SIMILARITY:
+                similar.append((term, similarity))
+        similar.sort(key=lambda item: -item[1])
+        return similar[:_MAX_FUZZY_EXPANSIONS]
@@ -1,17 +1,37 @@
 from __future__ import annotations
 
+import weakref
 from typing import Generator
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.infrastructure.metrics import TimedQueuePool, instrument_engine
 
-def create_session_factory(database_url: str) -> sessionmaker[Session]:
-    engine = create_engine(database_url, future=True)
+# Every engine created in this process, so pools can be dropped around fork().
+_engines: weakref.WeakSet[Engine] = weakref.WeakSet()
+
+
+def create_session_factory(
+    database_url: str, *, pool_name: str = "primary"
+) -> sessionmaker[Session]:
+    engine = create_engine(database_url, future=True, poolclass=TimedQueuePool)
+    instrument_engine(engine, pool_name)
+    _engines.add(engine)
     return sessionmaker(bind=engine, class_=Session, expire_on_commit=False)
 
 
+def dispose_engines(*, close: bool = True) -> None:
+    """Drop the pooled connections of every engine.
+
+    In a forked child pass `close=False`: the connections belong to the
+    parent, and closing them would end the parent's sessions too.
+    """
+    for engine in list(_engines):
+        engine.dispose(close=close)
+
+
 @contextmanager
 def session_scope(
     session_factory: sessionmaker[Session],
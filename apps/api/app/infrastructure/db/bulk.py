@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import Connection
+
+
+def copy_rows(
+    conn: Connection,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+) -> int:
+    """Stream rows into `table` with COPY FROM STDIN inside the open transaction.
+
+    Needs the psycopg 3 driver; orders of magnitude faster than INSERTs for
+    bulk loads. Returns the number of rows written.
+    """
+    driver_conn: Any = conn.connection.driver_connection
+    written = 0
+    with driver_conn.cursor() as cursor:
+        with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+                written += 1
+    return written
@@ -3,17 +3,22 @@ from __future__ import annotations
 from datetime import datetime
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
+    Computed,
     DateTime,
     ForeignKey,
     Integer,
+    JSON,
+    LargeBinary,
+    SmallInteger,
     String,
     Text,
     UniqueConstraint,
     Index,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -73,6 +78,16 @@ class StageCheckItemModel(Base):
     )
 
 
+class CatalogRevisionModel(Base):
+    """Single row (id=1) bumped by database triggers on every catalog write."""
+
+    __tablename__ = "catalog_revision"
+
+    id: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    revision: Mapped[int] = mapped_column(BigInteger)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
 class ProjectStageStatusModel(Base):
     __tablename__ = "project_stage_status"
 
@@ -121,6 +136,8 @@ class ProjectCheckResultModel(Base):
 
 
 class ProjectNoteModel(Base):
+    # Hash-partitioned on project_id in Postgres (migration 0005); queries
+    # should filter on project_id so only one partition is read.
     __tablename__ = "project_notes"
 
     id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True)
@@ -137,9 +154,24 @@ class ProjectNoteModel(Base):
     )
     body: Mapped[str] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    # Maintained by Postgres on insert/update; never loaded unless asked for.
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', body)", persisted=True),
+        deferred=True,
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_project_notes_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
 
 
 class ProjectMediaModel(Base):
+    # Hash-partitioned on project_id, like project_notes.
     __tablename__ = "project_media"
 
     id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True)
@@ -180,3 +212,40 @@ class AIConversationModel(Base):
     ai_answer: Mapped[str] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
+
+class IdempotencyKeyModel(Base):
+    """A POST made with an Idempotency-Key, and its response once it has one.
+
+    `status_code` is null while the first request is still running.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(Text)
+    status_code: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+    headers: Mapped[list[list[str]] | None] = mapped_column(JSON, nullable=True)
+    body: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+
+class ProjectArchiveModel(Base):
+    """An inactive project's statuses, check results, notes and media rows.
+
+    While a project has one, those tables hold nothing for it; see
+    app.infrastructure.archive for the snapshot format.
+    """
+
+    __tablename__ = "project_archives"
+
+    project_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("projects.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    format: Mapped[int] = mapped_column(SmallInteger)
+    snapshot: Mapped[bytes] = mapped_column(LargeBinary)
+    row_count: Mapped[int] = mapped_column(Integer)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
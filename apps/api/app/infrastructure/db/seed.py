@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import argparse
 import os
+import time
 import uuid
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import Connection, create_engine, text
+
+from app.infrastructure.db.bulk import copy_rows
 
 
 STAGES_DATA = [
@@ -247,76 +251,265 @@ STAGES_DATA = [
 ]
 
 
-def seed_stages(database_url: str | None = None) -> None:
-    url = database_url or os.getenv("DATABASE_URL")
-    if not url:
-        raise RuntimeError("DATABASE_URL must be set to run seed script.")
+# Stable ids: the same slug (and slug + check order) always maps to the same
+# UUID, so reseeding an empty database reproduces ids across environments.
+_ID_NAMESPACE = uuid.UUID("8f2b7d6e-1c4a-4f3e-9b0d-5a6c7e8f9a10")
 
-    engine = create_engine(url)
+_STAGE_COLUMNS = (
+    "id",
+    "slug",
+    "title",
+    "short_explanation",
+    "common_mistakes",
+    "must_document",
+    "order_index",
+)
+_CHECK_COLUMNS = ("id", "stage_slug", "title", "description", "order_index")
 
-    with engine.begin() as conn:
-        # ננקה את הנתונים הקיימים ונזרע מחדש את שלבי הקטלוג
-        conn.execute(text("DELETE FROM stage_check_items"))
-        conn.execute(text("DELETE FROM stages"))
 
-        for idx, stage in enumerate(sorted(STAGES_DATA, key=lambda s: s["order_index"]), start=1):
-            slug = f"stage-{idx}"
+def _stage_id(slug: str) -> str:
+    return str(uuid.uuid5(_ID_NAMESPACE, slug))
+
+
+def _check_id(slug: str, order_index: int) -> str:
+    return str(uuid.uuid5(_ID_NAMESPACE, f"{slug}#{order_index}"))
+
 
-            short_explanation = stage["description"]
-            warnings = " ".join(
-                tip["content"] for tip in stage["tips"] if tip.get("type") == "warning"
+def _catalog_rows(
+    synthetic_stages: int, checks_per_stage: int
+) -> tuple[list[tuple[object, ...]], list[tuple[object, ...]]]:
+    stage_rows: list[tuple[object, ...]] = []
+    check_rows: list[tuple[object, ...]] = []
+
+    ordered = sorted(STAGES_DATA, key=lambda s: s["order_index"])
+    for idx, stage in enumerate(ordered, start=1):
+        slug = f"stage-{idx}"
+
+        short_explanation = stage["description"]
+        warnings = " ".join(
+            tip["content"] for tip in stage["tips"] if tip.get("type") == "warning"
+        )
+        others = " ".join(
+            tip["content"]
+            for tip in stage["tips"]
+            if tip.get("type") in {"info", "recommendation"}
+        )
+        stage_rows.append(
+            (
+                _stage_id(slug),
+                slug,
+                stage["title"],
+                short_explanation,
+                warnings,
+                others,
+                stage["order_index"],
             )
-            others = " ".join(
-                tip["content"]
-                for tip in stage["tips"]
-                if tip.get("type") in {"info", "recommendation"}
+        )
+        for order_index, item in enumerate(stage["checklist_items"], start=1):
+            description = "קריטי" if item.get("is_critical") else None
+            check_rows.append(
+                (
+                    _check_id(slug, order_index),
+                    slug,
+                    item["text"],
+                    description,
+                    order_index,
+                )
             )
 
-            stage_id = str(uuid.uuid4())
-            conn.execute(
-                text(
-                    """
-                    INSERT INTO stages (
-                        id, slug, title, short_explanation,
-                        common_mistakes, must_document, order_index
-                    )
-                    VALUES (:id, :slug, :title, :short_explanation,
-                            :common_mistakes, :must_document, :order_index)
-                    """
-                ),
-                {
-                    "id": stage_id,
-                    "slug": slug,
-                    "title": stage["title"],
-                    "short_explanation": short_explanation,
-                    "common_mistakes": warnings,
-                    "must_document": others,
-                    "order_index": stage["order_index"],
-                },
+    # Synthetic stages for load testing reuse the real texts so payload sizes
+    # and tokenization stay realistic.
+    real_stages, real_checks = list(stage_rows), list(check_rows)
+    for n in range(1, synthetic_stages + 1):
+        template = real_stages[(n - 1) % len(real_stages)]
+        slug = f"synthetic-{n:06d}"
+        stage_rows.append(
+            (
+                _stage_id(slug),
+                slug,
+                f"{template[2]} ({n})",
+                template[3],
+                template[4],
+                template[5],
+                1000 + n,
             )
-
-            for order_index, item in enumerate(stage["checklist_items"], start=1):
-                title = item["text"]
-                description = "קריטי" if item.get("is_critical") else None
-                conn.execute(
-                    text(
-                        """
-                        INSERT INTO stage_check_items (
-                            id, stage_id, title, description, order_index
-                        )
-                        VALUES (:id, :stage_id, :title, :description, :order_index)
-                        """
-                    ),
-                    {
-                        "id": str(uuid.uuid4()),
-                        "stage_id": stage_id,
-                        "title": title,
-                        "description": description,
-                        "order_index": order_index,
-                    },
+        )
+        for order_index in range(1, checks_per_stage + 1):
+            offset = n * checks_per_stage + order_index
+            source = real_checks[offset % len(real_checks)]
+            check_rows.append(
+                (
+                    _check_id(slug, order_index),
+                    slug,
+                    source[2],
+                    source[3],
+                    order_index,
                 )
+            )
+
+    return stage_rows, check_rows
+
+
+def _replace(
+    conn: Connection,
+    stage_rows: list[tuple[object, ...]],
+    check_rows: list[tuple[object, ...]],
+) -> None:
+    # ננקה את הנתונים הקיימים ונזרע מחדש את שלבי הקטלוג
+    # (תוצאות הבדיקות של הפרויקטים נמחקות איתם ב-CASCADE)
+    conn.execute(text("DELETE FROM stage_check_items"))
+    conn.execute(text("DELETE FROM stages"))
+    copy_rows(conn, "stages", _STAGE_COLUMNS, stage_rows)
+    copy_rows(
+        conn,
+        "stage_check_items",
+        ("id", "stage_id", "title", "description", "order_index"),
+        (
+            (check_id, _stage_id(str(slug)), title, description, order_index)
+            for check_id, slug, title, description, order_index in check_rows
+        ),
+    )
+
+
+def _upsert(
+    conn: Connection,
+    stage_rows: list[tuple[object, ...]],
+    check_rows: list[tuple[object, ...]],
+) -> None:
+    # Rows are keyed by stage slug and (stage, order_index); existing ids are
+    # kept, so project_check_results referencing them survive a reseed.
+    # Stages and check items not in the seed data are left alone, except
+    # checks of seeded stages beyond the seeded ones, which are removed.
+    conn.execute(text("CREATE TEMP TABLE seed_stages (LIKE stages) ON COMMIT DROP"))
+    conn.execute(
+        text(
+            """
+            CREATE TEMP TABLE seed_check_items (
+                id uuid, stage_slug text, title text,
+                description text, order_index integer
+            ) ON COMMIT DROP
+            """
+        )
+    )
+    copy_rows(conn, "seed_stages", _STAGE_COLUMNS, stage_rows)
+    copy_rows(conn, "seed_check_items", _CHECK_COLUMNS, check_rows)
+
+    conn.execute(
+        text(
+            """
+            INSERT INTO stages (
+                id, slug, title, short_explanation,
+                common_mistakes, must_document, order_index
+            )
+            SELECT id, slug, title, short_explanation,
+                   common_mistakes, must_document, order_index
+            FROM seed_stages
+            ON CONFLICT (slug) DO UPDATE SET
+                title = EXCLUDED.title,
+                short_explanation = EXCLUDED.short_explanation,
+                common_mistakes = EXCLUDED.common_mistakes,
+                must_document = EXCLUDED.must_document,
+                order_index = EXCLUDED.order_index
+            WHERE (stages.title, stages.short_explanation, stages.common_mistakes,
+                   stages.must_document, stages.order_index)
+                IS DISTINCT FROM
+                  (EXCLUDED.title, EXCLUDED.short_explanation,
+                   EXCLUDED.common_mistakes, EXCLUDED.must_document,
+                   EXCLUDED.order_index)
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            UPDATE stage_check_items AS c
+            SET title = s.title, description = s.description
+            FROM seed_check_items AS s
+            JOIN stages AS st ON st.slug = s.stage_slug
+            WHERE c.stage_id = st.id
+              AND c.order_index = s.order_index
+              AND (c.title, c.description) IS DISTINCT FROM (s.title, s.description)
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            INSERT INTO stage_check_items (
+                id, stage_id, title, description, order_index
+            )
+            SELECT s.id, st.id, s.title, s.description, s.order_index
+            FROM seed_check_items AS s
+            JOIN stages AS st ON st.slug = s.stage_slug
+            WHERE NOT EXISTS (
+                SELECT 1 FROM stage_check_items AS c
+                WHERE c.stage_id = st.id AND c.order_index = s.order_index
+            )
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            DELETE FROM stage_check_items AS c
+            USING stages AS st
+            WHERE c.stage_id = st.id
+              AND st.slug IN (SELECT slug FROM seed_stages)
+              AND NOT EXISTS (
+                  SELECT 1 FROM seed_check_items AS s
+                  WHERE s.stage_slug = st.slug AND s.order_index = c.order_index
+              )
+            """
+        )
+    )
+
+
+def seed_stages(
+    database_url: str | None = None,
+    *,
+    mode: str = "upsert",
+    synthetic_stages: int = 0,
+    checks_per_stage: int = 8,
+) -> None:
+    """Seed the stage catalog.
+
+    mode="upsert" (the default) is idempotent and keeps existing ids;
+    mode="replace" wipes the catalog first, and with it every project's
+    statuses and check results (ON DELETE CASCADE). Both load rows with
+    COPY, so `synthetic_stages` can add thousands of stages for load tests.
+    """
+    url = database_url or os.getenv("DATABASE_URL")
+    if not url:
+        raise RuntimeError("DATABASE_URL must be set to run seed script.")
+    if mode not in {"replace", "upsert"}:
+        raise ValueError(f"Unknown seed mode: {mode}")
+
+    stage_rows, check_rows = _catalog_rows(synthetic_stages, checks_per_stage)
+    engine = create_engine(url)
+
+    with engine.begin() as conn:
+        if mode == "replace":
+            _replace(conn, stage_rows, check_rows)
+        else:
+            _upsert(conn, stage_rows, check_rows)
 
 
 if __name__ == "__main__":
-    seed_stages()
+    parser = argparse.ArgumentParser(description="Seed the stage catalog.")
+    parser.add_argument(
+        "--mode",
+        choices=["replace", "upsert"],
+        default="upsert",
+        help="replace also deletes project statuses and check results",
+    )
+    parser.add_argument("--synthetic-stages", type=int, default=0)
+    parser.add_argument("--checks-per-stage", type=int, default=8)
+    args = parser.parse_args()
 
+    started = time.perf_counter()
+    seed_stages(
+        mode=args.mode,
+        synthetic_stages=args.synthetic_stages,
+        checks_per_stage=args.checks_per_stage,
+    )
+    print(f"seeded catalog ({args.mode}) in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,162 @@
+"""Idempotency keys: replay the stored response of a POST to its retries.
+
+A request claims (user id, key) before it runs. Retries with the same key
+and the same request fingerprint get the stored response once there is one
+and wait while the first attempt is still running; the same key with a
+different request is refused. Claims whose request failed (5xx or an
+exception) are released so a retry redoes the work.
+"""
+
+from __future__ import annotations
+
+import enum
+import itertools
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.infrastructure.db import session_scope
+from app.infrastructure.db.models import IdempotencyKeyModel
+
+
+class ClaimState(str, enum.Enum):
+    STARTED = "started"  # the caller owns the key and must run the request
+    IN_PROGRESS = "in_progress"  # another attempt is running
+    COMPLETED = "completed"  # `response` is the stored result
+    MISMATCH = "mismatch"  # the key was used for a different request
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    headers: list[list[str]] = field(default_factory=list)
+    body: bytes = b""
+
+
+@dataclass(frozen=True)
+class Claim:
+    state: ClaimState
+    response: StoredResponse | None = None
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite (tests) hands timestamps back without their zone.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class SqlIdempotencyStore:
+    """Keys in the `idempotency_keys` table, shared by every API worker.
+
+    A claim left in progress longer than `lease_seconds` (its worker died)
+    is taken over by the next retry. Expired rows are deleted every
+    `purge_every` claims.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        *,
+        ttl_seconds: float = 24 * 3600,
+        lease_seconds: float = 60.0,
+        purge_every: int = 1000,
+    ) -> None:
+        self._session_factory = session_factory
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+        self.purge_every = purge_every
+        self._claims = itertools.count(1)
+
+    def claim(self, user_id: str, key: str, fingerprint: str) -> Claim:
+        now = datetime.now(timezone.utc)
+        if next(self._claims) % self.purge_every == 0:
+            self.purge(now)
+        try:
+            with session_scope(self._session_factory) as session:
+                row = session.get(
+                    IdempotencyKeyModel, (user_id, key), with_for_update=True
+                )
+                if row is None:
+                    session.add(
+                        IdempotencyKeyModel(
+                            user_id=user_id,
+                            key=key,
+                            fingerprint=fingerprint,
+                            created_at=now,
+                            expires_at=now + self.ttl,
+                        )
+                    )
+                    return Claim(ClaimState.STARTED)
+                expired = _aware(row.expires_at) <= now
+                abandoned = (
+                    row.status_code is None
+                    and _aware(row.created_at) + self.lease <= now
+                )
+                if expired or abandoned:
+                    row.fingerprint = fingerprint
+                    row.status_code = row.headers = row.body = None
+                    row.created_at = now
+                    row.expires_at = now + self.ttl
+                    return Claim(ClaimState.STARTED)
+                return self._state(row, fingerprint)
+        except IntegrityError:
+            # A concurrent attempt inserted the key first.
+            return Claim(ClaimState.IN_PROGRESS)
+
+    def get(self, user_id: str, key: str, fingerprint: str) -> Claim:
+        with session_scope(self._session_factory) as session:
+            row = session.get(IdempotencyKeyModel, (user_id, key))
+            if row is None:
+                # Released by a failed attempt: the caller may claim it.
+                return Claim(ClaimState.STARTED)
+            return self._state(row, fingerprint)
+
+    @staticmethod
+    def _state(row: IdempotencyKeyModel, fingerprint: str) -> Claim:
+        if row.fingerprint != fingerprint:
+            return Claim(ClaimState.MISMATCH)
+        if row.status_code is None:
+            return Claim(ClaimState.IN_PROGRESS)
+        return Claim(
+            ClaimState.COMPLETED,
+            StoredResponse(row.status_code, row.headers or [], row.body or b""),
+        )
+
+    def complete(
+        self, user_id: str, key: str, fingerprint: str, response: StoredResponse
+    ) -> None:
+        with session_scope(self._session_factory) as session:
+            session.execute(
+                update(IdempotencyKeyModel)
+                .where(
+                    IdempotencyKeyModel.user_id == user_id,
+                    IdempotencyKeyModel.key == key,
+                    IdempotencyKeyModel.fingerprint == fingerprint,
+                )
+                .values(
+                    status_code=response.status_code,
+                    headers=response.headers,
+                    body=response.body,
+                )
+            )
+
+    def release(self, user_id: str, key: str, fingerprint: str) -> None:
+        with session_scope(self._session_factory) as session:
+            session.execute(
+                delete(IdempotencyKeyModel).where(
+                    IdempotencyKeyModel.user_id == user_id,
+                    IdempotencyKeyModel.key == key,
+                    IdempotencyKeyModel.fingerprint == fingerprint,
+                    IdempotencyKeyModel.status_code.is_(None),
+                )
+            )
+
+    def purge(self, now: datetime) -> None:
+        with session_scope(self._session_factory) as session:
+            session.execute(
+                delete(IdempotencyKeyModel).where(
+                    IdempotencyKeyModel.expires_at < now
+                )
+            )
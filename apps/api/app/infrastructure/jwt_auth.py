@@ -0,0 +1,196 @@
+"""JWT bearer token verification against a JWKS endpoint (e.g. Cognito).
+
+Signature checks are RSA work, so both halves are cached: `JwksCache` keeps
+the signing keys (refreshed in the background, refetched on an unknown kid
+at most once per `min_refetch_seconds`) and `JwtVerifier` keeps the claims
+of tokens it already verified until they expire.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Sequence
+
+import httpx
+import jwt
+
+from app.application.ports.auth import InvalidToken, VerifiedToken
+from app.infrastructure.metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger("app.auth")
+
+
+def _http_get_json(url: str, timeout: float) -> Any:
+    response = httpx.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+class JwksCache:
+    """Signing keys of one issuer by kid."""
+
+    def __init__(
+        self,
+        jwks_url: str,
+        *,
+        refresh_seconds: float = 3600.0,
+        min_refetch_seconds: float = 30.0,
+        timeout: float = 5.0,
+        fetch: Callable[[str, float], Any] = _http_get_json,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.jwks_url = jwks_url
+        self.refresh_seconds = refresh_seconds
+        self.min_refetch_seconds = min_refetch_seconds
+        self._timeout = timeout
+        self._fetch = fetch
+        self._clock = clock
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at: float | None = None
+        self._lock = threading.Lock()
+        self._refresher: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def refresh(self) -> None:
+        """Replace the key set with the issuer's current one."""
+        with self._lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self) -> None:
+        # Counted even if it fails, so an unreachable issuer is not hammered.
+        self._fetched_at = self._clock()
+        document = self._fetch(self.jwks_url, self._timeout)
+        keys: dict[str, jwt.PyJWK] = {}
+        for data in document.get("keys", []):
+            kid = data.get("kid")
+            if not kid or data.get("use", "sig") != "sig":
+                continue
+            try:
+                keys[kid] = jwt.PyJWK(data)
+            except jwt.PyJWTError:
+                logger.warning("skipping unusable JWKS key kid=%s", kid)
+        self._keys = keys
+
+    def get(self, kid: str) -> jwt.PyJWK:
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        with self._lock:
+            key = self._keys.get(kid)
+            if key is not None:
+                return key
+            # An unknown kid is either a rotation we have not seen yet or a
+            # forged token; refetch, but not for every such request.
+            due = (
+                self._fetched_at is None
+                or self._clock() - self._fetched_at >= self.min_refetch_seconds
+            )
+            if due:
+                try:
+                    self._refresh_locked()
+                except Exception as exc:
+                    logger.warning("JWKS fetch failed: %s", exc)
+                key = self._keys.get(kid)
+        if key is None:
+            raise InvalidToken(f"unknown signing key {kid!r}")
+        return key
+
+    def start_background_refresh(self) -> None:
+        if self._refresher is None:
+            self._refresher = threading.Thread(
+                target=self._refresh_loop, name="jwks-refresh", daemon=True
+            )
+            self._refresher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception as exc:
+                # Keep serving with the keys we have.
+                logger.warning("JWKS background refresh failed: %s", exc)
+
+
+class JwtVerifier:
+    """Verifies bearer JWTs; remembers verified tokens until they expire."""
+
+    def __init__(
+        self,
+        jwks: JwksCache,
+        *,
+        issuer: str,
+        audience: str | None = None,
+        algorithms: Sequence[str] = ("RS256",),
+        leeway: float = 30.0,
+        cache_size: int = 10_000,
+        user_id_claim: str = "sub",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.jwks = jwks
+        self.issuer = issuer
+        self.audience = audience
+        self.algorithms = list(algorithms)
+        self.leeway = leeway
+        self.cache_size = cache_size
+        self.user_id_claim = user_id_claim
+        self._clock = clock
+        self._verified: OrderedDict[bytes, VerifiedToken] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def verify(self, token: str) -> VerifiedToken:
+        key = hashlib.sha256(token.encode()).digest()
+        now = self._clock()
+        with self._lock:
+            cached = self._verified.get(key)
+            if cached is not None:
+                CACHE_LOOKUPS.labels("jwt", "hit").inc()
+                if now >= cached.expires_at + self.leeway:
+                    del self._verified[key]
+                    raise InvalidToken("Signature has expired")
+                self._verified.move_to_end(key)
+                return cached
+        CACHE_LOOKUPS.labels("jwt", "miss").inc()
+
+        verified = self._decode(token)
+        with self._lock:
+            self._verified[key] = verified
+            while len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+        return verified
+
+    def _decode(self, token: str) -> VerifiedToken:
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as exc:
+            raise InvalidToken(str(exc)) from exc
+        if header.get("alg") not in self.algorithms:
+            raise InvalidToken(f"algorithm {header.get('alg')!r} not allowed")
+        signing_key = self.jwks.get(str(header.get("kid")))
+        try:
+            claims = jwt.decode(
+                token,
+                signing_key,
+                algorithms=self.algorithms,
+                issuer=self.issuer,
+                audience=self.audience,
+                leeway=self.leeway,
+                options={
+                    "require": ["exp", "iss", self.user_id_claim],
+                    "verify_aud": self.audience is not None,
+                },
+            )
+        except jwt.PyJWTError as exc:
+            raise InvalidToken(str(exc)) from exc
+        return VerifiedToken(
+            user_id=str(claims[self.user_id_claim]),
+            expires_at=float(claims["exp"]),
+            claims=claims,
+        )
+
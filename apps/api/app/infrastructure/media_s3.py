@@ -2,16 +2,26 @@ from __future__ import annotations
 
 import os
 from datetime import timedelta
-
-import boto3
+from functools import lru_cache
+from typing import Any
 
 from app.application.ports.media import MediaStorage
 
 
+@lru_cache
+def _s3_client(region: str | None) -> Any:
+    # boto3 takes a few hundred ms to import and each client loads its service
+    # model, so import on first use (never, without a bucket) and build one
+    # client per region; boto3 clients are thread-safe.
+    import boto3
+
+    return boto3.client("s3", region_name=region)
+
+
 class S3MediaStorage(MediaStorage):
     def __init__(self, bucket_name: str, region: str | None = None) -> None:
         self._bucket = bucket_name
-        self._client = boto3.client("s3", region_name=region)
+        self._client = _s3_client(region)
 
     def create_presigned_upload(
         self,
@@ -0,0 +1,175 @@
+"""Prometheus metrics for the API process.
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py) so every
+worker writes its samples to shared files and /metrics aggregates them;
+gauges below declare how they combine across workers.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, cast
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import QueuePool
+
+# Latency buckets (seconds) sized for API calls, not batch jobs.
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route"],
+    buckets=_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being served.",
+    multiprocess_mode="livesum",
+)
+
+THREADPOOL_BUSY = Gauge(
+    "threadpool_busy_threads",
+    "Threads of the sync-endpoint threadpool in use, sampled per request.",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_SIZE = Gauge(
+    "threadpool_size_threads",
+    "Size of the sync-endpoint threadpool per worker.",
+    multiprocess_mode="livemax",
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool, by engine.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond pool_size, by engine.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection, by engine.",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Read replica lag as last measured; -1 when it is unreachable.",
+    multiprocess_mode="livemax",
+)
+DB_READ_ROUTING = Counter(
+    "db_read_routing_total",
+    "Read-only requests by database used; reason says why not the replica.",
+    ["target", "reason"],
+)
+
+AI_LATENCY = Histogram(
+    "ai_request_duration_seconds",
+    "Latency of AI provider calls.",
+    buckets=_BUCKETS + (30.0, 60.0),
+)
+AI_ERRORS = Counter("ai_request_errors_total", "AI provider calls that raised.")
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "In-process cache lookups; result is hit, revalidated or miss.",
+    ["cache", "result"],
+)
+
+RATE_LIMITED = Counter(
+    "rate_limited_requests_total",
+    "Requests rejected with 429 by route limit and bucket scope.",
+    ["route", "scope"],
+)
+
+PROJECT_ARCHIVE_OPERATIONS = Counter(
+    "project_archive_operations_total",
+    "Projects archived or restored, and reads served from a snapshot.",
+    ["operation"],
+)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection.
+
+    `name` is the `pool` label of its metrics; instrument_engine sets it.
+    """
+
+    name = "primary"
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.labels(self.name).observe(time.perf_counter() - started)
+
+    def recreate(self) -> QueuePool:
+        # engine.dispose() swaps in a fresh pool built from the constructor
+        # arguments only; carry the label over.
+        pool = super().recreate()
+        if isinstance(pool, TimedQueuePool):
+            pool.name = self.name
+        return pool
+
+
+def instrument_engine(engine: Engine, name: str = "primary") -> None:
+    """Publish pool metrics for `engine` under the `pool` label `name`."""
+    if not isinstance(engine.pool, QueuePool):
+        return
+    if isinstance(engine.pool, TimedQueuePool):
+        engine.pool.name = name
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+    overflow = DB_POOL_OVERFLOW.labels(name)
+    # Export the wait buckets before the first checkout.
+    DB_POOL_WAIT.labels(name)
+
+    # Look the pool up on each event: engine.dispose() replaces it. "checkin"
+    # fires before the connection is back in the pool, so the pool's own
+    # counters are one off there; track checkouts directly and correct the
+    # overflow for the connection being returned.
+    def checkout(*args: Any) -> None:
+        checked_out.inc()
+        pool = cast(QueuePool, engine.pool)
+        # overflow() counts up from -pool_size.
+        overflow.set(max(0, pool.overflow()))
+
+    def checkin(*args: Any) -> None:
+        checked_out.dec()
+        pool = cast(QueuePool, engine.pool)
+        # With every pool_size slot idle the returning connection is closed,
+        # which ends one overflow connection.
+        closing = pool.checkedin() >= pool.size()
+        overflow.set(max(0, pool.overflow() - closing))
+
+    event.listen(engine, "checkout", checkout)
+    event.listen(engine, "checkin", checkin)
+
+
+def render_latest() -> tuple[bytes, str]:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
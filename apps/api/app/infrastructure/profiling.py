@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import FrameType
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+PROFILE_MODES = ("cprofile", "sample")
+
+# Held for the length of a cProfile capture; see ProfileRequest.
+_cprofile_lock = threading.Lock()
+
+
+@dataclass
+class ProfileRequest:
+    """Asks the endpoint wrapper (see app/web/routing.py) to profile its call.
+
+    On Python 3.12+ cProfile hooks sys.monitoring, which is process-wide: a
+    cProfile capture covers every thread while it runs, not just this
+    request, and only one can be active at a time. A request asking for
+    cProfile while another holds it is sampled instead, and `mode` says so.
+    """
+
+    mode: str
+    sample_interval: float = 0.002
+    pstats_dump: bytes | None = None
+    summary: str | None = None
+    collapsed: str | None = None
+
+    def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._capture():
+            return fn(*args, **kwargs)
+
+    async def run_async(
+        self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        # Runs on the event loop thread, so other requests' coroutines that
+        # interleave with this one show up in the profile too.
+        with self._capture():
+            return await fn(*args, **kwargs)
+
+    @contextmanager
+    def _capture(self) -> Iterator[None]:
+        if self.mode == "cprofile" and not _cprofile_lock.acquire(blocking=False):
+            self.mode = "sample"
+        if self.mode == "sample":
+            sampler = StackSampler(threading.get_ident(), self.sample_interval)
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                self.collapsed = sampler.collapsed()
+                self.summary = sampler.top()
+            return
+
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                self._store_pstats(profiler)
+        finally:
+            _cprofile_lock.release()
+
+    def _store_pstats(self, profiler: cProfile.Profile) -> None:
+        out = io.StringIO()
+        stats = pstats.Stats(profiler, stream=out)
+        # Same format as Stats.dump_stats: loadable with pstats or snakeviz.
+        self.pstats_dump = marshal.dumps(stats.stats)  # type: ignore[attr-defined]
+        stats.sort_stats("cumulative").print_stats(40)
+        self.summary = out.getvalue()
+
+
+_profile_request: ContextVar[ProfileRequest | None] = ContextVar(
+    "profile_request", default=None
+)
+
+
+def current_profile_request() -> ProfileRequest | None:
+    return _profile_request.get()
+
+
+def set_profile_request(request: ProfileRequest | None) -> Any:
+    return _profile_request.set(request)
+
+
+def reset_profile_request(token: Any) -> None:
+    _profile_request.reset(token)
+
+
+def _frame_label(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+class StackSampler:
+    """Samples one thread's stack at a fixed interval into collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self._thread_id = thread_id
+        self._interval = interval
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            labels: list[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self._stacks[";".join(reversed(labels))] += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: flamegraph.pl, speedscope, etc."""
+        return "\n".join(f"{stack} {n}" for stack, n in self._stacks.most_common())
+
+    def top(self, limit: int = 40) -> str:
+        leaf = Counter[str]()
+        for stack, n in self._stacks.items():
+            leaf[stack.rsplit(";", 1)[-1]] += n
+        total = sum(leaf.values()) or 1
+        return "\n".join(
+            f"{n:>6} {n / total:>6.1%}  {label}"
+            for label, n in leaf.most_common(limit)
+        )
+
+
+@dataclass
+class StoredProfile:
+    id: str
+    created_at: datetime
+    method: str
+    path: str
+    route: str | None
+    mode: str
+    status_code: int
+    duration_ms: float
+    summary: str
+    collapsed: str | None = None
+    pstats_dump: bytes | None = field(default=None, repr=False)
+
+
+class ProfileStore:
+    """Keeps the last `keep` profiles in memory, optionally also on disk."""
+
+    def __init__(self, *, keep: int = 50, directory: str | None = None) -> None:
+        self._profiles: deque[StoredProfile] = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._directory = directory
+
+    def add(
+        self,
+        request: ProfileRequest,
+        *,
+        method: str,
+        path: str,
+        route: str | None,
+        status_code: int,
+        duration_ms: float,
+    ) -> StoredProfile:
+        profile = StoredProfile(
+            id=uuid.uuid4().hex,
+            created_at=datetime.now(timezone.utc),
+            method=method,
+            path=path,
+            route=route,
+            mode=request.mode,
+            status_code=status_code,
+            duration_ms=duration_ms,
+            summary=request.summary or "",
+            collapsed=request.collapsed,
+            pstats_dump=request.pstats_dump,
+        )
+        with self._lock:
+            self._profiles.append(profile)
+        if self._directory:
+            self._write(profile)
+        return profile
+
+    def recent(self) -> list[StoredProfile]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: str) -> StoredProfile | None:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def _write(self, profile: StoredProfile) -> None:
+        assert self._directory is not None
+        os.makedirs(self._directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", profile.created_at.timetuple())
+        base = os.path.join(self._directory, f"{stamp}-{profile.id}")
+        if profile.pstats_dump is not None:
+            with open(base + ".pstats", "wb") as fh:
+                fh.write(profile.pstats_dump)
+        if profile.collapsed is not None:
+            with open(base + ".collapsed", "w", encoding="utf-8") as fh:
+                fh.write(profile.collapsed)
@@ -0,0 +1,294 @@
+"""Token-bucket rate limiting.
+
+A bucket holds up to `capacity` tokens and refills at `capacity / period`
+tokens per second; each request takes one from each of its buckets (say,
+per user and per IP), or from none if any of them is empty. Buckets live in
+a store:
+
+- `MemoryBucketStore` keeps them in the process, so with N workers a client
+  gets up to N times its limit.
+- `SqliteBucketStore` keeps them in a SQLite file shared by every worker on
+  the host (point it at tmpfs, e.g. /dev/shm). Taking from one bucket is a
+  single UPSERT ... RETURNING statement, from several one short write
+  transaction: atomic across processes and tens of microseconds, where a
+  Postgres round trip would cost milliseconds.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Protocol, Sequence
+
+_LIMIT = re.compile(r"^\s*(\d+)\s*/\s*(\d+(?:\.\d+)?)?\s*([smhd])?\s*$")
+_UNITS = {"s": 1.0, "m": 60.0, "h": 3600.0, "d": 86400.0}
+
+
+@dataclass(frozen=True)
+class Limit:
+    capacity: int
+    period_seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period_seconds
+
+    @classmethod
+    def parse(cls, value: str) -> Limit:
+        """Parse "20/m", "20/60s" or "100/1h" (requests per period)."""
+        match = _LIMIT.match(value)
+        if match is None:
+            raise ValueError(f"invalid rate limit {value!r}")
+        count, amount, unit = match.groups()
+        period = float(amount or 1) * _UNITS[unit or "s"]
+        if int(count) <= 0 or period <= 0:
+            raise ValueError(f"invalid rate limit {value!r}")
+        return cls(capacity=int(count), period_seconds=period)
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    # Seconds until the bucket is full again / until one token is available.
+    reset_after: float
+    retry_after: float
+
+
+class BucketStore(Protocol):
+    # True when take() does I/O that can wait (on a lock, say); async
+    # callers then run it in a worker thread.
+    blocking: bool
+
+    def take(
+        self, buckets: Sequence[tuple[str, Limit]], now: float
+    ) -> list[tuple[bool, float]]:
+        """Take a token from every bucket, or from none if one is empty.
+
+        Returns (had a token, tokens left) for each bucket, in order.
+        """
+        ...
+
+
+def _refill(tokens: float, updated_at: float, limit: Limit, now: float) -> float:
+    refilled = tokens + max(0.0, now - updated_at) * limit.rate
+    return min(float(limit.capacity), refilled)
+
+
+class MemoryBucketStore:
+    """Buckets in this process only."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(
+        self, buckets: Sequence[tuple[str, Limit]], now: float
+    ) -> list[tuple[bool, float]]:
+        with self._lock:
+            levels = []
+            for key, limit in buckets:
+                # Popped and re-added below, so the dict stays in least
+                # recently used order.
+                bucket = self._buckets.pop(key, None)
+                levels.append(
+                    float(limit.capacity)
+                    if bucket is None
+                    else _refill(bucket[0], bucket[1], limit, now)
+                )
+            charge = 1.0 if all(tokens >= 1.0 for tokens in levels) else 0.0
+            for (key, _), tokens in zip(buckets, levels, strict=True):
+                if len(self._buckets) >= self.max_keys:
+                    # Buckets idle the longest are likely full again, and a
+                    # full bucket is the same as no bucket.
+                    del self._buckets[next(iter(self._buckets))]
+                self._buckets[key] = (tokens - charge, now)
+            return [(tokens >= 1.0, tokens - charge) for tokens in levels]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    period REAL NOT NULL,
+    allowed INTEGER NOT NULL
+) WITHOUT ROWID
+"""
+
+# On conflict every expression sees the row as it was before the update, so
+# the refilled level is computed once per column from the same state.
+_TAKE = """
+INSERT INTO buckets (key, tokens, updated_at, period, allowed)
+VALUES (:key, :capacity - 1, :now, :period, 1)
+ON CONFLICT (key) DO UPDATE SET
+    tokens = min(:capacity, tokens + max(0, :now - updated_at) * :rate)
+        - (min(:capacity, tokens + max(0, :now - updated_at) * :rate) >= 1),
+    allowed = min(:capacity, tokens + max(0, :now - updated_at) * :rate) >= 1,
+    updated_at = :now,
+    period = :period
+RETURNING allowed, tokens
+"""
+
+_GET = "SELECT tokens, updated_at FROM buckets WHERE key = ?"
+
+_SET = """
+INSERT INTO buckets (key, tokens, updated_at, period, allowed)
+VALUES (:key, :tokens, :now, :period, :allowed)
+ON CONFLICT (key) DO UPDATE SET
+    tokens = excluded.tokens,
+    updated_at = excluded.updated_at,
+    period = excluded.period,
+    allowed = excluded.allowed
+"""
+
+
+class SqliteBucketStore:
+    """Buckets in a SQLite file shared by the worker processes of one host.
+
+    Rows whose bucket has refilled completely (a full period after their
+    last take) carry no information and are pruned every `prune_every`
+    takes.
+    """
+
+    # A take waits up to the busy timeout for another process's write lock.
+    blocking = True
+
+    def __init__(self, path: str, *, prune_every: int = 10_000) -> None:
+        self.path = path
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._takes = 0
+        self._conn().execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        # The buckets are disposable; durability is not worth an fsync.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread and per process: a connection inherited
+        # across fork must not be used.
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(
+        self, buckets: Sequence[tuple[str, Limit]], now: float
+    ) -> list[tuple[bool, float]]:
+        conn = self._conn()
+        if len(buckets) == 1:
+            [(key, limit)] = buckets
+            row = conn.execute(
+                _TAKE,
+                {
+                    "key": key,
+                    "capacity": limit.capacity,
+                    "rate": limit.rate,
+                    "period": limit.period_seconds,
+                    "now": now,
+                },
+            ).fetchone()
+            taken = [(bool(row[0]), float(row[1]))]
+        else:
+            taken = self._take_all(conn, buckets, now)
+        self._takes += 1
+        if self._takes % self.prune_every == 0:
+            self.prune(now)
+        return taken
+
+    def _take_all(
+        self,
+        conn: sqlite3.Connection,
+        buckets: Sequence[tuple[str, Limit]],
+        now: float,
+    ) -> list[tuple[bool, float]]:
+        # IMMEDIATE takes the write lock up front, so no other process
+        # changes a bucket between the reads and the writes.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = []
+            for key, limit in buckets:
+                row = conn.execute(_GET, (key,)).fetchone()
+                levels.append(
+                    float(limit.capacity)
+                    if row is None
+                    else _refill(row[0], row[1], limit, now)
+                )
+            charge = 1.0 if all(tokens >= 1.0 for tokens in levels) else 0.0
+            conn.executemany(
+                _SET,
+                [
+                    {
+                        "key": key,
+                        "tokens": tokens - charge,
+                        "now": now,
+                        "period": limit.period_seconds,
+                        "allowed": tokens >= 1.0,
+                    }
+                    for (key, limit), tokens in zip(buckets, levels, strict=True)
+                ],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return [(tokens >= 1.0, tokens - charge) for tokens in levels]
+
+    def prune(self, now: float) -> None:
+        # Each row by its own period: the store is shared by routes (and
+        # processes) with different limits.
+        self._conn().execute(
+            "DELETE FROM buckets WHERE updated_at + period < ?", (now,)
+        )
+
+
+class RateLimiter:
+    """Checks requests against token buckets in a `BucketStore`."""
+
+    def __init__(
+        self,
+        store: BucketStore,
+        *,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        # Wall-clock time: buckets in a shared store are compared across
+        # processes, which do not share a monotonic clock origin.
+        self.store = store
+        self._clock = clock
+
+    def hit(self, key: str, limit: Limit) -> Decision:
+        [decision] = self.hit_all([(key, limit)])
+        return decision
+
+    def hit_all(self, buckets: Sequence[tuple[str, Limit]]) -> list[Decision]:
+        """Charge every bucket if all allow the request, otherwise none.
+
+        The request is allowed when every decision is; the others still
+        report each bucket's own level.
+        """
+        taken = self.store.take(buckets, self._clock())
+        return [
+            Decision(
+                allowed=allowed,
+                limit=limit.capacity,
+                remaining=max(0, math.floor(tokens)),
+                reset_after=(limit.capacity - tokens) / limit.rate,
+                retry_after=0.0 if allowed else (1.0 - tokens) / limit.rate,
+            )
+            for (_, limit), (allowed, tokens) in zip(buckets, taken, strict=True)
+        ]
@@ -0,0 +1,124 @@
+"""Routing of read-only requests between the primary and a read replica.
+
+Reads go to the replica unless
+
+- the caller wrote within `read_your_writes_seconds` (their write may not
+  have been replayed yet), or
+- the replica is more than `max_lag_seconds` behind, or unreachable.
+
+The time of a caller's last write travels with the caller: successful
+writes are answered with a signed X-Last-Write stamp, which clients echo
+on later requests (see app/web/middleware.py). Whichever worker or
+instance serves the next read can check it without shared state.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import Engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.infrastructure.metrics import DB_READ_ROUTING, DB_REPLICA_LAG
+
+logger = logging.getLogger("app.db")
+
+# Zero when the replica has replayed everything it received, so an idle
+# primary does not read as lag.
+_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+def measure_lag(engine: Engine) -> float | None:
+    """Replication lag of the server behind `engine` in seconds."""
+    with engine.connect() as conn:
+        lag = conn.execute(_LAG_SQL).scalar()
+    return None if lag is None else float(lag)
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        replica: sessionmaker[Session],
+        *,
+        secret: bytes,
+        read_your_writes_seconds: float = 5.0,
+        max_lag_seconds: float = 2.0,
+        lag_check_seconds: float = 1.0,
+        lag_probe: Callable[[], float | None] | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.replica = replica
+        # A caller's write is on the replica at most max_lag_seconds later.
+        self.read_your_writes_seconds = max(read_your_writes_seconds, max_lag_seconds)
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_seconds = lag_check_seconds
+        self._secret = secret
+        self._lag_probe = lag_probe or (lambda: measure_lag(replica.kw["bind"]))
+        # Wall clock: stamps are compared across workers and instances.
+        self._clock = clock
+        self.lag: float | None = None
+        self._lag_checked_at: float | None = None
+        self._lag_lock = threading.Lock()
+
+    def _sign(self, caller: str, written_at: str) -> str:
+        message = f"{caller}:{written_at}".encode()
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()[:32]
+
+    def stamp_write(self, caller: str) -> str:
+        """X-Last-Write value for a write `caller` has just made."""
+        written_at = f"{self._clock():.3f}"
+        return f"{written_at}.{self._sign(caller, written_at)}"
+
+    def _wrote_recently(self, caller: str, stamp: str) -> bool:
+        # Signed for this caller, so it cannot be forged or borrowed to
+        # keep another caller's reads on the primary.
+        written_at, _, signature = stamp.rpartition(".")
+        if not hmac.compare_digest(signature, self._sign(caller, written_at)):
+            return False
+        try:
+            age = self._clock() - float(written_at)
+        except ValueError:
+            return False
+        return age < self.read_your_writes_seconds
+
+    def _replica_is_current(self) -> bool:
+        now = self._clock()
+        due = (
+            self._lag_checked_at is None
+            or now - self._lag_checked_at >= self.lag_check_seconds
+        )
+        # One thread measures; the others go by the last measurement.
+        if due and self._lag_lock.acquire(blocking=False):
+            try:
+                self._lag_checked_at = now
+                self.lag = self._lag_probe()
+            except Exception as exc:
+                logger.warning("read replica unavailable: %s", exc)
+                self.lag = None
+            finally:
+                self._lag_lock.release()
+            DB_REPLICA_LAG.set(-1 if self.lag is None else self.lag)
+        return self.lag is not None and self.lag <= self.max_lag_seconds
+
+    def use_replica(self, caller: str | None, last_write: str | None = None) -> bool:
+        if caller and last_write and self._wrote_recently(caller, last_write):
+            DB_READ_ROUTING.labels("primary", "own_write").inc()
+            return False
+        if not self._replica_is_current():
+            DB_READ_ROUTING.labels("primary", "lag").inc()
+            return False
+        DB_READ_ROUTING.labels("replica", "").inc()
+        return True
@@ -1,17 +1,33 @@
 from __future__ import annotations
 
+import html
 from typing import Iterable, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Text,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.orm import Session
 
 from app.application.ports.repositories import (
+    CatalogDiff,
     CheckItem,
     CheckResult,
     CheckResultRepo,
     Media,
     MediaRepo,
     Note,
+    NoteSearchHit,
+    NoteSearchPage,
     NotesRepo,
     Project,
     ProjectRepo,
@@ -22,6 +38,7 @@ from app.application.ports.repositories import (
 )
 from app.domain.entities import StageStatusValue
 from app.infrastructure.db.models import (
+    CatalogRevisionModel,
     ProjectCheckResultModel,
     ProjectMediaModel,
     ProjectModel,
@@ -32,6 +49,27 @@ from app.infrastructure.db.models import (
 )
 
 
+# Must match the config of the generated `project_notes.search_vector` column.
+_TS_CONFIG = literal_column("'simple'::regconfig", REGCONFIG)
+# ts_headline returns the body as is: it marks matches with control
+# characters (stripped from the body first), which highlight_snippet turns
+# into <mark> once the rest is HTML-escaped.
+_MARK_START, _MARK_STOP = "\x02", "\x03"
+_HEADLINE_OPTIONS = (
+    f'StartSel="{_MARK_START}", StopSel="{_MARK_STOP}", MaxWords=25, MinWords=8, '
+    "MaxFragments=2, FragmentDelimiter=\" … \""
+)
+
+
+def highlight_snippet(headline: str) -> str:
+    """HTML for a ts_headline result: escaped text, matches in <mark>."""
+    return (
+        html.escape(headline, quote=False)
+        .replace(_MARK_START, "<mark>")
+        .replace(_MARK_STOP, "</mark>")
+    )
+
+
 class SqlAlchemyProjectRepo(ProjectRepo):
     def __init__(self, session: Session) -> None:
         self._session = session
@@ -117,50 +155,114 @@ class SqlAlchemyStageRepo(StageRepo):
             for row in rows
         ]
 
-    def create_stage(self, stage: Stage) -> Stage:
-        model = StageModel(
-            id=stage.id,
-            slug=stage.slug,
-            title=stage.title,
-            short_explanation=stage.short_explanation,
-            common_mistakes=stage.common_mistakes,
-            must_document=stage.must_document,
-            order_index=stage.order_index,
-        )
-        self._session.add(model)
-        return stage
+    def list_check_items_for_stage_or_ids(
+        self, stage_ids: Iterable[str], check_ids: Iterable[str]
+    ) -> Sequence[CheckItem]:
+        rows = self._session.scalars(
+            select(StageCheckItemModel).where(
+                or_(
+                    StageCheckItemModel.stage_id.in_(list(stage_ids)),
+                    StageCheckItemModel.id.in_(list(check_ids)),
+                )
+            )
+        ).all()
+        return [
+            CheckItem(
+                id=row.id,
+                stage_id=row.stage_id,
+                title=row.title,
+                description=row.description,
+                order_index=row.order_index,
+            )
+            for row in rows
+        ]
 
-    def update_stage(self, stage: Stage) -> Stage:
-        row = self._session.get(StageModel, stage.id)
+    def get_stage(self, stage_id: str) -> Stage | None:
+        row = self._session.get(StageModel, stage_id)
         if row is None:
-            return self.create_stage(stage)
-        row.slug = stage.slug
-        row.title = stage.title
-        row.short_explanation = stage.short_explanation
-        row.common_mistakes = stage.common_mistakes
-        row.must_document = stage.must_document
-        row.order_index = stage.order_index
-        return stage
-
-    def create_check_item(self, item: CheckItem) -> CheckItem:
-        model = StageCheckItemModel(
-            id=item.id,
-            stage_id=item.stage_id,
-            title=item.title,
-            description=item.description,
-            order_index=item.order_index,
+            return None
+        return Stage(
+            id=row.id,
+            slug=row.slug,
+            title=row.title,
+            short_explanation=row.short_explanation,
+            common_mistakes=row.common_mistakes,
+            must_document=row.must_document,
+            order_index=row.order_index,
         )
-        self._session.add(model)
-        return item
 
-    def update_check_item(self, item: CheckItem) -> CheckItem:
-        row = self._session.get(StageCheckItemModel, item.id)
-        if row is None:
-            return self.create_check_item(item)
-        row.title = item.title
-        row.description = item.description
-        row.order_index = item.order_index
-        return item
+    def get_catalog_revision(self) -> int:
+        revision = self._session.scalar(
+            select(CatalogRevisionModel.revision).where(CatalogRevisionModel.id == 1)
+        )
+        return revision or 0
+
+    def apply_catalog_diff(self, diff: CatalogDiff) -> None:
+        # One statement per kind of change (executemany for row lists). Stages
+        # leaving the catalog are renamed out of the way first and deleted
+        # last, so their slugs can be reused and their check items moved to
+        # other stages before the cascade runs.
+        session = self._session
+        if diff.check_ids_to_delete:
+            session.execute(
+                delete(StageCheckItemModel)
+                .where(StageCheckItemModel.id.in_(list(diff.check_ids_to_delete)))
+                .execution_options(synchronize_session=False)
+            )
+        renamed = [*diff.renamed_stage_ids, *diff.stage_ids_to_delete]
+        if renamed:
+            session.execute(
+                update(StageModel)
+                .where(StageModel.id.in_(renamed))
+                .values(slug=literal("__renaming__:") + cast(StageModel.id, Text))
+                .execution_options(synchronize_session=False)
+            )
+        if diff.stages_to_update:
+            session.execute(
+                update(StageModel), [_stage_values(s) for s in diff.stages_to_update]
+            )
+        if diff.stages_to_insert:
+            session.execute(
+                insert(StageModel), [_stage_values(s) for s in diff.stages_to_insert]
+            )
+        if diff.checks_to_update:
+            session.execute(
+                update(StageCheckItemModel),
+                [_check_values(c) for c in diff.checks_to_update],
+            )
+        if diff.checks_to_insert:
+            session.execute(
+                insert(StageCheckItemModel),
+                [_check_values(c) for c in diff.checks_to_insert],
+            )
+        if diff.stage_ids_to_delete:
+            session.execute(
+                delete(StageModel)
+                .where(StageModel.id.in_(list(diff.stage_ids_to_delete)))
+                .execution_options(synchronize_session=False)
+            )
+
+
+def _stage_values(stage: Stage) -> dict[str, object]:
+    return {
+        "id": stage.id,
+        "slug": stage.slug,
+        "title": stage.title,
+        "short_explanation": stage.short_explanation,
+        "common_mistakes": stage.common_mistakes,
+        "must_document": stage.must_document,
+        "order_index": stage.order_index,
+    }
+
+
+def _check_values(item: CheckItem) -> dict[str, object]:
+    return {
+        "id": item.id,
+        "stage_id": item.stage_id,
+        "title": item.title,
+        "description": item.description,
+        "order_index": item.order_index,
+    }
 
 
 class SqlAlchemyStageStatusRepo(StageStatusRepo):
@@ -282,6 +384,89 @@ class SqlAlchemyNotesRepo(NotesRepo):
             for row in rows
         ]
 
+    def search(
+        self,
+        project_id: str,
+        query: str,
+        *,
+        stage_ids: Sequence[str],
+        limit: int,
+        offset: int,
+    ) -> NoteSearchPage:
+        ts_query = func.websearch_to_tsquery(_TS_CONFIG, query)
+        rank = func.ts_rank_cd(ProjectNoteModel.search_vector, ts_query)
+        conditions = [
+            ProjectNoteModel.project_id == project_id,
+            ProjectNoteModel.search_vector.op("@@")(ts_query),
+        ]
+        if stage_ids:
+            conditions.append(ProjectNoteModel.stage_id.in_(list(stage_ids)))
+
+        # Rank and paginate on the GIN-filtered ids first, so ts_headline
+        # (which re-parses the body) only runs for the rows on this page.
+        page = (
+            select(
+                ProjectNoteModel.id,
+                rank.label("rank"),
+                func.count().over().label("total"),
+            )
+            .where(*conditions)
+            .order_by(rank.desc(), ProjectNoteModel.created_at.desc())
+            .limit(limit)
+            .offset(offset)
+            .subquery()
+        )
+        rows = self._session.execute(
+            select(
+                ProjectNoteModel.id,
+                ProjectNoteModel.project_id,
+                ProjectNoteModel.stage_id,
+                ProjectNoteModel.body,
+                ProjectNoteModel.created_at,
+                page.c.rank,
+                page.c.total,
+                func.ts_headline(
+                    _TS_CONFIG,
+                    func.translate(
+                        ProjectNoteModel.body, _MARK_START + _MARK_STOP, ""
+                    ),
+                    ts_query,
+                    _HEADLINE_OPTIONS,
+                ).label("snippet"),
+            )
+            .join(page, page.c.id == ProjectNoteModel.id)
+            # Redundant with the join, but lets Postgres read only the
+            # project's partition of project_notes.
+            .where(ProjectNoteModel.project_id == project_id)
+            .order_by(page.c.rank.desc(), ProjectNoteModel.created_at.desc())
+        ).all()
+        if rows:
+            total = rows[0].total
+        elif offset:
+            # Past the last page: the window count had no row to ride on.
+            total = self._session.scalar(
+                select(func.count()).select_from(ProjectNoteModel).where(*conditions)
+            ) or 0
+        else:
+            total = 0
+        return NoteSearchPage(
+            hits=[
+                NoteSearchHit(
+                    note=Note(
+                        id=row.id,
+                        project_id=row.project_id,
+                        stage_id=row.stage_id,
+                        body=row.body,
+                        created_at=row.created_at,
+                    ),
+                    rank=float(row.rank),
+                    snippet=highlight_snippet(row.snippet),
+                )
+                for row in rows
+            ],
+            total=total,
+        )
+
 
 class SqlAlchemyMediaRepo(MediaRepo):
     def __init__(self, session: Session) -> None:
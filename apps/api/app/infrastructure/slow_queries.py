@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import FrameType
+from typing import Any
+
+from sqlalchemy import Engine, event, text
+
+from app.infrastructure.telemetry import current_route
+
+
+logger = logging.getLogger("app.slow_queries")
+
+_PLACEHOLDER = r"(?:%\(\w+\)s|\?|\$\d+)"
+_IN_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+# SELECT ... FOR UPDATE / NO KEY UPDATE / SHARE / KEY SHARE take row locks.
+_LOCKING_CLAUSE = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b", re.IGNORECASE
+)
+
+_REPO_MODULE = "app.infrastructure.repositories"
+_USE_CASE_PREFIX = "app.application.use_cases."
+
+
+def normalize_statement(statement: str) -> str:
+    """Statement with literals and IN lists collapsed, for grouping."""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _IN_LIST.sub("(?, ...)", normalized)
+    return _LITERAL.sub("?", normalized)
+
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize_statement(statement).encode()).hexdigest()[:12]
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Parameter shapes only: values can hold note bodies and user ids."""
+    if isinstance(parameters, dict):
+        return {k: redact_parameters(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(v) for v in parameters]
+    if parameters is None:
+        return None
+    if isinstance(parameters, str):
+        return f"<str:{len(parameters)}>"
+    return f"<{type(parameters).__name__}>"
+
+
+def _callers() -> tuple[str | None, str | None]:
+    """Innermost use case and repository method on the current stack."""
+    use_case: str | None = None
+    repo: str | None = None
+    frame: FrameType | None = sys._getframe(2)
+    while frame is not None and (use_case is None or repo is None):
+        module = frame.f_globals.get("__name__", "")
+        if repo is None and module == _REPO_MODULE:
+            repo = frame.f_code.co_qualname
+        elif use_case is None and module.startswith(_USE_CASE_PREFIX):
+            use_case = frame.f_code.co_qualname
+        frame = frame.f_back
+    return use_case, repo
+
+
+@dataclass
+class SlowQueryEntry:
+    fingerprint: str
+    statement: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: datetime | None = None
+    routes: Counter[str] = field(default_factory=Counter)
+    use_cases: Counter[str] = field(default_factory=Counter)
+    repo_methods: Counter[str] = field(default_factory=Counter)
+    sample_parameters: Any = None
+    explain: str | None = None
+    explained_at: datetime | None = None
+
+
+class SlowQueryLog:
+    """Engine-wide slow statement detector, aggregated by fingerprint.
+
+    Statements slower than `threshold_ms` are logged with redacted parameters
+    and tagged with the route, use case and repository method that issued
+    them. A `explain_sample_rate` fraction of slow SELECTs is re-run as
+    EXPLAIN (ANALYZE, BUFFERS) on a separate connection in a background
+    thread (Postgres only), so the request itself is not slowed further.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold_ms: float,
+        explain_sample_rate: float = 0.0,
+        explain_timeout_ms: int = 5000,
+        max_entries: int = 500,
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_timeout_ms = explain_timeout_ms
+        self.max_entries = max_entries
+        self._entries: dict[str, SlowQueryEntry] = {}
+        self._lock = threading.Lock()
+        self._explainer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="explain"
+        )
+        self._explain_pending = threading.BoundedSemaphore(4)
+        self._explaining = threading.local()
+        self._installed = False
+
+    def install(self) -> None:
+        if not self._installed:
+            event.listen(Engine, "before_cursor_execute", self._before)
+            event.listen(Engine, "after_cursor_execute", self._after)
+            event.listen(Engine, "handle_error", self._handle_error)
+            self._installed = True
+
+    def uninstall(self) -> None:
+        if self._installed:
+            event.remove(Engine, "before_cursor_execute", self._before)
+            event.remove(Engine, "after_cursor_execute", self._after)
+            event.remove(Engine, "handle_error", self._handle_error)
+            self._installed = False
+
+    def entries(self) -> list[SlowQueryEntry]:
+        with self._lock:
+            return sorted(
+                self._entries.values(), key=lambda e: e.total_ms, reverse=True
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _before(self, conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    def _after(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        started = conn.info.get("slow_query_started")
+        if not started:
+            return
+        elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+        if elapsed_ms < self.threshold_ms or getattr(
+            self._explaining, "active", False
+        ):
+            return
+        self.record(conn, statement, parameters, elapsed_ms, executemany)
+
+    def _handle_error(self, context: Any) -> None:
+        # after_cursor_execute does not fire for failed statements.
+        conn = context.connection
+        started = conn.info.get("slow_query_started") if conn is not None else None
+        if started:
+            started.pop()
+
+    def record(
+        self,
+        conn: Any,
+        statement: str,
+        parameters: Any,
+        elapsed_ms: float,
+        executemany: bool = False,
+    ) -> None:
+        key = fingerprint(statement)
+        route = current_route()
+        use_case, repo = _callers()
+        redacted = redact_parameters(parameters)
+        logger.warning(
+            "slow query fingerprint=%s duration_ms=%.1f route=%s use_case=%s "
+            "repo=%s params=%s statement=%s",
+            key,
+            elapsed_ms,
+            route,
+            use_case,
+            repo,
+            redacted,
+            normalize_statement(statement)[:500],
+        )
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    cheapest = min(self._entries.values(), key=lambda e: e.total_ms)
+                    del self._entries[cheapest.fingerprint]
+                entry = SlowQueryEntry(
+                    fingerprint=key, statement=normalize_statement(statement)
+                )
+                self._entries[key] = entry
+            entry.count += 1
+            entry.total_ms += elapsed_ms
+            entry.max_ms = max(entry.max_ms, elapsed_ms)
+            entry.last_seen = datetime.now(timezone.utc)
+            entry.sample_parameters = redacted
+            if route:
+                entry.routes[route] += 1
+            if use_case:
+                entry.use_cases[use_case] += 1
+            if repo:
+                entry.repo_methods[repo] += 1
+
+        if self._should_explain(conn, statement, executemany):
+            self._explainer.submit(
+                self._explain, conn.engine, key, statement, parameters
+            )
+
+    def _should_explain(self, conn: Any, statement: str, executemany: bool) -> bool:
+        # EXPLAIN ANALYZE executes the statement: never for writes or locks.
+        if executemany or conn.engine.dialect.name != "postgresql":
+            return False
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return False
+        if _LOCKING_CLAUSE.search(statement):
+            return False
+        if random.random() >= self.explain_sample_rate:
+            return False
+        return self._explain_pending.acquire(blocking=False)
+
+    def _explain(
+        self, engine: Engine, key: str, statement: str, parameters: Any
+    ) -> None:
+        self._explaining.active = True
+        try:
+            with engine.connect() as side:
+                with side.begin() as tx:
+                    side.execute(
+                        text(f"SET LOCAL statement_timeout = {self.explain_timeout_ms}")
+                    )
+                    plan = side.exec_driver_sql(
+                        "EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters
+                    ).scalars()
+                    explain = "\n".join(plan)
+                    tx.rollback()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.explain = explain
+                    entry.explained_at = datetime.now(timezone.utc)
+        except Exception:
+            logger.exception("EXPLAIN failed for slow query %s", key)
+        finally:
+            self._explaining.active = False
+            self._explain_pending.release()
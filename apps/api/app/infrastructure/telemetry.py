@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, MutableMapping
+
+from sqlalchemy import Engine, event
+
+
+@dataclass
+class RequestStats:
+    """SQL activity attributed to one request (or one `track_queries` block)."""
+
+    statements: int = 0
+    db_seconds: float = 0.0
+    # Time spent in other ports ("ai", "storage") via `timed()`.
+    timings: dict[str, float] = field(default_factory=dict)
+    sql: list[str] = field(default_factory=list)
+    keep_sql: bool = False
+    # Enclosing block (e.g. a test wrapping a request); it sees the same counts.
+    parent: RequestStats | None = None
+    # ASGI scope of the request; the router adds the matched route to it.
+    scope: MutableMapping[str, Any] | None = None
+
+    def record(self, seconds: float, statement: str | None) -> None:
+        stats: RequestStats | None = self
+        while stats is not None:
+            stats.statements += 1
+            stats.db_seconds += seconds
+            if stats.keep_sql and statement is not None:
+                stats.sql.append(statement)
+            stats = stats.parent
+
+    def add_time(self, category: str, seconds: float) -> None:
+        stats: RequestStats | None = self
+        while stats is not None:
+            stats.timings[category] = stats.timings.get(category, 0.0) + seconds
+            stats = stats.parent
+
+
+# Starlette copies the context into the threadpool that runs sync endpoints,
+# so statements executed there land on the same RequestStats object.
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> RequestStats | None:
+    return _current.get()
+
+
+def current_route() -> str | None:
+    """Route template (or raw path before routing) of the current request."""
+    stats = _current.get()
+    while stats is not None:
+        if stats.scope is not None:
+            route = stats.scope.get("route")
+            return getattr(route, "path", None) or stats.scope.get("path")
+        stats = stats.parent
+    return None
+
+
+@contextmanager
+def track_queries(*, keep_sql: bool = False) -> Iterator[RequestStats]:
+    stats = RequestStats(keep_sql=keep_sql, parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(category: str) -> Iterator[None]:
+    """Add the block's duration to `category` of the current request, if any."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_time(category, time.perf_counter() - started)
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, *args: Any
+) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, *args: Any
+) -> None:
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started")
+    seconds = time.perf_counter() - started.pop() if started else 0.0
+    stats.record(seconds, statement)
+
+
+def _handle_error(context: Any) -> None:
+    # after_cursor_execute does not fire for failed statements.
+    stats = _current.get()
+    conn = context.connection
+    if stats is None or conn is None:
+        return
+    started = conn.info.get("query_started")
+    seconds = time.perf_counter() - started.pop() if started else 0.0
+    stats.record(seconds, context.statement)
+
+
+def install_query_tracking() -> None:
+    """Attach the counters to every Engine; idempotent."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
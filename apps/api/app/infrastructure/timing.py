@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from app.application.ports.ai import AIClient
+from app.application.ports.media import MediaStorage
+from app.infrastructure.metrics import AI_ERRORS, AI_LATENCY
+from app.infrastructure.telemetry import timed
+
+
+class TimedAIClient(AIClient):
+    """Reports AI provider time as the "ai" Server-Timing entry and metrics."""
+
+    def __init__(self, inner: AIClient) -> None:
+        self._inner = inner
+
+    def ask(
+        self,
+        *,
+        question: str,
+        project_context: str,
+        stage_context: str | None,
+    ) -> str:
+        with timed("ai"), AI_LATENCY.time():
+            try:
+                return self._inner.ask(
+                    question=question,
+                    project_context=project_context,
+                    stage_context=stage_context,
+                )
+            except Exception:
+                AI_ERRORS.inc()
+                raise
+
+
+class TimedMediaStorage(MediaStorage):
+    """Reports time spent presigning uploads as the "storage" entry."""
+
+    def __init__(self, inner: MediaStorage) -> None:
+        self._inner = inner
+
+    def create_presigned_upload(
+        self,
+        *,
+        project_id: str,
+        key: str,
+        content_type: str,
+    ) -> str:
+        with timed("storage"):
+            return self._inner.create_presigned_upload(
+                project_id=project_id, key=key, content_type=content_type
+            )
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from typing import Callable
+
+from sqlalchemy import Engine, text
+
+logger = logging.getLogger("app.warmup")
+
+
+class Readiness:
+    """Whether this worker has finished warming up; backs GET /readyz.
+
+    Liveness (/health) only says the process answers. Readiness also needs
+    open database connections and a loaded catalog, so a load balancer does
+    not route traffic to a worker that would serve it cold.
+
+    The state is per worker: a probe is answered by whichever worker accepts
+    it, so the container reports ready once that one is warm, while its
+    siblings may still be warming up (they start together after the fork).
+    """
+
+    def __init__(self) -> None:
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self.state = "starting"
+        self.error: str | None = None
+        self.warmup_seconds: float | None = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def mark_ready(self, warmup_seconds: float) -> None:
+        with self._lock:
+            self.state = "ready"
+            self.error = None
+            self.warmup_seconds = warmup_seconds
+        self._ready.set()
+
+    def mark_failed(self, error: str) -> None:
+        with self._lock:
+            self.state = "warming"
+            self.error = error
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+
+def warm_pool(engine: Engine, connections: int) -> None:
+    """Open up to `connections` pooled connections at once and park them.
+
+    They are held together so the pool really opens that many; returned to
+    a QueuePool they stay open for the first requests.
+    """
+    with ExitStack() as stack:
+        for _ in range(connections):
+            conn = stack.enter_context(engine.connect())
+            conn.execute(text("SELECT 1"))
+
+
+def run_warmup(
+    readiness: Readiness,
+    steps: list[Callable[[], None]],
+    *,
+    max_backoff: float = 30.0,
+) -> None:
+    """Run `steps` until they all succeed, then mark the worker ready."""
+    started = time.perf_counter()
+    attempt = 0
+    while True:
+        try:
+            for step in steps:
+                step()
+        except Exception as exc:
+            attempt += 1
+            readiness.mark_failed(f"{type(exc).__name__}: {exc}")
+            delay = min(max_backoff, 0.5 * 2**attempt)
+            logger.warning(
+                "warm-up failed (attempt %d), retrying in %.1fs: %s",
+                attempt,
+                delay,
+                exc,
+            )
+            time.sleep(delay)
+            continue
+        elapsed = time.perf_counter() - started
+        readiness.mark_ready(elapsed)
+        logger.info("worker ready after %.2fs warm-up", elapsed)
+        return
+
+
+def start_warmup(readiness: Readiness, steps: list[Callable[[], None]]) -> None:
+    threading.Thread(
+        target=run_warmup, args=(readiness, steps), name="warmup", daemon=True
+    ).start()
@@ -1,4 +1,7 @@
-from fastapi import FastAPI
+import os
+from typing import Annotated
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.web.projects import router as projects_router
@@ -6,11 +9,66 @@ from app.web.stages import router as stages_router
 from app.web.admin import router as admin_router
 from app.web.notes import router as notes_router
 from app.web.checks import router as checks_router
+from app.web.bootstrap import router as bootstrap_router
+from app.infrastructure.warmup import Readiness
+from app.web.dependencies import (
+    caller_key,
+    get_admin_token,
+    get_current_user_id,
+    get_idempotency_store,
+    get_profile_store,
+    get_readiness,
+    get_replica_router,
+    get_slow_query_log,
+    get_token_verifier,
+)
+from app.web.lifecycle import lifespan
 from app.web.media import router as media_router
+from app.web.metrics import router as metrics_router
+from app.web.compression import CompressionMiddleware
+from app.web.idempotency import IdempotencyMiddleware
+from app.web.responses import FastJSONResponse
+from app.web.middleware import (
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    ReadYourWritesMiddleware,
+    RequestStatsMiddleware,
+)
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Constructure API", version="0.1.0")
+    app = FastAPI(
+        title="Constructure API",
+        version="0.1.0",
+        default_response_class=FastJSONResponse,
+        lifespan=lifespan,
+    )
+
+    # Idempotency-Key on POSTs; innermost, so it stores uncompressed bodies
+    # and replays are compressed for the retry's own Accept-Encoding
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=get_idempotency_store,
+        user_id=lambda authorization: get_current_user_id(
+            authorization, get_token_verifier()
+        ),
+        wait_seconds=float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10")),
+    )
+
+    # X-Last-Write on successful writes, replays included; with a read
+    # replica, clients echo it to read their own writes from the primary.
+    # Built here so a replica configured without its secret fails at startup
+    get_replica_router()
+    app.add_middleware(
+        ReadYourWritesMiddleware, router=get_replica_router, caller=caller_key
+    )
+
+    # Inside everything else, so request timings and metrics include
+    # compression time
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.getenv("COMPRESSION_MIN_BYTES", "1024")),
+    )
 
     # CORS for local admin & mobile apps (dev)
     app.add_middleware(
@@ -25,18 +83,58 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Last-Write"],
     )
 
+    # Per-request DB/AI/storage timings are always logged; the response
+    # headers are opt-in (X-DB-* in debug, Server-Timing via SERVER_TIMING)
+    debug = os.getenv("API_DEBUG", "").lower() in {"1", "true", "yes"}
+    app.add_middleware(
+        RequestStatsMiddleware,
+        debug_headers=debug,
+        server_timing=debug
+        or os.getenv("SERVER_TIMING", "").lower() in {"1", "true", "yes"},
+        warn_statements=int(os.getenv("SQL_WARN_STATEMENTS", "25")),
+    )
+    app.add_middleware(MetricsMiddleware)
+    # X-Profile + X-Admin-Token profiles one request; see /admin/profiles
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=get_profile_store(),
+        check_admin_token=get_admin_token,
+    )
+
+    slow_queries = get_slow_query_log()
+    if slow_queries is not None:
+        slow_queries.install()
+
     @app.get("/health", tags=["health"])
     async def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    # Liveness is /health; /readyz is 503 until the worker that answers it
+    # has warmed up (per worker, not for the whole container)
+    @app.get("/readyz", tags=["health"])
+    async def readyz(
+        readiness: Annotated[Readiness, Depends(get_readiness)],
+    ) -> FastJSONResponse:
+        return FastJSONResponse(
+            {
+                "status": readiness.state,
+                "error": readiness.error,
+                "warmup_seconds": readiness.warmup_seconds,
+            },
+            status_code=200 if readiness.is_ready else 503,
+        )
+
     app.include_router(projects_router)
     app.include_router(stages_router)
     app.include_router(admin_router)
     app.include_router(notes_router)
     app.include_router(checks_router)
     app.include_router(media_router)
+    app.include_router(bootstrap_router)
+    app.include_router(metrics_router)
 
     return app
 
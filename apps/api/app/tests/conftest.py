@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from contextlib import AbstractContextManager, contextmanager
+from typing import Callable, Iterator
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.infrastructure.access_cache import ProjectAccessCache
+from app.infrastructure.catalog_cache import CatalogCache
+from app.infrastructure.db.models import Base
+from app.infrastructure.telemetry import (
+    RequestStats,
+    install_query_tracking,
+    track_queries,
+)
+from app.main import create_app
+from app.web.dependencies import (
+    get_catalog_cache,
+    get_db_session,
+    get_project_access_cache,
+)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers", "tables(*names): tables the `engine` fixture creates"
+    )
+
+
+@pytest.fixture
+def engine(request: pytest.FixtureRequest) -> Iterator[Engine]:
+    """In-memory SQLite with the catalog tables, or those of `@pytest.mark.tables`.
+
+    Endpoints run in the threadpool; StaticPool shares the one connection.
+    """
+    marker = request.node.get_closest_marker("tables")
+    names = marker.args if marker else ("stages", "stage_check_items")
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(
+        engine, tables=[Base.metadata.tables[name] for name in names]
+    )
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def api_app(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> FastAPI:
+    """The app on the `engine` fixture, in debug, with ADMIN_TOKEN "admin-secret".
+
+    The catalog cache lasts for the test; project access is not cached.
+    """
+    monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+    monkeypatch.setenv("API_DEBUG", "1")
+    app = create_app()
+
+    def session() -> Iterator[Session]:
+        with Session(engine) as s:
+            yield s
+            s.commit()
+
+    catalog = CatalogCache(60)
+    app.dependency_overrides[get_db_session] = session
+    app.dependency_overrides[get_catalog_cache] = lambda: catalog
+    app.dependency_overrides[get_project_access_cache] = lambda: ProjectAccessCache(
+        ttl_seconds=0
+    )
+    return app
+
+
+@pytest.fixture
+def assert_max_queries() -> Callable[[int], AbstractContextManager[RequestStats]]:
+    """`with assert_max_queries(3): client.get(...)` fails on N+1 regressions.
+
+    Counts every SQL statement issued inside the block, including those of
+    requests made through TestClient.
+    """
+    install_query_tracking()
+
+    @contextmanager
+    def check(limit: int) -> Iterator[RequestStats]:
+        with track_queries(keep_sql=True) as stats:
+            yield stats
+        assert stats.statements <= limit, (
+            f"{stats.statements} SQL statements, expected at most {limit}:\n"
+            + "\n".join(stats.sql)
+        )
+
+    return check
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Sequence
+
+from app.application.ports.repositories import NoteSearchHit, NoteSearchPage
+from app.application.use_cases.checks_notes_media import (
+    AddNote,
+    AddNoteInput,
+    ListNotesForProject,
+    ListNotesForProjectInput,
+)
+from app.domain.entities import Note, Project
+from app.infrastructure.access_cache import CachedProjectRepo, ProjectAccessCache
+
+
+class CountingProjectRepo:
+    def __init__(self, *projects: Project) -> None:
+        self.items = list(projects)
+        self.checks = 0
+
+    def list_for_owner(self, owner_user_id: str) -> list[Project]:
+        return [p for p in self.items if p.owner_user_id == owner_user_id]
+
+    def create(self, project: Project) -> Project:
+        self.items.append(project)
+        return project
+
+    def get_by_id_for_owner(
+        self, project_id: str, owner_user_id: str
+    ) -> Project | None:
+        self.checks += 1
+        for p in self.items:
+            if p.id == project_id and p.owner_user_id == owner_user_id:
+                return p
+        return None
+
+
+class InMemoryNotesRepo:
+    def __init__(self) -> None:
+        self.items: list[Note] = []
+
+    def add(self, note: Note) -> Note:
+        self.items.append(note)
+        return note
+
+    def list_for_project(self, project_id: str) -> list[Note]:
+        return [n for n in self.items if n.project_id == project_id]
+
+    def search(
+        self,
+        project_id: str,
+        query: str,
+        *,
+        stage_ids: Sequence[str],
+        limit: int,
+        offset: int,
+    ) -> NoteSearchPage:
+        # Substring match is enough here; ranking is Postgres's business.
+        matches = [
+            n
+            for n in self.list_for_project(project_id)
+            if query.casefold() in n.body.casefold()
+            and (not stage_ids or n.stage_id in stage_ids)
+        ]
+        return NoteSearchPage(
+            hits=[
+                NoteSearchHit(note=n, rank=1.0, snippet=n.body)
+                for n in matches[offset : offset + limit]
+            ],
+            total=len(matches),
+        )
+
+
+def _project(project_id: str = "p1", owner: str = "u1") -> Project:
+    return Project(project_id, owner, "בית", None, datetime.now(timezone.utc))
+
+
+def test_use_cases_in_one_request_check_access_once() -> None:
+    db = CountingProjectRepo(_project())
+    # ttl 0: no shared cache, only the per-request memo.
+    repo = CachedProjectRepo(db, ProjectAccessCache(ttl_seconds=0))
+    notes = InMemoryNotesRepo()
+
+    AddNote(repo, notes).execute(AddNoteInput("u1", "p1", None, "יציקה"))
+    listed = ListNotesForProject(repo, notes).execute(
+        ListNotesForProjectInput("u1", "p1")
+    )
+
+    assert len(listed) == 1
+    assert db.checks == 1
+
+
+def test_grants_are_shared_across_requests_until_ttl() -> None:
+    now = [0.0]
+    db = CountingProjectRepo(_project())
+    access = ProjectAccessCache(ttl_seconds=30, clock=lambda: now[0])
+
+    for _ in range(3):
+        assert CachedProjectRepo(db, access).get_by_id_for_owner("p1", "u1")
+    assert db.checks == 1
+
+    now[0] += 31
+    CachedProjectRepo(db, access).get_by_id_for_owner("p1", "u1")
+    assert db.checks == 2
+
+
+def test_denials_are_not_cached_and_owner_must_match() -> None:
+    db = CountingProjectRepo()
+    access = ProjectAccessCache(ttl_seconds=30)
+
+    assert CachedProjectRepo(db, access).get_by_id_for_owner("p1", "u1") is None
+    db.create(_project())
+    assert CachedProjectRepo(db, access).get_by_id_for_owner("p1", "u1") is not None
+    assert CachedProjectRepo(db, access).get_by_id_for_owner("p1", "u2") is None
+    assert db.checks == 3
+
+
+def test_invalidation_and_size_bound() -> None:
+    db = CountingProjectRepo(_project("p1"), _project("p2"), _project("p3"))
+    access = ProjectAccessCache(ttl_seconds=30, max_entries=2)
+    for project_id in ("p1", "p2", "p3"):
+        CachedProjectRepo(db, access).get_by_id_for_owner(project_id, "u1")
+
+    # Ownership moved: the old grant must not survive.
+    db.items[1] = _project("p2", owner="u2")
+    access.invalidate_project("p2")
+
+    assert access.get("p1", "u1") is None  # evicted, least recently used
+    assert access.get("p2", "u1") is None
+    assert access.get("p3", "u1") is not None
+    assert CachedProjectRepo(db, access).get_by_id_for_owner("p2", "u1") is None
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+from contextlib import AbstractContextManager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterator, Sequence
+
+import pytest
+from sqlalchemy import Engine, create_engine, event, func, insert, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.application.ports.repositories import MediaRepo
+from app.domain.entities import CheckResult, Media, Note, StageStatusValue
+from app.infrastructure.archive import (
+    ArchiveAwareCheckResultRepo,
+    ArchiveAwareMediaRepo,
+    ArchiveAwareNotesRepo,
+    ArchiveAwareStageStatusRepo,
+    SqlAlchemyProjectArchiveRepo,
+    search_snapshot_notes,
+)
+from app.infrastructure.db.archive_projects import archive_inactive_projects
+from app.infrastructure.db.models import (
+    Base,
+    ProjectArchiveModel,
+    ProjectCheckResultModel,
+    ProjectMediaModel,
+    ProjectModel,
+    ProjectNoteModel,
+    ProjectStageStatusModel,
+    StageCheckItemModel,
+    StageModel,
+)
+from app.infrastructure.repositories import (
+    SqlAlchemyCheckResultRepo,
+    SqlAlchemyMediaRepo,
+    SqlAlchemyNotesRepo,
+    SqlAlchemyStageStatusRepo,
+)
+from app.infrastructure.telemetry import RequestStats
+
+MaxQueries = Callable[[int], AbstractContextManager[RequestStats]]
+
+NOW = datetime.now(timezone.utc)
+OLD = NOW - timedelta(days=400)
+IDLE_SINCE = NOW - timedelta(days=180)
+STAGE = "aaaaaaaa-0000-0000-0000-000000000001"
+CHECK = "cccccccc-0000-0000-0000-000000000001"
+
+
+class EmptyMediaRepo(MediaRepo):
+    """A stage with no media yet."""
+
+    def add(self, media: Media) -> Media:
+        return media
+
+    def list_for_project(self, project_id: str) -> Sequence[Media]:
+        return []
+
+
+@compiles(TSVECTOR, "sqlite")
+def _tsvector_as_text(*args: Any, **kwargs: Any) -> str:
+    return "TEXT"
+
+
+@pytest.fixture
+def session_factory() -> Iterator[sessionmaker[Session]]:
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection: Any, record: Any) -> None:
+        # Stands in for the function behind project_notes.search_vector.
+        dbapi_connection.create_function(
+            "to_tsvector", 2, lambda config, body: body, deterministic=True
+        )
+
+    Base.metadata.create_all(engine)
+    _load(engine)
+    yield sessionmaker(bind=engine, class_=Session, expire_on_commit=False)
+    engine.dispose()
+
+
+def _project_id(n: int) -> str:
+    return f"bbbbbbbb-0000-0000-0000-{n:012x}"
+
+
+def _load(engine: Engine) -> None:
+    # Project 1 is idle, project 2 had a note this week, project 3 is empty.
+    with Session(engine) as session:
+        session.execute(
+            insert(StageModel),
+            [
+                {
+                    "id": STAGE,
+                    "slug": "foundations",
+                    "title": "Foundations",
+                    "short_explanation": "",
+                    "common_mistakes": "",
+                    "must_document": "",
+                    "order_index": 1,
+                }
+            ],
+        )
+        session.execute(
+            insert(StageCheckItemModel),
+            [{"id": CHECK, "stage_id": STAGE, "title": "Rebar", "order_index": 1}],
+        )
+        session.execute(
+            insert(ProjectModel),
+            [
+                {
+                    "id": _project_id(n),
+                    "owner_user_id": "u1",
+                    "name": f"Project {n}",
+                    "created_at": OLD,
+                }
+                for n in (1, 2, 3)
+            ],
+        )
+        for n in (1, 2):
+            session.execute(
+                insert(ProjectStageStatusModel),
+                [
+                    {
+                        "id": f"dddddddd-0000-0000-0000-{n:012x}",
+                        "project_id": _project_id(n),
+                        "stage_id": STAGE,
+                        "status": "done",
+                        "updated_at": OLD,
+                    }
+                ],
+            )
+            session.execute(
+                insert(ProjectCheckResultModel),
+                [
+                    {
+                        "id": f"eeeeeeee-0000-0000-0000-{n:012x}",
+                        "project_id": _project_id(n),
+                        "check_item_id": CHECK,
+                        "is_done": True,
+                        "note": "checked",
+                        "updated_at": OLD,
+                    }
+                ],
+            )
+            session.execute(
+                insert(ProjectNoteModel),
+                [
+                    {
+                        "id": f"ffffffff-0000-0000-{i:04x}-{n:012x}",
+                        "project_id": _project_id(n),
+                        "stage_id": STAGE,
+                        "body": body,
+                        "created_at": OLD + timedelta(minutes=i),
+                    }
+                    for i, body in enumerate(
+                        ["poured the concrete today", "concrete invoice paid"]
+                    )
+                ],
+            )
+            session.execute(
+                insert(ProjectMediaModel),
+                [
+                    {
+                        "id": f"abababab-0000-0000-0000-{n:012x}",
+                        "project_id": _project_id(n),
+                        "stage_id": STAGE,
+                        "storage_path": f"{n}/photo.jpg",
+                        "caption": None,
+                        "taken_at": None,
+                        "created_at": OLD,
+                    }
+                ],
+            )
+        session.execute(
+            insert(ProjectNoteModel),
+            [
+                {
+                    "id": "ffffffff-0000-0000-ffff-000000000002",
+                    "project_id": _project_id(2),
+                    "stage_id": None,
+                    "body": "recent",
+                    "created_at": NOW,
+                }
+            ],
+        )
+        session.commit()
+
+
+def _hot_rows(session: Session, project_id: str) -> int:
+    return sum(
+        session.scalar(
+            select(func.count()).where(model.project_id == project_id)
+        )
+        or 0
+        for model in (
+            ProjectStageStatusModel,
+            ProjectCheckResultModel,
+            ProjectNoteModel,
+            ProjectMediaModel,
+        )
+    )
+
+
+def test_only_idle_projects_with_rows_are_archived(
+    session_factory: sessionmaker[Session],
+) -> None:
+    run = archive_inactive_projects(session_factory, idle_since=IDLE_SINCE)
+
+    assert (run.projects, run.rows) == (1, 5)
+    with session_factory() as session:
+        assert session.scalars(select(ProjectArchiveModel.project_id)).all() == [
+            _project_id(1)
+        ]
+        assert _hot_rows(session, _project_id(1)) == 0
+        assert _hot_rows(session, _project_id(2)) == 6
+
+
+def test_archived_project_is_read_from_its_snapshot(
+    session_factory: sessionmaker[Session],
+) -> None:
+    archive_inactive_projects(session_factory, idle_since=IDLE_SINCE)
+    project_id = _project_id(1)
+
+    with session_factory() as session:
+        archive = SqlAlchemyProjectArchiveRepo(session)
+        statuses = ArchiveAwareStageStatusRepo(
+            SqlAlchemyStageStatusRepo(session), archive
+        ).get_for_project(project_id)
+        results = ArchiveAwareCheckResultRepo(
+            SqlAlchemyCheckResultRepo(session), archive
+        ).get_for_project(project_id)
+        notes_repo = ArchiveAwareNotesRepo(SqlAlchemyNotesRepo(session), archive)
+        media = ArchiveAwareMediaRepo(
+            SqlAlchemyMediaRepo(session), archive
+        ).list_for_project(project_id)
+
+        assert [s.status for s in statuses] == [StageStatusValue.DONE]
+        assert [(r.is_done, r.note) for r in results] == [(True, "checked")]
+        assert [n.body for n in notes_repo.list_for_project(project_id)] == [
+            "poured the concrete today",
+            "concrete invoice paid",
+        ]
+        assert [m.storage_path for m in media] == ["1/photo.jpg"]
+        assert media[0].created_at.replace(tzinfo=None) == OLD.replace(tzinfo=None)
+
+        # Search itself needs Postgres; this is its fallback for snapshots.
+        snapshot = archive.get(project_id)
+        assert snapshot is not None
+        page = search_snapshot_notes(
+            snapshot.notes,
+            "concrete -invoice",
+            stage_ids=[],
+            limit=10,
+            offset=0,
+        )
+        assert page.total == 1
+        assert page.hits[0].snippet == "poured the <mark>concrete</mark> today"
+
+
+def test_first_write_restores_the_project(
+    session_factory: sessionmaker[Session],
+) -> None:
+    archive_inactive_projects(session_factory, idle_since=IDLE_SINCE)
+    project_id = _project_id(1)
+
+    with session_factory() as session:
+        archive = SqlAlchemyProjectArchiveRepo(session)
+        notes = ArchiveAwareNotesRepo(SqlAlchemyNotesRepo(session), archive)
+        results = ArchiveAwareCheckResultRepo(
+            SqlAlchemyCheckResultRepo(session), archive
+        )
+        notes.add(
+            Note(
+                id="ffffffff-0000-0000-aaaa-000000000001",
+                project_id=project_id,
+                stage_id=None,
+                body="back on site",
+                created_at=NOW,
+            )
+        )
+        results.upsert(
+            CheckResult(
+                id="eeeeeeee-0000-0000-aaaa-000000000001",
+                project_id=project_id,
+                check_item_id=CHECK,
+                is_done=False,
+                note=None,
+                updated_at=NOW,
+            )
+        )
+        session.commit()
+
+    with session_factory() as session:
+        assert session.get(ProjectArchiveModel, project_id) is None
+        assert _hot_rows(session, project_id) == 6
+        restored = SqlAlchemyCheckResultRepo(session).get_for_project(project_id)
+        assert [(r.id, r.is_done) for r in restored] == [
+            ("eeeeeeee-0000-0000-0000-000000000001", False)
+        ]
+
+
+def test_snapshot_snippets_are_escaped() -> None:
+    note = Note(
+        id="ffffffff-0000-0000-bbbb-000000000001",
+        project_id=_project_id(1),
+        stage_id=None,
+        body="concrete <b>&</b> <script>",
+        created_at=NOW,
+    )
+    page = search_snapshot_notes([note], "concrete", stage_ids=[], limit=10, offset=0)
+    assert page.hits[0].snippet == (
+        "<mark>concrete</mark> &lt;b&gt;&amp;&lt;/b&gt; &lt;script&gt;"
+    )
+
+
+def test_active_project_is_not_looked_up_once_a_read_found_rows(
+    session_factory: sessionmaker[Session],
+    assert_max_queries: MaxQueries,
+) -> None:
+    project_id = _project_id(2)
+
+    with session_factory() as session:
+        archive = SqlAlchemyProjectArchiveRepo(session)
+        statuses = ArchiveAwareStageStatusRepo(
+            SqlAlchemyStageStatusRepo(session), archive
+        )
+        media = ArchiveAwareMediaRepo(EmptyMediaRepo(), archive)
+
+        assert statuses.get_for_project(project_id)
+        with assert_max_queries(0):
+            assert media.list_for_project(project_id) == []
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from contextlib import AbstractContextManager
+from datetime import datetime, timezone
+from typing import Callable
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, insert
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import (
+    ProjectCheckResultModel,
+    ProjectModel,
+    ProjectStageStatusModel,
+    StageCheckItemModel,
+    StageModel,
+)
+from app.infrastructure.telemetry import RequestStats
+
+MaxQueries = Callable[[int], AbstractContextManager[RequestStats]]
+PROJECT = "bbbbbbbb-0000-0000-0000-000000000001"
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+pytestmark = pytest.mark.tables(
+    "projects",
+    "stages",
+    "stage_check_items",
+    "catalog_revision",
+    "project_stage_status",
+    "project_check_results",
+    "project_archives",
+)
+
+
+def _stage_id(i: int) -> str:
+    return f"aaaaaaaa-0000-0000-0000-{i:012x}"
+
+
+def _load(engine: Engine, stages: int) -> None:
+    # Every stage has two checks; the project finished the first of each.
+    with Session(engine) as session:
+        session.execute(
+            insert(StageModel),
+            [
+                {
+                    "id": _stage_id(i),
+                    "slug": f"stage-{i}",
+                    "title": f"Stage {i}",
+                    "short_explanation": "long text " * 50,
+                    "common_mistakes": "",
+                    "must_document": "",
+                    "order_index": i,
+                }
+                for i in range(stages)
+            ],
+        )
+        session.execute(
+            insert(StageCheckItemModel),
+            [
+                {
+                    "id": f"cccccccc-0000-0000-{i:04x}-{j:012x}",
+                    "stage_id": _stage_id(i),
+                    "title": f"Check {j}",
+                    "order_index": j,
+                }
+                for i in range(stages)
+                for j in range(2)
+            ],
+        )
+        session.execute(
+            insert(ProjectModel),
+            [
+                {
+                    "id": PROJECT,
+                    "owner_user_id": "u1",
+                    "name": "House",
+                    "created_at": NOW,
+                }
+            ],
+        )
+        session.execute(
+            insert(ProjectStageStatusModel),
+            [
+                {
+                    "id": f"dddddddd-0000-0000-0000-{i:012x}",
+                    "project_id": PROJECT,
+                    "stage_id": _stage_id(i),
+                    "status": "in_progress",
+                    "updated_at": NOW,
+                }
+                for i in range(stages)
+            ],
+        )
+        session.execute(
+            insert(ProjectCheckResultModel),
+            [
+                {
+                    "id": f"eeeeeeee-0000-0000-0000-{i:012x}",
+                    "project_id": PROJECT,
+                    "check_item_id": f"cccccccc-0000-0000-{i:04x}-{0:012x}",
+                    "is_done": True,
+                    "note": None,
+                    "updated_at": NOW,
+                }
+                for i in range(stages)
+            ],
+        )
+        session.commit()
+
+
+@pytest.mark.parametrize("stages", [3, 60])
+def test_bootstrap_queries_do_not_scale_with_catalog_size(
+    engine: Engine, api_app: FastAPI, assert_max_queries: MaxQueries, stages: int
+) -> None:
+    _load(engine, stages)
+    client = TestClient(api_app, headers={"Authorization": "Bearer u1"})
+    client.get("/bootstrap")  # loads the catalog cache
+
+    with assert_max_queries(3):
+        response = client.get("/bootstrap", params={"project_id": PROJECT})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [p["id"] for p in body["projects"]] == [PROJECT]
+    assert len(body["stages"]) == len(body["progress"]) == stages
+    assert body["progress"][0] == {
+        "stage_id": _stage_id(0),
+        "status": "in_progress",
+        "checks_done": 1,
+        "checks_total": 2,
+        "updated_at": "2026-01-01T00:00:00",
+    }
+
+
+def test_bootstrap_field_selection(engine: Engine, api_app: FastAPI) -> None:
+    _load(engine, 2)
+    client = TestClient(api_app, headers={"Authorization": "Bearer u1"})
+
+    response = client.get(
+        "/bootstrap", params={"include": "stages", "stage_fields": "title"}
+    )
+    assert response.json() == {
+        "catalog_revision": 0,
+        "stages": [
+            {"id": _stage_id(0), "title": "Stage 0"},
+            {"id": _stage_id(1), "title": "Stage 1"},
+        ],
+    }
+
+    assert client.get("/bootstrap", params={"stage_fields": "body"}).status_code == 422
+    other = client.get(
+        "/bootstrap",
+        params={"project_id": PROJECT},
+        headers={"Authorization": "Bearer u2"},
+    )
+    assert other.status_code == 403
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from app.application.use_cases.admin_catalog import (
+    CatalogCheckItemInput,
+    CatalogStageInput,
+    ImportCatalog,
+    ImportCatalogInput,
+    compute_catalog_diff,
+)
+from app.application.use_cases.admin_stages import (
+    AdminStageWithChecks,
+    ListAdminStages,
+)
+from app.domain.entities import CheckItem, Stage
+from app.infrastructure.repositories import SqlAlchemyStageRepo
+
+ADMIN = {"X-Admin-Token": "admin-secret"}
+
+
+def _stage(stage_id: str, slug: str, order_index: int) -> Stage:
+    return Stage(
+        id=stage_id,
+        slug=slug,
+        title=slug,
+        short_explanation="",
+        common_mistakes="",
+        must_document="",
+        order_index=order_index,
+    )
+
+
+def _check(check_id: str, stage_id: str, order_index: int) -> CheckItem:
+    return CheckItem(
+        id=check_id,
+        stage_id=stage_id,
+        title=f"check {order_index}",
+        description=None,
+        order_index=order_index,
+    )
+
+
+def _input(
+    stage: Stage, checks: list[CatalogCheckItemInput], with_id: bool = True
+) -> CatalogStageInput:
+    return CatalogStageInput(
+        id=stage.id if with_id else None,
+        slug=stage.slug,
+        title=stage.title,
+        short_explanation=stage.short_explanation,
+        common_mistakes=stage.common_mistakes,
+        must_document=stage.must_document,
+        order_index=stage.order_index,
+        checks=checks,
+    )
+
+
+def _check_input(check: CheckItem, with_id: bool = True) -> CatalogCheckItemInput:
+    return CatalogCheckItemInput(
+        id=check.id if with_id else None,
+        title=check.title,
+        description=check.description,
+        order_index=check.order_index,
+    )
+
+
+FOUNDATION = _stage("s1", "foundation", 1)
+FRAME = _stage("s2", "frame", 2)
+CURRENT = [
+    AdminStageWithChecks(
+        stage=FOUNDATION, checks=[_check("c1", "s1", 1), _check("c2", "s1", 2)]
+    ),
+    AdminStageWithChecks(stage=FRAME, checks=[_check("c3", "s2", 1)]),
+]
+
+
+def test_unchanged_document_produces_empty_diff() -> None:
+    desired = [
+        _input(sc.stage, [_check_input(c) for c in sc.checks]) for sc in CURRENT
+    ]
+    assert compute_catalog_diff(CURRENT, desired).is_empty
+
+
+def test_documents_without_ids_keep_existing_ids() -> None:
+    desired = [
+        _input(sc.stage, [_check_input(c, with_id=False) for c in sc.checks], False)
+        for sc in CURRENT
+    ]
+    assert compute_catalog_diff(CURRENT, desired).is_empty
+
+
+def test_diff_inserts_updates_and_deletes() -> None:
+    desired = [
+        _input(
+            FOUNDATION,
+            [
+                CatalogCheckItemInput(
+                    id="c1", title="renamed", description=None, order_index=1
+                ),
+                CatalogCheckItemInput(
+                    id=None, title="new", description=None, order_index=3
+                ),
+            ],
+        ),
+        _input(_stage("s3", "roof", 3), []),
+    ]
+
+    diff = compute_catalog_diff(CURRENT, desired)
+
+    assert [c.title for c in diff.checks_to_update] == ["renamed"]
+    assert diff.checks_to_update[0].id == "c1"
+    assert [c.title for c in diff.checks_to_insert] == ["new"]
+    assert diff.check_ids_to_delete == ["c2"]
+    assert [s.id for s in diff.stages_to_insert] == ["s3"]
+    assert diff.stage_ids_to_delete == ["s2"]
+
+
+def test_swapped_slugs_are_marked_for_two_step_rename() -> None:
+    desired = [
+        _input(
+            _stage(sc.stage.id, slug, sc.stage.order_index),
+            [_check_input(c) for c in sc.checks],
+        )
+        for sc, slug in zip(CURRENT, ["frame", "foundation"], strict=True)
+    ]
+    diff = compute_catalog_diff(CURRENT, desired)
+    assert sorted(diff.renamed_stage_ids) == ["s1", "s2"]
+
+
+def test_duplicate_slugs_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        compute_catalog_diff(CURRENT, [_input(FOUNDATION, []), _input(FOUNDATION, [])])
+
+
+def _stored_id(n: int) -> str:
+    # Hex letters keep SQLite from storing the ids with numeric affinity.
+    return f"aaaaaaaa-0000-0000-0000-{n:012x}"
+
+
+def _stored_check_id(n: int) -> str:
+    return f"cccccccc-0000-0000-0000-{n:012x}"
+
+
+def _load_current(engine: Engine) -> None:
+    with Session(engine) as session:
+        repo = SqlAlchemyStageRepo(session)
+        repo.apply_catalog_diff(
+            compute_catalog_diff(
+                [],
+                [
+                    _input(
+                        _stage(_stored_id(1), "foundation", 1),
+                        [_check_input(_check(_stored_check_id(1), "", 1))],
+                    ),
+                    _input(
+                        _stage(_stored_id(2), "frame", 2),
+                        [_check_input(_check(_stored_check_id(2), "", 1))],
+                    ),
+                    _input(_stage(_stored_id(3), "roof", 3), []),
+                ],
+            )
+        )
+        session.commit()
+
+
+def _catalog(engine: Engine) -> dict[str, list[str]]:
+    with Session(engine) as session:
+        stages = ListAdminStages(stage_repo=SqlAlchemyStageRepo(session)).execute()
+    return {
+        f"{sc.stage.id}:{sc.stage.slug}": [f"{c.id}:{c.title}" for c in sc.checks]
+        for sc in stages.stages
+    }
+
+
+def test_diff_is_applied_with_swapped_and_reused_slugs(engine: Engine) -> None:
+    _load_current(engine)
+    # Foundation and frame swap slugs; roof leaves and a new stage takes
+    # its slug; frame's check moves to the new stage.
+    desired = [
+        _input(_stage(_stored_id(1), "frame", 1), []),
+        _input(_stage(_stored_id(2), "foundation", 2), []),
+        _input(
+            _stage(_stored_id(4), "roof", 4),
+            [
+                CatalogCheckItemInput(
+                    id=_stored_check_id(2),
+                    title="moved",
+                    description=None,
+                    order_index=1,
+                ),
+                CatalogCheckItemInput(
+                    id=None, title="tiles", description=None, order_index=2
+                ),
+            ],
+        ),
+    ]
+
+    with Session(engine) as session:
+        result = ImportCatalog(stage_repo=SqlAlchemyStageRepo(session)).execute(
+            ImportCatalogInput(stages=desired, dry_run=False)
+        )
+        session.commit()
+
+    assert result.applied
+    [new_check_id] = result.minted_ids
+    assert _catalog(engine) == {
+        f"{_stored_id(1)}:frame": [],
+        f"{_stored_id(2)}:foundation": [],
+        f"{_stored_id(4)}:roof": [
+            f"{_stored_check_id(2)}:moved",
+            f"{new_check_id}:tiles",
+        ],
+    }
+
+
+def test_dry_run_reports_the_diff_without_applying_it(
+    engine: Engine, api_app: FastAPI
+) -> None:
+    _load_current(engine)
+    client = TestClient(api_app, headers=ADMIN)
+    before = client.get("/admin/catalog").json()
+    document = {
+        "stages": [
+            {**stage, "checks": [{"title": "new", "order_index": 5}]}
+            for stage in before["stages"][:2]
+        ]
+    }
+
+    response = client.put("/admin/catalog", params={"dry_run": True}, json=document)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["dry_run"], body["applied"]) == (True, False)
+    assert body["checks"]["insert"] == [None, None]
+    assert sorted(body["checks"]["delete"]) == [
+        _stored_check_id(1),
+        _stored_check_id(2),
+    ]
+    assert body["stages"]["delete"] == [_stored_id(3)]
+    assert client.get("/admin/catalog").json() == before
+
+
+def test_exported_catalog_imports_back_unchanged(
+    engine: Engine, api_app: FastAPI
+) -> None:
+    _load_current(engine)
+    client = TestClient(api_app, headers=ADMIN)
+    exported = client.get("/admin/catalog").json()
+
+    unchanged = client.put("/admin/catalog", json=exported).json()
+    assert unchanged["applied"] is False
+    assert unchanged["stages"] == unchanged["checks"] == {
+        "insert": [],
+        "update": [],
+        "delete": [],
+    }
+
+    exported["stages"][0]["title"] = "Foundations"
+    changed = client.put("/admin/catalog", json=exported).json()
+    assert changed["applied"] is True
+    assert changed["stages"]["update"] == [_stored_id(1)]
+    assert client.get("/admin/catalog").json() == exported
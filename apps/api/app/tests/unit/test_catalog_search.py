@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from app.domain.entities import CheckItem, Stage
+from app.infrastructure.catalog_cache import CatalogCache
+from app.infrastructure.catalog_search import (
+    InMemoryCatalogIndex,
+    affix_variants,
+    tokenize,
+)
+
+
+def _stage(stage_id: str, title: str, order_index: int, text: str = "") -> Stage:
+    return Stage(
+        id=stage_id,
+        slug=f"stage-{order_index}",
+        title=title,
+        short_explanation=text,
+        common_mistakes="",
+        must_document="",
+        order_index=order_index,
+    )
+
+
+STAGES = [
+    _stage("s1", "תכנון והיתרים", 1, "יש לקבל היתרי בנייה ולבחור את הקבלן."),
+    _stage("s2", "יסודות", 3, "יסודות חזקים ויציבים הם קריטיים לבטיחות."),
+    _stage("s3", "מבנה שלד", 4, "שלב בניית השלד כולל את כל הקירות והעמודים."),
+]
+CHECKS = [
+    CheckItem(
+        id="c1",
+        stage_id="s2",
+        title="יציקת בטון יסודות",
+        description=None,
+        order_index=2,
+    ),
+    CheckItem(
+        id="c2",
+        stage_id="s2",
+        title="איטום יסודות מפני לחות",
+        description=None,
+        order_index=5,
+    ),
+    CheckItem(
+        id="c3", stage_id="s3", title="הקמת קירות שלד", description=None, order_index=1
+    ),
+]
+
+
+def test_tokenize_normalizes_niqqud_final_letters_and_maqaf() -> None:
+    assert tokenize("בָּטוֹן תַּת־קַרְקָעִי תמ\"א") == ["בטונ", "תת", "קרקעי", "תמא"]
+
+
+def test_affix_variants_strip_proclitics_and_plurals() -> None:
+    variants = affix_variants(tokenize("והקירות")[0])
+    assert "קירות" in variants
+    assert "קיר" in variants
+
+
+def test_search_matches_inflected_forms() -> None:
+    index = InMemoryCatalogIndex(STAGES, CHECKS)
+    hits = index.search("קיר ", limit=5)
+    assert [h.stage.id for h in hits] == ["s3"]
+    assert [c.id for c in hits[0].checks] == ["c3"]
+
+
+def test_search_as_you_type_uses_prefix_of_last_token() -> None:
+    index = InMemoryCatalogIndex(STAGES, CHECKS)
+    hits = index.search("יסו", limit=5)
+    assert hits[0].stage.id == "s2"
+    assert {c.id for c in hits[0].checks} == {"c1", "c2"}
+
+
+def test_search_falls_back_to_trigrams_for_typos() -> None:
+    index = InMemoryCatalogIndex(STAGES, CHECKS)
+    hits = index.search("איתום ", limit=5)
+    assert [h.stage.id for h in hits] == ["s2"]
+
+
+def test_search_prefers_stages_matching_every_token() -> None:
+    index = InMemoryCatalogIndex(STAGES, CHECKS)
+    hits = index.search("בטון יסודות ", limit=5)
+    assert [h.stage.id for h in hits] == ["s2"]
+
+
+class FakeStageRepo:
+    def __init__(self) -> None:
+        self.revision = 1
+        self.loads = 0
+
+    def list_all(self) -> list[Stage]:
+        self.loads += 1
+        return STAGES
+
+    def list_check_items_for_stage_ids(self, stage_ids: list[str]) -> list[CheckItem]:
+        return CHECKS
+
+    def get_catalog_revision(self) -> int:
+        return self.revision
+
+
+def test_catalog_cache_rebuilds_only_when_revision_changes() -> None:
+    repo = FakeStageRepo()
+    cache = CatalogCache(revalidate_seconds=0)
+
+    first = cache.get(repo)  # type: ignore[arg-type]
+    assert cache.get(repo) is first  # type: ignore[arg-type]
+    assert repo.loads == 1
+
+    repo.revision = 2
+    assert cache.get(repo).revision == 2  # type: ignore[arg-type]
+    assert repo.loads == 2
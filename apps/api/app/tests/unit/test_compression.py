@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from app.web.compression import (
+    CompressionMiddleware,
+    negotiate,
+    precompressed_response,
+)
+from app.web.responses import FastJSONResponse
+
+BIG = [{"title": "יציקת רצפה", "order_index": i} for i in range(200)]
+
+
+def test_negotiate_honours_q_values() -> None:
+    assert negotiate(None) is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0.5, br") == "br"
+    assert negotiate("br;q=0, gzip;q=0.1") == "gzip"
+    assert negotiate("*;q=0") is None
+
+
+def _client() -> tuple[TestClient, list[int]]:
+    renders: list[int] = []
+    cache: dict[str, bytes] = {}
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    def big() -> list[dict[str, object]]:
+        return BIG
+
+    @app.get("/small")
+    def small() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/cached")
+    def cached(request: Request) -> Response:
+        def render() -> bytes:
+            renders.append(1)
+            return bytes(FastJSONResponse(BIG).body)
+
+        return precompressed_response(request, cache, "big", render)
+
+    return TestClient(app), renders
+
+
+def test_middleware_compresses_only_above_threshold() -> None:
+    client, _ = _client()
+
+    big = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/big", headers={"Accept-Encoding": "identity"})
+
+    assert big.headers["content-encoding"] == "gzip"
+    assert int(big.headers["content-length"]) < len(plain.content)
+    assert big.json() == plain.json() == BIG
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in plain.headers
+    assert big.headers["vary"] == small.headers["vary"] == "Accept-Encoding"
+
+
+def test_precompressed_body_is_rendered_and_compressed_once() -> None:
+    client, renders = _client()
+
+    first = client.get("/cached", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/cached", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/cached", headers={"Accept-Encoding": "identity"})
+
+    assert renders == [1]
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.json() == second.json() == plain.json() == BIG
+    assert int(first.headers["content-length"]) < len(plain.content)
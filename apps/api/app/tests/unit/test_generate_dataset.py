@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from app.infrastructure.db.generate_dataset import ProjectPlan, plan_projects
+
+
+def _plan(seed: int) -> list[ProjectPlan]:
+    return plan_projects(
+        seed=seed,
+        projects=1000,
+        users=100,
+        notes=50_000,
+        media=10_000,
+        check_results=20_000,
+        max_checks=60,
+        skew=1.2,
+    )
+
+
+def test_plan_is_deterministic_and_allocates_exact_totals() -> None:
+    plan = _plan(seed=7)
+    assert plan == _plan(seed=7)
+    assert plan != _plan(seed=8)
+    assert sum(p.notes for p in plan) == 50_000
+    assert sum(p.media for p in plan) == 10_000
+    assert all(p.checks <= 60 for p in plan)
+
+
+def test_plan_is_skewed_towards_a_few_large_projects() -> None:
+    notes = sorted((p.notes for p in _plan(seed=7)), reverse=True)
+    top_one_percent = sum(notes[:10])
+    assert top_one_percent > sum(notes) * 0.1
+    assert notes[len(notes) // 2] < sum(notes) / len(notes)
+
+
+def test_check_results_beyond_a_project_cap_go_to_other_projects() -> None:
+    plan = _plan(seed=7)
+    assert sum(p.checks for p in plan) == 20_000
+    assert max(p.checks for p in plan) == 60
+
+    capped = plan_projects(
+        seed=7,
+        projects=10,
+        users=1,
+        notes=0,
+        media=0,
+        check_results=1000,
+        max_checks=60,
+        skew=1.2,
+    )
+    assert [p.checks for p in capped] == [60] * 10
+
+
+def test_plan_without_projects_is_empty() -> None:
+    assert (
+        plan_projects(
+            seed=7,
+            projects=0,
+            users=1,
+            notes=100,
+            media=10,
+            check_results=100,
+            max_checks=60,
+            skew=1.2,
+        )
+        == []
+    )
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.infrastructure.db.models import Base
+from app.infrastructure.idempotency import SqlIdempotencyStore
+from app.web.idempotency import IdempotencyMiddleware
+
+
+class NoteBody(BaseModel):
+    body: str
+
+
+def _user_id(authorization: str | None) -> str:
+    if not authorization:
+        raise HTTPException(status_code=401)
+    return authorization.removeprefix("Bearer ")
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> Iterator[SqlIdempotencyStore]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.sqlite3'}")
+    Base.metadata.create_all(
+        engine, tables=[Base.metadata.tables["idempotency_keys"]]
+    )
+    yield SqlIdempotencyStore(
+        sessionmaker(bind=engine, class_=Session, expire_on_commit=False)
+    )
+    engine.dispose()
+
+
+def _client(store: SqlIdempotencyStore, calls: list[str]) -> TestClient:
+    app = FastAPI()
+
+    @app.post("/notes", status_code=201)
+    def add_note(note: NoteBody) -> dict[str, str]:
+        calls.append(note.body)
+        if note.body == "slow":
+            time.sleep(0.3)
+        if note.body in ("boom", "busy"):
+            raise HTTPException(status_code=503 if note.body == "boom" else 429)
+        return {"id": f"n{len(calls)}", "body": note.body}
+
+    app.add_middleware(IdempotencyMiddleware, store=lambda: store, user_id=_user_id)
+    return TestClient(app)
+
+
+def _post(
+    client: TestClient, body: str, key: str, user: str = "u1"
+) -> httpx.Response:
+    response: httpx.Response = client.post(
+        "/notes",
+        json={"body": body},
+        headers={"Authorization": f"Bearer {user}", "Idempotency-Key": key},
+    )
+    return response
+
+
+def test_retry_replays_the_first_response(store: SqlIdempotencyStore) -> None:
+    calls: list[str] = []
+    client = _client(store, calls)
+
+    first = _post(client, "hello", "k1")
+    retry = _post(client, "hello", "k1")
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json() == {"id": "n1", "body": "hello"}
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert calls == ["hello"]
+
+    # Keys are per user; another body under the same key is refused.
+    assert _post(client, "hello", "k1", user="u2").json()["id"] == "n2"
+    assert _post(client, "other", "k1").status_code == 422
+    assert calls == ["hello", "hello"]
+
+
+@pytest.mark.parametrize(("body", "status"), [("boom", 503), ("busy", 429)])
+def test_failed_requests_are_not_stored(
+    store: SqlIdempotencyStore, body: str, status: int
+) -> None:
+    calls: list[str] = []
+    client = _client(store, calls)
+
+    assert _post(client, body, "k2").status_code == status
+    assert _post(client, body, "k2").status_code == status
+    assert calls == [body, body]
+
+
+def test_concurrent_duplicate_waits_for_the_first(
+    store: SqlIdempotencyStore,
+) -> None:
+    calls: list[str] = []
+    client = _client(store, calls)
+    results = []
+
+    def post() -> None:
+        results.append(_post(client, "slow", "k3"))
+
+    threads = [threading.Thread(target=post) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["slow"]
+    assert [r.status_code for r in results] == [201, 201, 201]
+    assert sorted(r.headers.get("Idempotent-Replayed", "") for r in results) == [
+        "",
+        "true",
+        "true",
+    ]
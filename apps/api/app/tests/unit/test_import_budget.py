@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Generous default so slow CI runners pass; tighten locally with the env var.
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "2500"))
+# Heavy adapters that must load on first use, not when a worker boots.
+LAZY_MODULES = ("boto3", "botocore")
+
+API_ROOT = Path(__file__).resolve().parents[3]
+
+
+def test_app_main_imports_within_budget_and_without_heavy_adapters() -> None:
+    # A fresh interpreter: this process has long since imported everything.
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import sys, app.main; print(' '.join(sys.modules))",
+        ],
+        cwd=API_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = set(result.stdout.split())
+    cumulative_us = next(
+        int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.rstrip().endswith("| app.main")
+    )
+
+    assert not loaded.intersection(LAZY_MODULES)
+    assert cumulative_us / 1000 < BUDGET_MS
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Iterator
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from jwt.algorithms import RSAAlgorithm
+
+from app.application.ports.auth import InvalidToken
+from app.infrastructure.jwt_auth import JwksCache, JwtVerifier
+from app.web.dependencies import get_current_user_id, get_token_verifier
+
+ISSUER = "https://issuer.test"
+
+
+class Issuer:
+    """Local signing keys plus a JWKS endpoint serving their public halves."""
+
+    def __init__(self) -> None:
+        self.keys: dict[str, rsa.RSAPrivateKey] = {}
+        self.hits = 0
+        issuer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                issuer.hits += 1
+                body = json.dumps(issuer.jwks()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/jwks.json"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def add_key(self, kid: str) -> None:
+        self.keys[kid] = rsa.generate_private_key(
+            public_exponent=65537, key_size=2048
+        )
+
+    def jwks(self) -> dict[str, Any]:
+        keys = []
+        for kid, key in self.keys.items():
+            jwk = json.loads(RSAAlgorithm.to_jwk(key.public_key()))
+            keys.append({**jwk, "kid": kid, "use": "sig", "alg": "RS256"})
+        return {"keys": keys}
+
+    def token(self, kid: str, sub: str = "user-1", ttl: float = 300) -> str:
+        claims = {"sub": sub, "iss": ISSUER, "exp": int(time.time() + ttl)}
+        return jwt.encode(
+            claims, self.keys[kid], algorithm="RS256", headers={"kid": kid}
+        )
+
+
+@pytest.fixture
+def issuer() -> Iterator[Issuer]:
+    issuer = Issuer()
+    issuer.add_key("k1")
+    yield issuer
+    issuer.server.shutdown()
+
+
+def _verifier(issuer: Issuer, **jwks_options: Any) -> JwtVerifier:
+    return JwtVerifier(JwksCache(issuer.url, **jwks_options), issuer=ISSUER)
+
+
+def test_verified_tokens_are_cached_until_expiry(
+    issuer: Issuer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    now = [time.time()]
+    verifier = JwtVerifier(
+        JwksCache(issuer.url), issuer=ISSUER, leeway=0, clock=lambda: now[0]
+    )
+    decodes: list[str] = []
+    real_decode = jwt.decode
+
+    def counting_decode(token: str, *args: Any, **kwargs: Any) -> Any:
+        decodes.append(token)
+        return real_decode(token, *args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+    token = issuer.token("k1", ttl=60)
+
+    assert verifier.verify(token).user_id == "user-1"
+    assert verifier.verify(token).user_id == "user-1"
+    assert len(decodes) == 1
+
+    now[0] += 120
+    with pytest.raises(InvalidToken):
+        verifier.verify(token)
+
+
+def test_rejects_bad_signature_and_wrong_issuer(issuer: Issuer) -> None:
+    verifier = _verifier(issuer)
+    good = issuer.token("k1")
+    header, payload, signature = good.split(".")
+    forged = f"{header}.{payload}.{signature[::-1]}"
+    other_issuer = jwt.encode(
+        {"sub": "u", "iss": "https://evil.test", "exp": int(time.time()) + 60},
+        issuer.keys["k1"],
+        algorithm="RS256",
+        headers={"kid": "k1"},
+    )
+
+    for token in (forged, other_issuer, "not-a-jwt"):
+        with pytest.raises(InvalidToken):
+            verifier.verify(token)
+
+
+def test_unknown_kid_refetches_at_most_once_per_interval(issuer: Issuer) -> None:
+    now = [0.0]
+    verifier = _verifier(issuer, min_refetch_seconds=30, clock=lambda: now[0])
+    verifier.verify(issuer.token("k1"))
+    issuer.add_key("k2")
+    rotated = issuer.token("k2", sub="user-2")
+
+    # Unknown kids (rotation or forgery) inside the interval: no refetch.
+    for _ in range(3):
+        with pytest.raises(InvalidToken):
+            verifier.verify(rotated)
+    assert issuer.hits == 1
+
+    now[0] += 31
+    assert verifier.verify(rotated).user_id == "user-2"
+    assert issuer.hits == 2
+
+
+def test_endpoint_requires_a_valid_token(issuer: Issuer) -> None:
+    app = FastAPI()
+
+    @app.get("/me")
+    def me(user_id: str = Depends(get_current_user_id)) -> dict[str, str]:
+        return {"user_id": user_id}
+
+    app.dependency_overrides[get_token_verifier] = lambda: _verifier(issuer)
+    client = TestClient(app)
+
+    ok = client.get("/me", headers={"Authorization": f"Bearer {issuer.token('k1')}"})
+    bad = client.get("/me", headers={"Authorization": "Bearer user-1"})
+
+    assert ok.json() == {"user_id": "user-1"}
+    assert bad.status_code == 401
+    assert bad.headers["www-authenticate"] == 'Bearer error="invalid_token"'
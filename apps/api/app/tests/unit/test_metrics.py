@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+
+from app.infrastructure.metrics import TimedQueuePool, instrument_engine
+from app.main import create_app
+
+
+def test_metrics_are_labelled_by_route_template() -> None:
+    client = TestClient(create_app())
+    client.get("/health")
+    client.get("/does-not-exist")
+
+    body = client.get("/metrics").text
+
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in body
+    assert 'route="unmatched",status="404"' in body
+    assert "http_requests_in_flight" in body
+
+
+def _pool_sample(name: str, pool: str) -> float | None:
+    return REGISTRY.get_sample_value(name, {"pool": pool})
+
+
+def test_pool_metrics_follow_checkouts_and_checkins(tmp_path: Path) -> None:
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=2,
+    )
+    instrument_engine(engine, "pool-test")
+    assert _pool_sample("db_pool_wait_seconds_count", "pool-test") == 0
+
+    first, second = engine.connect(), engine.connect()
+    assert _pool_sample("db_pool_checked_out_connections", "pool-test") == 2
+    assert _pool_sample("db_pool_overflow_connections", "pool-test") == 1
+
+    first.close()
+    assert _pool_sample("db_pool_overflow_connections", "pool-test") == 1
+    second.close()
+    assert _pool_sample("db_pool_checked_out_connections", "pool-test") == 0
+    assert _pool_sample("db_pool_overflow_connections", "pool-test") == 0
+
+    # A disposed engine keeps publishing under its own label.
+    engine.dispose()
+    engine.connect().close()
+    assert _pool_sample("db_pool_wait_seconds_count", "pool-test") == 3
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import Base, ProjectModel, ProjectNoteModel
+from app.infrastructure.repositories import SqlAlchemyNotesRepo, highlight_snippet
+
+# Full-text search is Postgres-only; point this at a scratch database.
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+PROJECT = "bbbbbbbb-0000-0000-0000-000000000001"
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_snippets_escape_note_text() -> None:
+    assert highlight_snippet("<b>\x02בטון\x03</b> & \x02rebar\x03") == (
+        "&lt;b&gt;<mark>בטון</mark>&lt;/b&gt; &amp; <mark>rebar</mark>"
+    )
+
+
+@pytest.fixture
+def session() -> Iterator[Session]:
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_engine(TEST_DATABASE_URL)
+    tables = [
+        Base.metadata.tables[name]
+        for name in ("projects", "stages", "project_notes")
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    with Session(engine) as session:
+        session.execute(
+            insert(ProjectModel),
+            [{"id": PROJECT, "owner_user_id": "u1", "name": "p", "created_at": NOW}],
+        )
+        session.execute(
+            insert(ProjectNoteModel),
+            [
+                {
+                    "id": f"ffffffff-0000-0000-0000-{i:012x}",
+                    "project_id": PROJECT,
+                    "body": f"<i>concrete</i> pour {i}" if i < 3 else "tiles",
+                    "created_at": NOW + timedelta(minutes=i),
+                }
+                for i in range(4)
+            ],
+        )
+        session.flush()
+        yield session
+        session.rollback()
+    Base.metadata.drop_all(engine, tables=tables)
+    engine.dispose()
+
+
+def test_search_pages_keep_the_total_and_escape_snippets(session: Session) -> None:
+    repo = SqlAlchemyNotesRepo(session)
+
+    first = repo.search(PROJECT, "concrete", stage_ids=[], limit=2, offset=0)
+    past_end = repo.search(PROJECT, "concrete", stage_ids=[], limit=2, offset=10)
+
+    assert first.total == past_end.total == 3
+    assert [h.note.body for h in first.hits] == [
+        "<i>concrete</i> pour 2",
+        "<i>concrete</i> pour 1",
+    ]
+    assert first.hits[0].snippet == "&lt;i&gt;<mark>concrete</mark>&lt;/i&gt; pour 2"
+    assert past_end.hits == []
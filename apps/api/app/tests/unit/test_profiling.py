@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.infrastructure.profiling import ProfileStore
+from app.web.dependencies import get_admin_token
+from app.web.middleware import ProfilingMiddleware
+from app.web.routing import AppRoute
+
+
+def _busy() -> dict[str, int]:
+    deadline = time.perf_counter() + 0.05
+    n = 0
+    while time.perf_counter() < deadline:
+        n += 1
+    return {"n": n}
+
+
+# Holds each request in the endpoint until the other one has arrived too.
+_arrived = threading.Barrier(2, timeout=5)
+
+
+def _together() -> dict[str, int]:
+    _arrived.wait()
+    return _busy()
+
+
+@pytest.fixture
+def store() -> ProfileStore:
+    return ProfileStore(keep=5)
+
+
+@pytest.fixture
+def client(store: ProfileStore, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+    app = FastAPI()
+    app.router.route_class = AppRoute
+    app.add_api_route("/busy", _busy)
+    app.add_api_route("/together", _together)
+    app.add_middleware(
+        ProfilingMiddleware, store=store, check_admin_token=get_admin_token
+    )
+    return TestClient(app)
+
+
+def test_requests_without_valid_admin_token_are_not_profiled(
+    client: TestClient, store: ProfileStore
+) -> None:
+    response = client.get("/busy", headers={"X-Profile": "cprofile"})
+    bad = client.get(
+        "/busy", headers={"X-Profile": "cprofile", "X-Admin-Token": "wrong"}
+    )
+
+    assert "x-profile-id" not in response.headers
+    assert "x-profile-id" not in bad.headers
+    assert store.recent() == []
+
+
+def test_cprofile_captures_the_sync_endpoint_in_the_worker_thread(
+    client: TestClient, store: ProfileStore
+) -> None:
+    response = client.get(
+        "/busy", headers={"X-Profile": "cprofile", "X-Admin-Token": "admin-secret"}
+    )
+
+    profile = store.get(response.headers["x-profile-id"])
+    assert profile is not None and profile.route == "/busy"
+    assert "_busy" in profile.summary
+    assert profile.pstats_dump is not None
+
+
+def test_sampling_profile_produces_collapsed_stacks(
+    client: TestClient, store: ProfileStore
+) -> None:
+    response = client.get(
+        "/busy", headers={"X-Profile": "sample", "X-Admin-Token": "admin-secret"}
+    )
+
+    profile = store.get(response.headers["x-profile-id"])
+    assert profile is not None and profile.collapsed
+    assert any(
+        line.split(" ")[0].endswith("test_profiling:_busy")
+        for line in profile.collapsed.splitlines()
+    )
+
+
+def test_overlapping_cprofile_requests_fall_back_to_sampling(
+    client: TestClient, store: ProfileStore
+) -> None:
+    headers = {"X-Profile": "cprofile", "X-Admin-Token": "admin-secret"}
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        responses = list(
+            pool.map(lambda _: client.get("/together", headers=headers), range(2))
+        )
+
+    assert all(r.status_code == 200 for r in responses)
+    modes = sorted(r.headers["x-profile-mode"] for r in responses)
+    assert modes == ["cprofile", "sample"]
+    profiles = [store.get(r.headers["x-profile-id"]) for r in responses]
+    assert {p.mode for p in profiles if p is not None} == {"cprofile", "sample"}
+
+    # The profiler is free again once both are done.
+    response = client.get("/busy", headers=headers)
+    assert response.headers["x-profile-mode"] == "cprofile"
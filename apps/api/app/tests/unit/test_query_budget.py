@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from contextlib import AbstractContextManager
+from typing import Callable
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, insert
+from sqlalchemy.orm import Session
+
+from app.infrastructure.ai_stub import StubAIClient
+from app.infrastructure.db.models import StageCheckItemModel, StageModel
+from app.infrastructure.telemetry import RequestStats, track_queries
+from app.infrastructure.timing import TimedAIClient
+from app.web.middleware import server_timing
+
+MaxQueries = Callable[[int], AbstractContextManager[RequestStats]]
+ADMIN = {"X-Admin-Token": "admin-secret"}
+
+
+def _make_catalog(engine: Engine, stages: int, checks_per_stage: int) -> None:
+    with Session(engine) as session:
+        session.execute(
+            insert(StageModel),
+            [
+                {
+                    "id": f"aaaaaaaa-0000-0000-0000-{i:012x}",
+                    "slug": f"stage-{i}",
+                    "title": f"Stage {i}",
+                    "short_explanation": "",
+                    "common_mistakes": "",
+                    "must_document": "",
+                    "order_index": i,
+                }
+                for i in range(stages)
+            ],
+        )
+        session.execute(
+            insert(StageCheckItemModel),
+            [
+                {
+                    "id": f"cccccccc-0000-0000-{i:04x}-{j:012x}",
+                    "stage_id": f"aaaaaaaa-0000-0000-0000-{i:012x}",
+                    "title": f"Check {j}",
+                    "description": None,
+                    "order_index": j,
+                }
+                for i in range(stages)
+                for j in range(checks_per_stage)
+            ],
+        )
+        session.commit()
+
+
+@pytest.mark.parametrize("stages", [3, 100])
+@pytest.mark.parametrize("path", ["/admin/stages", "/admin/catalog"])
+def test_admin_catalog_reads_do_not_scale_queries_with_catalog_size(
+    engine: Engine,
+    api_app: FastAPI,
+    assert_max_queries: MaxQueries,
+    stages: int,
+    path: str,
+) -> None:
+    _make_catalog(engine, stages=stages, checks_per_stage=10)
+    client = TestClient(api_app)
+
+    with assert_max_queries(2):
+        response = client.get(path, headers=ADMIN)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["stages"] if path == "/admin/catalog" else body) == stages
+
+
+def test_debug_headers_report_statement_count(
+    engine: Engine, api_app: FastAPI
+) -> None:
+    _make_catalog(engine, stages=3, checks_per_stage=2)
+    client = TestClient(api_app)
+
+    response = client.get("/admin/stages", headers=ADMIN)
+
+    assert response.headers["x-db-queries"] == "2"
+    assert float(response.headers["x-db-time-ms"]) >= 0
+
+
+def test_server_timing_header_breaks_down_request_time(
+    engine: Engine, api_app: FastAPI
+) -> None:
+    _make_catalog(engine, stages=3, checks_per_stage=2)
+    client = TestClient(api_app)
+
+    response = client.get("/admin/stages", headers=ADMIN)
+
+    entries = [e.split(";")[0] for e in response.headers["server-timing"].split(", ")]
+    assert entries == ["db", "app", "total"]
+
+
+def test_timed_ports_are_reported_per_category() -> None:
+    with track_queries() as stats:
+        TimedAIClient(StubAIClient()).ask(
+            question="?", project_context="", stage_context=None
+        )
+    assert set(stats.timings) == {"ai"}
+    assert "ai;dur=" in server_timing(stats, total_seconds=1.0)
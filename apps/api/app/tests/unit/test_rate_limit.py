@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import multiprocessing
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.infrastructure.rate_limit import (
+    Limit,
+    MemoryBucketStore,
+    RateLimiter,
+    SqliteBucketStore,
+)
+from app.web.dependencies import get_rate_limiter
+from app.web.rate_limit import rate_limit
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parse_limit() -> None:
+    assert Limit.parse("20/m") == Limit(20, 60.0)
+    assert Limit.parse("100/1h") == Limit(100, 3600.0)
+    assert Limit.parse("5/30s") == Limit(5, 30.0)
+    with pytest.raises(ValueError):
+        Limit.parse("fast")
+
+
+@pytest.mark.parametrize("store_kind", ["memory", "sqlite"])
+def test_bucket_empties_and_refills(store_kind: str, tmp_path: Path) -> None:
+    store = (
+        MemoryBucketStore()
+        if store_kind == "memory"
+        else SqliteBucketStore(str(tmp_path / "buckets.sqlite3"))
+    )
+    clock = FakeClock()
+    limiter = RateLimiter(store, clock=clock)
+    limit = Limit(3, 3.0)
+
+    remaining = [limiter.hit("k", limit).remaining for _ in range(3)]
+    assert remaining == [2, 1, 0]
+    denied = limiter.hit("k", limit)
+    assert not denied.allowed
+    assert denied.retry_after == pytest.approx(1.0)
+    assert limiter.hit("other", limit).allowed
+
+    clock.now += 1.0
+    assert limiter.hit("k", limit).allowed
+    assert not limiter.hit("k", limit).allowed
+
+    clock.now += 100.0
+    full = limiter.hit("k", limit)
+    assert full.remaining == 2
+    assert full.reset_after == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("store_kind", ["memory", "sqlite"])
+def test_refused_request_charges_no_bucket(store_kind: str, tmp_path: Path) -> None:
+    store = (
+        MemoryBucketStore()
+        if store_kind == "memory"
+        else SqliteBucketStore(str(tmp_path / "buckets.sqlite3"))
+    )
+    limiter = RateLimiter(store, clock=FakeClock())
+    user, ip = ("user", Limit(5, 60.0)), ("ip", Limit(1, 60.0))
+
+    assert all(d.allowed for d in limiter.hit_all([user, ip]))
+    user_decision, ip_decision = limiter.hit_all([user, ip])
+    assert user_decision.allowed and not ip_decision.allowed
+    assert user_decision.remaining == 4
+    assert limiter.hit(*user).remaining == 3
+
+
+def test_pruning_keeps_buckets_with_longer_periods(tmp_path: Path) -> None:
+    path = str(tmp_path / "buckets.sqlite3")
+    # Another process's limits: this one only ever sees a one-minute bucket.
+    RateLimiter(SqliteBucketStore(path), clock=FakeClock()).hit(
+        "daily", Limit(2, 86400.0)
+    )
+    clock = FakeClock()
+    limiter = RateLimiter(SqliteBucketStore(path, prune_every=2), clock=clock)
+
+    limiter.hit("minute", Limit(2, 60.0))
+    clock.now += 120.0
+    limiter.hit("other", Limit(2, 60.0))
+
+    with sqlite3.connect(path) as conn:
+        keys = {key for (key,) in conn.execute("SELECT key FROM buckets")}
+    assert keys == {"daily", "other"}
+
+
+def _take_many(path: str, n: int) -> int:
+    limiter = RateLimiter(SqliteBucketStore(path), clock=lambda: 1_000.0)
+    return sum(limiter.hit("shared", Limit(50, 3600.0)).allowed for _ in range(n))
+
+
+def test_sqlite_buckets_are_shared_between_processes(tmp_path: Path) -> None:
+    path = str(tmp_path / "buckets.sqlite3")
+    SqliteBucketStore(path)
+    with multiprocessing.get_context("spawn").Pool(3) as pool:
+        allowed = pool.starmap(_take_many, [(path, 30)] * 3)
+    assert sum(allowed) == 50
+
+
+def test_route_limits_and_headers(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("RATE_LIMIT_TEST_UPLOAD_IP", "off")
+    monkeypatch.delenv("RATE_LIMIT_DB", raising=False)
+    get_rate_limiter.cache_clear()
+    app = FastAPI()
+
+    limited_route = Depends(rate_limit("test_upload", user="2/m"))
+
+    @app.post("/upload", dependencies=[limited_route])
+    def upload() -> dict[str, bool]:
+        return {"ok": True}
+
+    client = TestClient(app)
+    alice = {"Authorization": "Bearer alice"}
+
+    first = client.post("/upload", headers=alice)
+    assert first.status_code == 200
+    assert first.headers["RateLimit-Limit"] == "2"
+    assert first.headers["RateLimit-Remaining"] == "1"
+    assert client.post("/upload", headers=alice).status_code == 200
+
+    limited = client.post("/upload", headers=alice)
+    assert limited.status_code == 429
+    assert limited.headers["RateLimit-Remaining"] == "0"
+    assert int(limited.headers["Retry-After"]) == 30
+
+    bob = client.post("/upload", headers={"Authorization": "Bearer bob"})
+    assert bob.status_code == 200
+
+
+def test_sqlite_store_is_taken_off_the_event_loop(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("RATE_LIMIT_DB", str(tmp_path / "buckets.sqlite3"))
+    get_rate_limiter.cache_clear()
+    store = get_rate_limiter().store
+    take = store.take
+    threads: list[int] = []
+
+    def recording_take(*args: Any, **kwargs: Any) -> list[tuple[bool, float]]:
+        threads.append(threading.get_ident())
+        return take(*args, **kwargs)
+
+    monkeypatch.setattr(store, "take", recording_take)
+    app = FastAPI()
+
+    @app.get("/search", dependencies=[Depends(rate_limit("test_search", ip="5/m"))])
+    async def search() -> dict[str, int]:
+        return {"loop": threading.get_ident()}
+
+    response = TestClient(app).get(
+        "/search", headers={"Authorization": "Bearer alice"}
+    )
+    get_rate_limiter.cache_clear()
+
+    assert response.headers["RateLimit-Remaining"] == "4"
+    assert threads and threads[0] != response.json()["loop"]
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.infrastructure.warmup import Readiness, run_warmup, warm_pool
+from app.main import create_app
+from app.web.dependencies import get_readiness
+
+
+def test_warm_pool_leaves_connections_open(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}", poolclass=QueuePool)
+
+    warm_pool(engine, 3)
+
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.checkedin() == 3
+    engine.dispose()
+
+
+def test_warmup_retries_until_every_step_succeeds() -> None:
+    readiness = Readiness()
+    calls: list[str] = []
+
+    def flaky() -> None:
+        calls.append("flaky")
+        if len(calls) == 1:
+            raise ConnectionError("database starting up")
+
+    run_warmup(readiness, [flaky, lambda: calls.append("catalog")], max_backoff=0)
+
+    assert calls == ["flaky", "flaky", "catalog"]
+    assert readiness.is_ready
+    assert readiness.error is None
+
+
+def test_readyz_is_unavailable_until_warmed_up() -> None:
+    readiness = Readiness()
+    app = create_app()
+    app.dependency_overrides[get_readiness] = lambda: readiness
+    client = TestClient(app)
+
+    warming = client.get("/readyz")
+    readiness.mark_ready(0.25)
+    ready = client.get("/readyz")
+
+    assert warming.status_code == 503
+    assert client.get("/health").status_code == 200
+    assert ready.status_code == 200
+    assert ready.json() == {"status": "ready", "error": None, "warmup_seconds": 0.25}
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.infrastructure.replica import ReplicaRouter
+from app.main import create_app
+from app.web.dependencies import caller_key, get_replica_router
+from app.web.middleware import ReadYourWritesMiddleware
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _router(lags: list[float | None | Exception], clock: FakeClock) -> ReplicaRouter:
+    def probe() -> float | None:
+        lag = lags.pop(0) if len(lags) > 1 else lags[0]
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+    replica = sessionmaker(bind=create_engine("sqlite://"), class_=Session)
+    return ReplicaRouter(
+        replica,
+        read_your_writes_seconds=5.0,
+        max_lag_seconds=2.0,
+        lag_check_seconds=1.0,
+        secret=b"secret",
+        lag_probe=probe,
+        clock=clock,
+    )
+
+
+def test_own_writes_are_read_from_the_primary() -> None:
+    clock = FakeClock()
+    router = _router([0.1], clock)
+    assert router.use_replica("alice")
+
+    stamp = router.stamp_write("alice")
+    assert not router.use_replica("alice", stamp)
+    # Another worker or instance checks the stamp the same way.
+    assert not _router([0.1], clock).use_replica("alice", stamp)
+    assert router.use_replica("alice")
+    assert router.use_replica("bob", stamp)
+    assert router.use_replica(None, stamp)
+
+    written_at = stamp.rpartition(".")[0]
+    assert router.use_replica("alice", f"{clock.now + 60:.3f}.{stamp[-32:]}")
+    assert router.use_replica("alice", f"{written_at}.forged")
+
+    clock.now += 5.0
+    assert router.use_replica("alice", stamp)
+
+
+def test_lagging_or_unreachable_replica_falls_back_to_primary() -> None:
+    clock = FakeClock()
+    router = _router([0.5, 3.0, ConnectionError("down"), 0.0], clock)
+    assert router.use_replica("alice")
+
+    # Measured at most once per lag_check_seconds.
+    clock.now += 0.5
+    assert router.use_replica("alice")
+    clock.now += 0.5
+    assert not router.use_replica("alice")
+    assert router.lag == 3.0
+
+    clock.now += 1.0
+    assert not router.use_replica("alice")
+    assert router.lag is None
+
+    clock.now += 1.0
+    assert router.use_replica("alice")
+
+
+def test_successful_writes_are_stamped() -> None:
+    router = _router([0.1], FakeClock())
+    app = FastAPI()
+
+    @app.post("/notes")
+    def add_note() -> dict[str, str]:
+        return {}
+
+    @app.get("/notes")
+    def list_notes() -> list[str]:
+        return []
+
+    app.add_middleware(
+        ReadYourWritesMiddleware, router=lambda: router, caller=caller_key
+    )
+    client = TestClient(app, headers={"Authorization": "Bearer alice"})
+
+    stamp = client.post("/notes").headers["X-Last-Write"]
+    assert not router.use_replica(caller_key(client.headers), stamp)
+    assert "X-Last-Write" not in client.get("/notes").headers
+    assert "X-Last-Write" not in client.post("/missing").headers
+    assert "X-Last-Write" not in TestClient(app).post("/notes").headers
+
+
+def test_replica_without_a_secret_fails_at_startup(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("DATABASE_READ_URL", "sqlite://")
+    monkeypatch.delenv("READ_YOUR_WRITES_SECRET", raising=False)
+    get_replica_router.cache_clear()
+    try:
+        with pytest.raises(RuntimeError, match="READ_YOUR_WRITES_SECRET"):
+            create_app()
+        monkeypatch.setenv("READ_YOUR_WRITES_SECRET", "shared-secret")
+        create_app()
+    finally:
+        get_replica_router.cache_clear()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.application.ports.repositories import ProjectStageView
+from app.domain.entities import CheckItem, CheckResult, Media, Project, Stage
+from app.web.notes import NoteOut
+from app.web.responses import FastJSONResponse
+from app.web.stages import ProjectStageViewOut, stage_view_body
+
+
+def test_stage_view_body_matches_response_model(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.delenv("MEDIA_S3_BUCKET", raising=False)
+    monkeypatch.setenv("S3_BUCKET_NAME", "photos")
+    now = datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc)
+    project = Project("p1", "u1", "בית", None, now)
+    stage = Stage("s1", "frame", "שלד", "הסבר", "טעויות", "לתעד", 2)
+    checks = [
+        CheckItem("c1", "s1", "ברזל", "תיאור", 0),
+        CheckItem("c2", "s1", "בטון", None, 1),
+    ]
+    view = ProjectStageView(
+        project=project,
+        stage=stage,
+        check_items=checks,
+        status=None,
+        check_results=[CheckResult("r1", "p1", "c2", True, "ok", now)],
+        notes=[],
+        media=[Media("m1", "p1", "s1", "a/b.jpg", None, None, now)],
+    )
+
+    body = json.loads(bytes(FastJSONResponse(stage_view_body(view)).body))
+
+    assert body == ProjectStageViewOut.model_validate(body).model_dump(mode="json")
+    assert body["stage"]["order_index"] == 2
+    assert [c["is_done"] for c in body["check_items"]] == [False, True]
+    assert body["media"][0]["url"] == (
+        "https://photos.s3.us-east-1.amazonaws.com/a/b.jpg"
+    )
+
+
+def test_datetimes_render_like_pydantic() -> None:
+    note = NoteOut(
+        id="n1",
+        stage_id=None,
+        body="x",
+        created_at=datetime(2025, 3, 1, 12, 30, 5, 120, tzinfo=timezone.utc),
+    )
+    fast = bytes(FastJSONResponse(note.model_dump()).body)
+
+    assert json.loads(fast) == json.loads(note.model_dump_json())
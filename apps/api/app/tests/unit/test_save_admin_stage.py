@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, event, insert
+from sqlalchemy.orm import Session
+
+from app.application.use_cases.admin_stages import (
+    SaveAdminStage,
+    SaveAdminStageCheckInput,
+    SaveAdminStageInput,
+)
+from app.infrastructure.db.models import StageCheckItemModel, StageModel
+from app.infrastructure.repositories import SqlAlchemyStageRepo
+
+
+def _stage_id(i: int) -> str:
+    # Hex letters keep SQLite from storing the ids with numeric affinity.
+    return f"aaaaaaaa-0000-0000-0000-{i:012x}"
+
+
+def _check_id(i: int, j: int) -> str:
+    return f"cccccccc-0000-0000-{i:04x}-{j:012x}"
+
+
+def _make_catalog(session: Session, stages: int, checks_per_stage: int) -> None:
+    session.execute(
+        insert(StageModel),
+        [
+            {
+                "id": _stage_id(i),
+                "slug": f"stage-{i}",
+                "title": f"Stage {i}",
+                "short_explanation": "",
+                "common_mistakes": "",
+                "must_document": "",
+                "order_index": i,
+            }
+            for i in range(stages)
+        ],
+    )
+    session.execute(
+        insert(StageCheckItemModel),
+        [
+            {
+                "id": _check_id(i, j),
+                "stage_id": _stage_id(i),
+                "title": f"Check {j}",
+                "description": None,
+                "order_index": j,
+            }
+            for i in range(stages)
+            for j in range(checks_per_stage)
+        ],
+    )
+    session.commit()
+
+
+def _count_statements(
+    engine: Engine, session: Session, data: SaveAdminStageInput
+) -> int:
+    statements: list[str] = []
+
+    def record(*args: Any) -> None:
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        SaveAdminStage(stage_repo=SqlAlchemyStageRepo(session)).execute(data)
+        session.flush()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return len(statements)
+
+
+def _edit_input(checks: int) -> SaveAdminStageInput:
+    return SaveAdminStageInput(
+        id=_stage_id(1),
+        slug="stage-1",
+        title="Renamed",
+        short_explanation="",
+        common_mistakes="",
+        must_document="",
+        order_index=1,
+        checks=[
+            SaveAdminStageCheckInput(
+                id=_check_id(1, j),
+                title=f"Edited {j}",
+                description=None,
+                order_index=j,
+            )
+            for j in range(checks)
+        ]
+        + [
+            SaveAdminStageCheckInput(
+                id=None, title=f"New {j}", description=None, order_index=100 + j
+            )
+            for j in range(checks)
+        ],
+    )
+
+
+@pytest.mark.parametrize("catalog_stages", [3, 200])
+def test_save_admin_stage_uses_constant_number_of_queries(
+    engine: Engine, catalog_stages: int
+) -> None:
+    with Session(engine) as session:
+        _make_catalog(session, stages=catalog_stages, checks_per_stage=20)
+        # get stage, list its checks, update stage, bulk update, bulk insert
+        assert _count_statements(engine, session, _edit_input(checks=20)) <= 5
+
+
+def test_save_admin_stage_returns_saved_stage_with_all_checks(engine: Engine) -> None:
+    with Session(engine) as session:
+        _make_catalog(session, stages=3, checks_per_stage=4)
+        saved = SaveAdminStage(stage_repo=SqlAlchemyStageRepo(session)).execute(
+            _edit_input(checks=2)
+        )
+        session.commit()
+
+        assert saved.stage.title == "Renamed"
+        assert [c.title for c in saved.checks] == [
+            "Edited 0",
+            "Edited 1",
+            "Check 2",
+            "Check 3",
+            "New 0",
+            "New 1",
+        ]
+        stored = SqlAlchemyStageRepo(session).list_check_items_for_stage_ids(
+            [saved.stage.id]
+        )
+        assert sorted(c.title for c in stored) == sorted(c.title for c in saved.checks)
+
+
+def test_save_admin_stage_moves_checks_from_other_stages(engine: Engine) -> None:
+    with Session(engine) as session:
+        _make_catalog(session, stages=3, checks_per_stage=2)
+        moved = SaveAdminStageCheckInput(
+            id=_check_id(2, 0), title="Moved", description=None, order_index=5
+        )
+        data = _edit_input(checks=0)
+        data.checks = [moved]
+        SaveAdminStage(stage_repo=SqlAlchemyStageRepo(session)).execute(data)
+        # A new stage may take over existing checks too.
+        data.id, data.slug, data.checks = _stage_id(9), "stage-9", [
+            SaveAdminStageCheckInput(
+                id=_check_id(0, 1), title="Taken", description=None, order_index=0
+            )
+        ]
+        SaveAdminStage(stage_repo=SqlAlchemyStageRepo(session)).execute(data)
+        session.commit()
+
+        repo = SqlAlchemyStageRepo(session)
+        by_stage = {
+            i: sorted(
+                c.title for c in repo.list_check_items_for_stage_ids([_stage_id(i)])
+            )
+            for i in (0, 1, 2, 9)
+        }
+        assert by_stage == {
+            0: ["Check 0"],
+            1: ["Check 0", "Check 1", "Moved"],
+            2: ["Check 1"],
+            9: ["Taken"],
+        }
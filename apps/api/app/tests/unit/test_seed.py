@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+from typing import Iterator
+
+import pytest
+from sqlalchemy import Engine, create_engine, func, select
+
+from app.infrastructure.db.models import Base, StageCheckItemModel, StageModel
+from app.infrastructure.db.seed import STAGES_DATA, _catalog_rows, seed_stages
+
+# COPY and ON CONFLICT are Postgres-only; point this at a scratch database.
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+def test_catalog_rows_have_stable_unique_ids() -> None:
+    stages, checks = _catalog_rows(synthetic_stages=3, checks_per_stage=2)
+
+    assert (stages, checks) == _catalog_rows(synthetic_stages=3, checks_per_stage=2)
+    real_stages, real_checks = _catalog_rows(synthetic_stages=0, checks_per_stage=8)
+    assert len(stages) == len(STAGES_DATA) + 3
+    assert len(checks) == len(real_checks) + 6
+    assert len({row[0] for row in stages}) == len(stages)
+    assert len({row[0] for row in checks}) == len(checks)
+    # Ids depend on the slug (and check order) only, not on synthetic counts.
+    assert stages[: len(real_stages)] == real_stages
+    assert checks[: len(real_checks)] == real_checks
+    assert {row[1] for row in checks} <= {row[1] for row in stages}
+
+
+@pytest.fixture
+def engine() -> Iterator[Engine]:
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_engine(TEST_DATABASE_URL)
+    tables = [Base.metadata.tables[n] for n in ("stages", "stage_check_items")]
+    Base.metadata.create_all(engine, tables=tables)
+    yield engine
+    Base.metadata.drop_all(engine, tables=tables)
+    engine.dispose()
+
+
+def _snapshot(engine: Engine) -> tuple[list[str], list[str], int]:
+    with engine.connect() as conn:
+        stage_ids = conn.scalars(select(StageModel.id).order_by(StageModel.id))
+        check_ids = conn.scalars(
+            select(StageCheckItemModel.id).order_by(StageCheckItemModel.id)
+        )
+        rows = conn.scalar(select(func.count()).select_from(StageCheckItemModel))
+        return [str(i) for i in stage_ids], [str(i) for i in check_ids], rows or 0
+
+
+def test_upsert_twice_keeps_ids_and_row_counts(engine: Engine) -> None:
+    url = engine.url.render_as_string(hide_password=False)
+
+    seed_stages(url, mode="upsert", synthetic_stages=2, checks_per_stage=3)
+    first = _snapshot(engine)
+    seed_stages(url, mode="upsert", synthetic_stages=2, checks_per_stage=3)
+
+    assert _snapshot(engine) == first
+    assert len(first[0]) == len(STAGES_DATA) + 2
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.infrastructure.repositories import SqlAlchemyStageRepo
+from app.infrastructure.slow_queries import (
+    SlowQueryLog,
+    fingerprint,
+    redact_parameters,
+)
+
+
+def test_fingerprint_ignores_literals_and_in_list_length() -> None:
+    a = "SELECT * FROM stages WHERE id IN (%(id_1)s, %(id_2)s) AND order_index > 3"
+    b = (
+        "SELECT *  FROM stages\n"
+        "WHERE id IN (%(id_1)s, %(id_2)s, %(id_3)s) AND order_index > 10"
+    )
+    assert fingerprint(a) == fingerprint(b)
+    assert fingerprint(a) != fingerprint("SELECT * FROM stages")
+
+
+def test_parameters_are_redacted_to_their_shape() -> None:
+    redacted = redact_parameters({"body": "secret note", "limit": 20, "ids": ["a"]})
+    assert redacted == {"body": "<str:11>", "limit": "<int>", "ids": ["<str:1>"]}
+
+
+def test_slow_statements_are_aggregated_and_tagged_with_repo_method(
+    engine: Engine,
+) -> None:
+    log = SlowQueryLog(threshold_ms=0)
+    log.install()
+    try:
+        with Session(engine) as session:
+            repo = SqlAlchemyStageRepo(session)
+            repo.list_all()
+            repo.list_all()
+    finally:
+        log.uninstall()
+
+    [entry] = [e for e in log.entries() if "FROM stages" in e.statement]
+    assert entry.count == 2
+    assert entry.repo_methods == {"SqlAlchemyStageRepo.list_all": 2}
+    assert entry.explain is None  # EXPLAIN is Postgres-only
+
+
+def test_locking_selects_are_never_explained() -> None:
+    log = SlowQueryLog(threshold_ms=0, explain_sample_rate=1.0)
+    conn = SimpleNamespace(engine=SimpleNamespace(dialect=postgresql.dialect()))
+
+    assert log._should_explain(conn, "SELECT * FROM stages", False)
+    for clause in ("FOR UPDATE", "for no key update", "FOR SHARE", "FOR KEY SHARE"):
+        statement = f"SELECT * FROM stages WHERE id = %(id)s {clause} SKIP LOCKED"
+        assert not log._should_explain(conn, statement, False)
+
+
+def test_failed_statements_do_not_leak_start_times(engine: Engine) -> None:
+    log = SlowQueryLog(threshold_ms=0)
+    log.install()
+    try:
+        with engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.exec_driver_sql("SELECT * FROM missing_table")
+            assert conn.info.get("slow_query_started") == []
+    finally:
+        log.uninstall()
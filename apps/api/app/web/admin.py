@@ -1,24 +1,42 @@
 from __future__ import annotations
 
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from app.application.use_cases.admin_catalog import (
+    CatalogCheckItemInput,
+    CatalogStageInput,
+    ImportCatalog,
+    ImportCatalogInput,
+)
 from app.application.use_cases.admin_stages import (
     AdminStageWithChecks,
     ListAdminStages,
-    UpsertCheckItem,
-    UpsertCheckItemInput,
-    UpsertStage,
-    UpsertStageInput,
+    SaveAdminStage,
+    SaveAdminStageCheckInput,
+    SaveAdminStageInput,
 )
+from app.infrastructure.catalog_cache import CatalogCache
+from app.infrastructure.profiling import ProfileStore, StoredProfile
 from app.infrastructure.repositories import SqlAlchemyStageRepo
-from app.web.dependencies import get_admin_token, get_db_session
+from app.infrastructure.slow_queries import SlowQueryLog
+from app.web.dependencies import (
+    get_admin_token,
+    get_catalog_cache,
+    get_db_session,
+    get_profile_store,
+    get_read_db_session,
+    get_slow_query_log,
+)
+from app.web.responses import HTTP_422_UNPROCESSABLE_CONTENT, FastJSONResponse
+from app.web.routing import AppRoute
 
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=AppRoute)
 
 
 class AdminCheckItemBody(BaseModel):
@@ -44,39 +62,20 @@ class AdminStageOut(AdminStageBody):
     id: str
 
 
+def _stage_body(sc: AdminStageWithChecks) -> dict[str, Any]:
+    # Stage and CheckItem serialize to exactly AdminStageOut's fields.
+    return {**vars(sc.stage), "checks": sc.checks}
+
+
 @router.get("/stages", response_model=list[AdminStageOut])
 def list_admin_stages(
     _admin: Annotated[str, Depends(get_admin_token)],
-    db: Annotated[Session, Depends(get_db_session)],
-) -> list[AdminStageOut]:
+    db: Annotated[Session, Depends(get_read_db_session)],
+) -> FastJSONResponse:
     repo = SqlAlchemyStageRepo(db)
     use_case = ListAdminStages(stage_repo=repo)
     result = use_case.execute()
-    out: list[AdminStageOut] = []
-    for sc in result.stages:
-        s = sc.stage
-        out.append(
-            AdminStageOut(
-                id=s.id,
-                slug=s.slug,
-                title=s.title,
-                short_explanation=s.short_explanation,
-                common_mistakes=s.common_mistakes,
-                must_document=s.must_document,
-                order_index=s.order_index,
-                checks=[
-                    AdminCheckItemBody(
-                        id=c.id,
-                        stage_id=c.stage_id,
-                        title=c.title,
-                        description=c.description,
-                        order_index=c.order_index,
-                    )
-                    for c in sc.checks
-                ],
-            )
-        )
-    return out
+    return FastJSONResponse([_stage_body(sc) for sc in result.stages])
 
 
 @router.post("/stages", response_model=AdminStageOut)
@@ -84,11 +83,11 @@ def upsert_admin_stage(
     body: AdminStageBody,
     _admin: Annotated[str, Depends(get_admin_token)],
     db: Annotated[Session, Depends(get_db_session)],
-) -> AdminStageOut:
-    repo = SqlAlchemyStageRepo(db)
-    upsert_stage = UpsertStage(stage_repo=repo)
-    saved_stage = upsert_stage.execute(
-        UpsertStageInput(
+    catalog: Annotated[CatalogCache, Depends(get_catalog_cache)],
+) -> FastJSONResponse:
+    use_case = SaveAdminStage(stage_repo=SqlAlchemyStageRepo(db))
+    saved = use_case.execute(
+        SaveAdminStageInput(
             id=body.id,
             slug=body.slug,
             title=body.title,
@@ -96,48 +95,287 @@ def upsert_admin_stage(
             common_mistakes=body.common_mistakes,
             must_document=body.must_document,
             order_index=body.order_index,
+            checks=[
+                SaveAdminStageCheckInput(
+                    id=check.id,
+                    title=check.title,
+                    description=check.description,
+                    order_index=check.order_index,
+                )
+                for check in body.checks
+            ],
         )
     )
+    # Commit first: a reload between invalidate() and the request's own
+    # commit would cache the old revision.
+    db.commit()
+    catalog.invalidate()
+    return FastJSONResponse(_stage_body(saved))
+
 
-    upsert_check = UpsertCheckItem(stage_repo=repo)
-    for check in body.checks:
-        upsert_check.execute(
-            UpsertCheckItemInput(
-                id=check.id,
-                stage_id=saved_stage.id,
-                title=check.title,
-                description=check.description,
-                order_index=check.order_index,
+class CatalogCheckItemBody(BaseModel):
+    id: str | None = None
+    title: str
+    description: str | None = None
+    order_index: int
+
+
+class CatalogStageBody(BaseModel):
+    id: str | None = None
+    slug: str
+    title: str
+    short_explanation: str
+    common_mistakes: str
+    must_document: str
+    order_index: int
+    checks: list[CatalogCheckItemBody] = []
+
+
+class CatalogDocumentBody(BaseModel):
+    stages: list[CatalogStageBody]
+
+
+class CatalogDocumentOut(BaseModel):
+    stages: list[AdminStageOut]
+
+
+class CatalogChangesOut(BaseModel):
+    # Null for new rows without an id in the document, until applied.
+    insert: list[str | None]
+    update: list[str]
+    delete: list[str]
+
+
+class CatalogImportOut(BaseModel):
+    dry_run: bool
+    applied: bool
+    stages: CatalogChangesOut
+    checks: CatalogChangesOut
+
+
+@router.get("/catalog", response_model=CatalogDocumentOut)
+def export_catalog(
+    _admin: Annotated[str, Depends(get_admin_token)],
+    db: Annotated[Session, Depends(get_db_session)],
+) -> FastJSONResponse:
+    use_case = ListAdminStages(stage_repo=SqlAlchemyStageRepo(db))
+    return FastJSONResponse(
+        {"stages": [_stage_body(sc) for sc in use_case.execute().stages]}
+    )
+
+
+@router.put("/catalog", response_model=CatalogImportOut)
+def import_catalog(
+    body: CatalogDocumentBody,
+    _admin: Annotated[str, Depends(get_admin_token)],
+    db: Annotated[Session, Depends(get_db_session)],
+    catalog: Annotated[CatalogCache, Depends(get_catalog_cache)],
+    dry_run: bool = Query(default=False),
+) -> CatalogImportOut:
+    use_case = ImportCatalog(stage_repo=SqlAlchemyStageRepo(db))
+    try:
+        result = use_case.execute(
+            ImportCatalogInput(
+                stages=[
+                    CatalogStageInput(
+                        id=s.id,
+                        slug=s.slug,
+                        title=s.title,
+                        short_explanation=s.short_explanation,
+                        common_mistakes=s.common_mistakes,
+                        must_document=s.must_document,
+                        order_index=s.order_index,
+                        checks=[
+                            CatalogCheckItemInput(
+                                id=c.id,
+                                title=c.title,
+                                description=c.description,
+                                order_index=c.order_index,
+                            )
+                            for c in s.checks
+                        ],
+                    )
+                    for s in body.stages
+                ],
+                dry_run=dry_run,
             )
         )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(exc),
+        ) from exc
+    if result.applied:
+        db.commit()
+        catalog.invalidate()
 
-    # re-use listing use-case to include updated checks
-    list_use_case = ListAdminStages(stage_repo=repo)
-    stages = list_use_case.execute().stages
-    sc: AdminStageWithChecks | None = next(
-        (s for s in stages if s.stage.id == saved_stage.id), None
+    diff = result.diff
+    hidden = frozenset() if result.applied else result.minted_ids
+    return CatalogImportOut(
+        dry_run=dry_run,
+        applied=result.applied,
+        stages=CatalogChangesOut(
+            insert=[None if s.id in hidden else s.id for s in diff.stages_to_insert],
+            update=[s.id for s in diff.stages_to_update],
+            delete=list(diff.stage_ids_to_delete),
+        ),
+        checks=CatalogChangesOut(
+            insert=[None if c.id in hidden else c.id for c in diff.checks_to_insert],
+            update=[c.id for c in diff.checks_to_update],
+            delete=list(diff.check_ids_to_delete),
+        ),
     )
-    if sc is None:
-        raise RuntimeError("Stage saved but not found")
-
-    s = sc.stage
-    return AdminStageOut(
-        id=s.id,
-        slug=s.slug,
-        title=s.title,
-        short_explanation=s.short_explanation,
-        common_mistakes=s.common_mistakes,
-        must_document=s.must_document,
-        order_index=s.order_index,
-        checks=[
-            AdminCheckItemBody(
-                id=c.id,
-                stage_id=c.stage_id,
-                title=c.title,
-                description=c.description,
-                order_index=c.order_index,
-            )
-            for c in sc.checks
-        ],
+
+
+class SlowQueryOut(BaseModel):
+    fingerprint: str
+    statement: str
+    count: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    last_seen: datetime | None
+    routes: dict[str, int]
+    use_cases: dict[str, int]
+    repo_methods: dict[str, int]
+    sample_parameters: Any
+    explain: str | None
+    explained_at: datetime | None
+
+
+def _require_slow_query_log(log: SlowQueryLog | None) -> SlowQueryLog:
+    if log is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Slow query log is disabled (SLOW_QUERY_MS=0)",
+        )
+    return log
+
+
+@router.get("/slow-queries", response_model=list[SlowQueryOut])
+def list_slow_queries(
+    _admin: Annotated[str, Depends(get_admin_token)],
+    log: Annotated[SlowQueryLog | None, Depends(get_slow_query_log)],
+    limit: int = Query(default=50, ge=1, le=500),
+) -> list[SlowQueryOut]:
+    entries = _require_slow_query_log(log).entries()[:limit]
+    return [
+        SlowQueryOut(
+            fingerprint=e.fingerprint,
+            statement=e.statement,
+            count=e.count,
+            total_ms=round(e.total_ms, 1),
+            mean_ms=round(e.total_ms / e.count, 1),
+            max_ms=round(e.max_ms, 1),
+            last_seen=e.last_seen,
+            routes=dict(e.routes),
+            use_cases=dict(e.use_cases),
+            repo_methods=dict(e.repo_methods),
+            sample_parameters=e.sample_parameters,
+            explain=e.explain,
+            explained_at=e.explained_at,
+        )
+        for e in entries
+    ]
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def clear_slow_queries(
+    _admin: Annotated[str, Depends(get_admin_token)],
+    log: Annotated[SlowQueryLog | None, Depends(get_slow_query_log)],
+) -> None:
+    _require_slow_query_log(log).clear()
+
+
+class ProfileSummaryOut(BaseModel):
+    id: str
+    created_at: datetime
+    method: str
+    path: str
+    route: str | None
+    mode: str
+    status_code: int
+    duration_ms: float
+
+
+class ProfileOut(ProfileSummaryOut):
+    summary: str
+    has_pstats: bool
+    has_collapsed: bool
+
+
+def _profile_summary(p: StoredProfile) -> ProfileSummaryOut:
+    return ProfileSummaryOut(
+        id=p.id,
+        created_at=p.created_at,
+        method=p.method,
+        path=p.path,
+        route=p.route,
+        mode=p.mode,
+        status_code=p.status_code,
+        duration_ms=round(p.duration_ms, 1),
+    )
+
+
+def _get_profile(store: ProfileStore, profile_id: str) -> StoredProfile:
+    profile = store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+    return profile
+
+
+@router.get("/profiles", response_model=list[ProfileSummaryOut])
+def list_profiles(
+    _admin: Annotated[str, Depends(get_admin_token)],
+    store: Annotated[ProfileStore, Depends(get_profile_store)],
+) -> list[ProfileSummaryOut]:
+    return [_profile_summary(p) for p in store.recent()]
+
+
+@router.get("/profiles/{profile_id}", response_model=ProfileOut)
+def get_profile(
+    profile_id: str,
+    _admin: Annotated[str, Depends(get_admin_token)],
+    store: Annotated[ProfileStore, Depends(get_profile_store)],
+) -> ProfileOut:
+    profile = _get_profile(store, profile_id)
+    return ProfileOut(
+        **_profile_summary(profile).model_dump(),
+        summary=profile.summary,
+        has_pstats=profile.pstats_dump is not None,
+        has_collapsed=profile.collapsed is not None,
+    )
+
+
+@router.get("/profiles/{profile_id}/pstats")
+def download_profile_pstats(
+    profile_id: str,
+    _admin: Annotated[str, Depends(get_admin_token)],
+    store: Annotated[ProfileStore, Depends(get_profile_store)],
+) -> Response:
+    profile = _get_profile(store, profile_id)
+    if profile.pstats_dump is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Not a cProfile profile"
+        )
+    return Response(
+        content=profile.pstats_dump,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile.id}.pstats"'},
     )
 
+
+@router.get("/profiles/{profile_id}/collapsed")
+def download_profile_collapsed(
+    profile_id: str,
+    _admin: Annotated[str, Depends(get_admin_token)],
+    store: Annotated[ProfileStore, Depends(get_profile_store)],
+) -> Response:
+    profile = _get_profile(store, profile_id)
+    if profile.collapsed is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Not a sampled profile"
+        )
+    return Response(content=profile.collapsed, media_type="text/plain")
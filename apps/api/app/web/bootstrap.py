@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import dataclasses
+from datetime import datetime
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.application.ports.repositories import ProjectRepo
+from app.application.use_cases.bootstrap import GetBootstrap, GetBootstrapInput
+from app.domain.entities import Stage
+from app.infrastructure.archive import (
+    ArchiveAwareCheckResultRepo,
+    ArchiveAwareStageStatusRepo,
+    SqlAlchemyProjectArchiveRepo,
+)
+from app.infrastructure.catalog_cache import CatalogCache
+from app.infrastructure.repositories import (
+    SqlAlchemyCheckResultRepo,
+    SqlAlchemyStageRepo,
+    SqlAlchemyStageStatusRepo,
+)
+from app.web.dependencies import (
+    get_catalog_cache,
+    get_current_user_id,
+    get_read_db_session,
+    get_read_project_repo,
+)
+from app.web.projects import ProjectOut
+from app.web.responses import HTTP_422_UNPROCESSABLE_CONTENT, FastJSONResponse
+from app.web.routing import AppRoute
+
+
+router = APIRouter(prefix="/bootstrap", tags=["bootstrap"], route_class=AppRoute)
+
+SECTIONS = ("projects", "stages", "progress")
+STAGE_FIELDS = tuple(f.name for f in dataclasses.fields(Stage))
+
+
+class StageProgressOut(BaseModel):
+    stage_id: str
+    status: str
+    checks_done: int
+    checks_total: int
+    updated_at: datetime | None
+
+
+class BootstrapOut(BaseModel):
+    # Sections that were not asked for are left out.
+    catalog_revision: int
+    projects: list[ProjectOut] | None = None
+    # StageOut, limited to stage_fields.
+    stages: list[dict[str, Any]] | None = None
+    progress: list[StageProgressOut] | None = None
+
+
+def _names(value: str | None, allowed: tuple[str, ...], param: str) -> set[str]:
+    if value is None:
+        return set(allowed)
+    names = {n.strip() for n in value.split(",") if n.strip()}
+    unknown = names - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Unknown {param}: {', '.join(sorted(unknown))}",
+        )
+    return names
+
+
+@router.get("", response_model=BootstrapOut)
+def get_bootstrap(
+    user_id: Annotated[str, Depends(get_current_user_id)],
+    db: Annotated[Session, Depends(get_read_db_session)],
+    project_repo: Annotated[ProjectRepo, Depends(get_read_project_repo)],
+    catalog: Annotated[CatalogCache, Depends(get_catalog_cache)],
+    project_id: str | None = Query(
+        default=None, description="Project whose per-stage progress to include."
+    ),
+    include: str | None = Query(
+        default=None,
+        description=f"Comma-separated sections; default all of {', '.join(SECTIONS)}.",
+    ),
+    stage_fields: str | None = Query(
+        default=None,
+        description="Comma-separated stage fields, e.g. id,title,order_index to "
+        "skip texts cached from an earlier response; `id` is always included.",
+    ),
+) -> FastJSONResponse:
+    """Projects, stage catalog and the selected project's progress at once.
+
+    One query for the projects and two for the progress, whatever the
+    catalog size; the catalog itself comes from the in-process cache.
+    """
+    sections = _names(include, SECTIONS, "include")
+    fields = _names(stage_fields, STAGE_FIELDS, "stage_fields") | {"id"}
+
+    snapshot = catalog.get(SqlAlchemyStageRepo(db))
+    archive = SqlAlchemyProjectArchiveRepo(db)
+    use_case = GetBootstrap(
+        project_repo=project_repo,
+        stage_status_repo=ArchiveAwareStageStatusRepo(
+            SqlAlchemyStageStatusRepo(db), archive
+        ),
+        check_result_repo=ArchiveAwareCheckResultRepo(
+            SqlAlchemyCheckResultRepo(db), archive
+        ),
+    )
+    try:
+        result = use_case.execute(
+            GetBootstrapInput(
+                owner_user_id=user_id,
+                stages=snapshot.stages,
+                checks=snapshot.checks,
+                project_id=project_id if "progress" in sections else None,
+                include_projects="projects" in sections,
+            )
+        )
+    except PermissionError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Project not found for owner",
+        ) from exc
+
+    body: dict[str, Any] = {"catalog_revision": snapshot.revision}
+    if result.projects is not None:
+        body["projects"] = [
+            {"id": p.id, "name": p.name, "location_text": p.location_text}
+            for p in result.projects
+        ]
+    if "stages" in sections:
+        if len(fields) == len(STAGE_FIELDS):
+            body["stages"] = snapshot.stages
+        else:
+            body["stages"] = [
+                {name: getattr(s, name) for name in STAGE_FIELDS if name in fields}
+                for s in snapshot.stages
+            ]
+    if result.progress is not None:
+        body["progress"] = result.progress
+    return FastJSONResponse(body)
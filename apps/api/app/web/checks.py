@@ -6,19 +6,28 @@ from fastapi import APIRouter, Depends, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from app.application.ports.repositories import ProjectRepo
 from app.application.use_cases.checks_notes_media import (
     UpdateCheckResult,
     UpdateCheckResultInput,
 )
+from app.infrastructure.archive import (
+    ArchiveAwareCheckResultRepo,
+    SqlAlchemyProjectArchiveRepo,
+)
 from app.infrastructure.repositories import (
     SqlAlchemyCheckResultRepo,
-    SqlAlchemyProjectRepo,
     SqlAlchemyStageRepo,
 )
-from app.web.dependencies import get_current_user_id, get_db_session
+from app.web.dependencies import (
+    get_current_user_id,
+    get_db_session,
+    get_project_repo,
+)
+from app.web.routing import AppRoute
 
 
-router = APIRouter(prefix="/projects", tags=["checks"])
+router = APIRouter(prefix="/projects", tags=["checks"], route_class=AppRoute)
 
 
 class UpdateCheckBody(BaseModel):
@@ -36,10 +45,12 @@ def update_check(
     body: UpdateCheckBody,
     user_id: Annotated[str, Depends(get_current_user_id)],
     db: Annotated[Session, Depends(get_db_session)],
+    project_repo: Annotated[ProjectRepo, Depends(get_project_repo)],
 ) -> None:
-    project_repo = SqlAlchemyProjectRepo(db)
     stage_repo = SqlAlchemyStageRepo(db)
-    check_repo = SqlAlchemyCheckResultRepo(db)
+    check_repo = ArchiveAwareCheckResultRepo(
+        SqlAlchemyCheckResultRepo(db), SqlAlchemyProjectArchiveRepo(db)
+    )
     use_case = UpdateCheckResult(
         project_repo=project_repo,
         stage_repo=stage_repo,
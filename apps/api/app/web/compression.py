@@ -0,0 +1,205 @@
+"""gzip/brotli response compression.
+
+`CompressionMiddleware` compresses compressible responses above a size
+threshold for clients that accept it. Bodies that only change with the
+catalog revision are compressed once instead, at the highest level, by
+`precompressed_response`; the middleware leaves those alone because they
+already carry Content-Encoding.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Any, Callable, MutableMapping
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # type: ignore[import-untyped]
+except ImportError:  # gzip only
+    brotli = None
+
+DEFAULT_MINIMUM_SIZE = 1024
+
+# Preference order when the client accepts several with the same q-value.
+ENCODINGS: tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+_COMPRESSIBLE = (
+    "application/json",
+    "application/problem+json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def negotiate(accept_encoding: str | None) -> str | None:
+    """Best of ENCODINGS allowed by an Accept-Encoding header, or None."""
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    best: str | None = None
+    best_q = 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, *, best: bool = False) -> bytes:
+    """One-shot compression; `best` trades CPU for size (cached bodies)."""
+    if encoding == "br":
+        assert brotli is not None
+        encoded: bytes = brotli.compress(body, quality=11 if best else 5)
+        return encoded
+    compressor = _gzip_compressor(9 if best else 6)
+    return compressor.compress(body) + compressor.flush()
+
+
+def _gzip_compressor(level: int) -> zlib._Compress:
+    # wbits=31: zlib stream with a gzip header and trailer.
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str) -> None:
+        self._br: Any = brotli.Compressor(quality=5) if encoding == "br" else None
+        self._gzip = _gzip_compressor(6)
+
+    def compress(self, chunk: bytes) -> bytes:
+        # Flush every chunk so streamed responses are not held back.
+        if self._br is not None:
+            encoded: bytes = self._br.process(chunk) + self._br.flush()
+            return encoded
+        return self._gzip.compress(chunk) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._br is not None:
+            encoded: bytes = self._br.finish()
+            return encoded
+        return self._gzip.flush()
+
+
+def _is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(_COMPRESSIBLE)
+
+
+class CompressionMiddleware:
+    """Negotiates br/gzip for compressible responses of `minimum_size` bytes
+    or more; smaller ones cost more to compress than they save on the wire.
+    """
+
+    def __init__(
+        self, app: ASGIApp, *, minimum_size: int = DEFAULT_MINIMUM_SIZE
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = (
+            negotiate(Headers(scope=scope).get("accept-encoding"))
+            if scope["type"] == "http"
+            else None
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        passthrough = False
+        stream: _StreamCompressor | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough, stream
+            if message["type"] == "http.response.start":
+                if _is_compressible(Headers(raw=message["headers"])):
+                    start = message  # held until the first body chunk
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body: bytes = message.get("body", b"")
+            more_body: bool = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=list(start["headers"]))
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send({**start, "headers": headers.raw})
+                    await send(message)
+                    return
+                headers["Content-Encoding"] = encoding
+                if more_body:
+                    stream = _StreamCompressor(encoding)
+                    del headers["Content-Length"]
+                else:
+                    body = compress(body, encoding)
+                    headers["Content-Length"] = str(len(body))
+                await send({**start, "headers": headers.raw})
+                start = None
+                if stream is None:
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+            assert stream is not None
+            chunk = stream.compress(body)
+            if not more_body:
+                chunk += stream.finish()
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_compressed)
+
+
+def precompressed_response(
+    request: Request,
+    cache: MutableMapping[str, bytes],
+    key: str,
+    render: Callable[[], bytes],
+    *,
+    media_type: str = "application/json",
+    minimum_size: int = DEFAULT_MINIMUM_SIZE,
+) -> Response:
+    """Response for a body kept in `cache` under `key` for the cache's lifetime.
+
+    `render` runs once; each negotiated encoding is compressed once, at the
+    best level. Concurrent first requests may both compress; either result
+    is kept.
+    """
+    body = cache.get(key)
+    if body is None:
+        body = cache.setdefault(key, render())
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    if encoding is not None and len(body) >= minimum_size:
+        encoded = cache.get(f"{key}.{encoding}")
+        if encoded is None:
+            encoded = cache.setdefault(
+                f"{key}.{encoding}", compress(body, encoding, best=True)
+            )
+        body = encoded
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type=media_type, headers=headers)
@@ -1,12 +1,31 @@
 from __future__ import annotations
 
+import hashlib
 import os
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, Iterator
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
+from starlette.datastructures import Headers
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.application.ports.auth import InvalidToken, TokenVerifier
+from app.application.ports.repositories import ProjectRepo
+from app.infrastructure.access_cache import CachedProjectRepo, ProjectAccessCache
+from app.infrastructure.catalog_cache import CatalogCache
+from app.infrastructure.idempotency import SqlIdempotencyStore
+from app.infrastructure.profiling import ProfileStore
+from app.infrastructure.replica import ReplicaRouter
+from app.infrastructure.rate_limit import (
+    MemoryBucketStore,
+    RateLimiter,
+    SqliteBucketStore,
+)
+from app.infrastructure.slow_queries import SlowQueryLog
+from app.infrastructure.warmup import Readiness
 from app.infrastructure.db import create_session_factory, session_scope
 from app.infrastructure.db.models import Base
+from app.infrastructure.repositories import SqlAlchemyProjectRepo
 
 
 def get_database_url() -> str:
@@ -16,15 +35,47 @@ def get_database_url() -> str:
     return url
 
 
+@lru_cache
+def _session_factory_for(database_url: str) -> sessionmaker[Session]:
+    # One engine (and connection pool) per process, not one per request.
+    return create_session_factory(database_url)
+
+
 def get_session_factory(
     database_url: Annotated[str, Depends(get_database_url)],
 ):
-    return create_session_factory(database_url)
+    return _session_factory_for(database_url)
+
+
+def caller_key(headers: Headers) -> str | None:
+    """Who is calling, as far as read-your-writes is concerned."""
+    credentials = headers.get("authorization") or headers.get("x-admin-token")
+    if not credentials:
+        return None
+    return hashlib.sha256(credentials.encode()).hexdigest()
+
+
+@lru_cache
+def get_replica_router() -> ReplicaRouter | None:
+    """Router to the DATABASE_READ_URL replica; None reads from the primary."""
+    url = os.getenv("DATABASE_READ_URL")
+    if not url:
+        return None
+    # Signs X-Last-Write stamps, so every instance needs the same one.
+    secret = os.getenv("READ_YOUR_WRITES_SECRET")
+    if not secret:
+        raise RuntimeError("READ_YOUR_WRITES_SECRET must be set with DATABASE_READ_URL")
+    return ReplicaRouter(
+        create_session_factory(url, pool_name="replica"),
+        secret=secret.encode(),
+        read_your_writes_seconds=float(os.getenv("READ_YOUR_WRITES_SECONDS", "5")),
+        max_lag_seconds=float(os.getenv("READ_REPLICA_MAX_LAG_SECONDS", "2")),
+    )
 
 
 def get_db_session(
-    session_factory=Depends(get_session_factory),
-):
+    session_factory: Annotated[sessionmaker[Session], Depends(get_session_factory)],
+) -> Iterator[Session]:
     session = session_factory()
     try:
         yield session
@@ -36,8 +87,64 @@ def get_db_session(
         session.close()
 
 
+def get_read_db_session(
+    request: Request,
+    db: Annotated[Session, Depends(get_db_session)],
+) -> Iterator[Session]:
+    """Session for read-only endpoints: the replica when it is safe to use.
+
+    Falls back to the primary session, which costs nothing unless used.
+    """
+    router = get_replica_router()
+    if router is None or not router.use_replica(
+        caller_key(request.headers), request.headers.get("x-last-write")
+    ):
+        yield db
+        return
+    session = router.replica()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@lru_cache
+def get_token_verifier() -> TokenVerifier | None:
+    """JWT verifier for the configured issuer; None means dev auth.
+
+    Set COGNITO_USER_POOL_ID (with AWS_REGION), or AUTH_ISSUER and
+    AUTH_JWKS_URL for another issuer. Without either, the bearer token is
+    taken as the user id, as in local development.
+    """
+    pool_id = os.getenv("COGNITO_USER_POOL_ID")
+    issuer = os.getenv("AUTH_ISSUER")
+    if pool_id and not issuer:
+        region = os.getenv("AWS_REGION") or pool_id.split("_", 1)[0]
+        issuer = f"https://cognito-idp.{region}.amazonaws.com/{pool_id}"
+    if not issuer:
+        return None
+    jwks_url = os.getenv("AUTH_JWKS_URL") or f"{issuer}/.well-known/jwks.json"
+
+    # Imported here: PyJWT/cryptography are not needed with dev auth.
+    from app.infrastructure.jwt_auth import JwksCache, JwtVerifier
+
+    jwks = JwksCache(
+        jwks_url,
+        refresh_seconds=float(os.getenv("AUTH_JWKS_REFRESH_SECONDS", "3600")),
+        min_refetch_seconds=float(os.getenv("AUTH_JWKS_MIN_REFETCH_SECONDS", "30")),
+    )
+    jwks.start_background_refresh()
+    return JwtVerifier(
+        jwks,
+        issuer=issuer,
+        audience=os.getenv("AUTH_AUDIENCE") or None,
+        cache_size=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000")),
+    )
+
+
 def get_current_user_id(
     authorization: Annotated[str | None, Header()] = None,
+    verifier: Annotated[TokenVerifier | None, Depends(get_token_verifier)] = None,
 ) -> str:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
@@ -50,7 +157,16 @@ def get_current_user_id(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Empty token",
         )
-    return token
+    if verifier is None:
+        return token
+    try:
+        return verifier.verify(token).user_id
+    except InvalidToken as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+            headers={"WWW-Authenticate": 'Bearer error="invalid_token"'},
+        ) from exc
 
 
 def get_admin_token(
@@ -64,3 +180,76 @@ def get_admin_token(
         )
     return admin_header
 
+
+@lru_cache
+def get_catalog_cache() -> CatalogCache:
+    return CatalogCache(
+        revalidate_seconds=float(os.getenv("CATALOG_REVALIDATE_SECONDS", "5"))
+    )
+
+
+@lru_cache
+def get_project_access_cache() -> ProjectAccessCache:
+    return ProjectAccessCache(
+        ttl_seconds=float(os.getenv("PROJECT_ACCESS_TTL_SECONDS", "30")),
+        max_entries=int(os.getenv("PROJECT_ACCESS_CACHE_SIZE", "10000")),
+    )
+
+
+def get_project_repo(
+    db: Annotated[Session, Depends(get_db_session)],
+    access: Annotated[ProjectAccessCache, Depends(get_project_access_cache)],
+) -> ProjectRepo:
+    # One per request (FastAPI caches dependencies per request), so every
+    # use case in the request shares its memo of access decisions.
+    return CachedProjectRepo(SqlAlchemyProjectRepo(db), access)
+
+
+def get_read_project_repo(
+    db: Annotated[Session, Depends(get_read_db_session)],
+    access: Annotated[ProjectAccessCache, Depends(get_project_access_cache)],
+) -> ProjectRepo:
+    return CachedProjectRepo(SqlAlchemyProjectRepo(db), access)
+
+
+@lru_cache
+def get_slow_query_log() -> SlowQueryLog | None:
+    # SLOW_QUERY_MS=0 turns the detector off.
+    threshold_ms = float(os.getenv("SLOW_QUERY_MS", "200"))
+    if threshold_ms <= 0:
+        return None
+    return SlowQueryLog(
+        threshold_ms=threshold_ms,
+        explain_sample_rate=float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0.1")),
+    )
+
+
+@lru_cache
+def get_profile_store() -> ProfileStore:
+    return ProfileStore(
+        keep=int(os.getenv("PROFILE_KEEP", "50")),
+        directory=os.getenv("PROFILE_DIR") or None,
+    )
+
+
+@lru_cache
+def get_idempotency_store() -> SqlIdempotencyStore:
+    return SqlIdempotencyStore(
+        _session_factory_for(get_database_url()),
+        ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")),
+    )
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimiter:
+    # With RATE_LIMIT_DB (a file on tmpfs) the workers of a host share their
+    # buckets; without it each worker enforces the limits on its own.
+    path = os.getenv("RATE_LIMIT_DB")
+    if path:
+        return RateLimiter(SqliteBucketStore(path))
+    return RateLimiter(MemoryBucketStore())
+
+
+@lru_cache
+def get_readiness() -> Readiness:
+    return Readiness()
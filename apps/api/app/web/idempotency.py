@@ -0,0 +1,218 @@
+"""Idempotency-Key support for POST routes.
+
+The mobile app retries writes on flaky networks. A POST sent with an
+`Idempotency-Key` header runs once per (user, key); its response is stored
+(see app/infrastructure/idempotency.py) and replayed to retries with
+`Idempotent-Replayed: true`, without running the endpoint again. A retry
+arriving while the first attempt still runs waits for its result.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Callable
+
+import anyio
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.idempotency import (
+    Claim,
+    ClaimState,
+    SqlIdempotencyStore,
+    StoredResponse,
+)
+from app.web.responses import HTTP_422_UNPROCESSABLE_CONTENT, FastJSONResponse
+
+MAX_KEY_LENGTH = 255
+# Outcomes of the moment rather than of the request (timeouts, conflicts,
+# rate limits): released like 5xx so a retry runs the endpoint again.
+TRANSIENT_STATUSES = frozenset({408, 409, 425, 429})
+
+
+def fingerprint(scope: Scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (scope["method"], scope["path"], scope.get("query_string", b"")):
+        digest.update(part.encode() if isinstance(part, str) else part)
+        digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware:
+    """Runs a keyed POST once per user and replays its response to retries.
+
+    Requests without a valid bearer token pass straight through (the route
+    rejects them). Responses of 5xx, failed requests and bodies over
+    `max_body_bytes` are not stored, so their retries run again.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        store: Callable[[], SqlIdempotencyStore],
+        user_id: Callable[[str | None], str],
+        wait_seconds: float = 10.0,
+        max_body_bytes: int = 1 << 20,
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.user_id = user_id
+        self.wait_seconds = wait_seconds
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = FastJSONResponse(
+                {"detail": "Invalid Idempotency-Key"}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        # The body is part of the fingerprint; buffer it and replay it to
+        # the app.
+        messages: list[Message] = []
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        async def replay_receive() -> Message:
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        request_fingerprint = fingerprint(scope, body)
+        try:
+            user_id, claim = await run_in_threadpool(
+                self._claim, headers.get("authorization"), key, request_fingerprint
+            )
+        except HTTPException:
+            await self.app(scope, replay_receive, send)
+            return
+
+        store = self.store()
+        deadline = time.monotonic() + self.wait_seconds
+        delay = 0.05
+        while claim.state is ClaimState.IN_PROGRESS and time.monotonic() < deadline:
+            await anyio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+            claim = await run_in_threadpool(
+                store.get, user_id, key, request_fingerprint
+            )
+            if claim.state is ClaimState.STARTED:
+                claim = await run_in_threadpool(
+                    store.claim, user_id, key, request_fingerprint
+                )
+
+        if claim.state is ClaimState.COMPLETED and claim.response is not None:
+            await self._replay(claim.response, send)
+        elif claim.state is ClaimState.MISMATCH:
+            response = FastJSONResponse(
+                {"detail": "Idempotency-Key was already used for another request"},
+                status_code=HTTP_422_UNPROCESSABLE_CONTENT,
+            )
+            await response(scope, receive, send)
+        elif claim.state is ClaimState.IN_PROGRESS:
+            response = FastJSONResponse(
+                {"detail": "A request with this Idempotency-Key is in progress"},
+                status_code=409,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+        else:
+            await self._run(
+                scope, replay_receive, send, store, user_id, key, request_fingerprint
+            )
+
+    def _claim(
+        self, authorization: str | None, key: str, request_fingerprint: str
+    ) -> tuple[str, Claim]:
+        # One threadpool hop for both: token verification and the claim
+        # may block.
+        user_id = self.user_id(authorization)
+        return user_id, self.store().claim(user_id, key, request_fingerprint)
+
+    async def _run(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        store: SqlIdempotencyStore,
+        user_id: str,
+        key: str,
+        request_fingerprint: str,
+    ) -> None:
+        status_code = 500
+        response_headers: list[list[str]] = []
+        chunks: list[bytes] = []
+        size = 0
+
+        async def capture(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers.extend(
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= self.max_body_bytes:
+                    chunks.append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            # Shielded: this also runs when the request is cancelled.
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(
+                    store.release, user_id, key, request_fingerprint
+                )
+            raise
+        if (
+            status_code >= 500
+            or status_code in TRANSIENT_STATUSES
+            or size > self.max_body_bytes
+        ):
+            await run_in_threadpool(store.release, user_id, key, request_fingerprint)
+            return
+        stored = StoredResponse(status_code, response_headers, b"".join(chunks))
+        await run_in_threadpool(
+            store.complete, user_id, key, request_fingerprint, stored
+        )
+
+    @staticmethod
+    async def _replay(response: StoredResponse, send: Send) -> None:
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in response.headers
+        ]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": response.body})
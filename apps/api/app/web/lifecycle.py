@@ -0,0 +1,90 @@
+"""Worker lifecycle under a preloading, forking server (see gunicorn.conf.py).
+
+1. The master imports the app and calls `preload_shared_state()`: the
+   catalog snapshot and its search index are built once and inherited by
+   every worker copy-on-write.
+2. Each forked worker calls `after_fork()` to drop the inherited pools.
+3. The app's `lifespan` warms the worker (connections, catalog, JWKS) in
+   the background; GET /readyz reports ready once that has succeeded.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from fastapi import FastAPI
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.infrastructure.db import dispose_engines, session_scope
+from app.infrastructure.repositories import SqlAlchemyStageRepo
+from app.infrastructure.warmup import start_warmup, warm_pool
+from app.web.dependencies import (
+    get_catalog_cache,
+    get_readiness,
+    get_session_factory,
+    get_token_verifier,
+)
+
+logger = logging.getLogger("app.warmup")
+
+
+def _load_catalog(session_factory: sessionmaker[Session]) -> None:
+    with session_scope(session_factory) as session:
+        get_catalog_cache().get(SqlAlchemyStageRepo(session))
+
+
+def preload_shared_state() -> None:
+    """Build read-mostly state in the master, right before workers fork."""
+    url = os.getenv("DATABASE_URL")
+    if url:
+        try:
+            _load_catalog(get_session_factory(url))
+        except Exception:
+            logger.exception("catalog preload failed; workers will load it")
+        finally:
+            # No connection may be shared with the children.
+            dispose_engines()
+    # Move everything allocated so far out of the collector's reach, so GC
+    # passes in the workers do not write to (and so copy) the shared pages.
+    gc.freeze()
+
+
+def after_fork() -> None:
+    dispose_engines(close=False)
+    get_readiness.cache_clear()
+
+
+def warmup_steps(session_factory: sessionmaker[Session]) -> list[Callable[[], None]]:
+    engine: Engine = session_factory.kw["bind"]
+    pool = engine.pool
+    default = pool.size() if isinstance(pool, QueuePool) else 1
+    connections = int(os.getenv("WARM_CONNECTIONS", str(default)))
+    steps: list[Callable[[], None]] = [
+        lambda: warm_pool(engine, connections),
+        lambda: _load_catalog(session_factory),
+    ]
+    verifier = get_token_verifier()
+    if verifier is not None:
+        from app.infrastructure.jwt_auth import JwtVerifier
+
+        if isinstance(verifier, JwtVerifier):
+            steps.append(verifier.jwks.refresh)
+    return steps
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    readiness = get_readiness()
+    url = os.getenv("DATABASE_URL")
+    if url:
+        # In the background: /health must answer while the worker warms up.
+        start_warmup(readiness, warmup_steps(get_session_factory(url)))
+    else:
+        readiness.mark_failed("DATABASE_URL not set")
+    yield
@@ -9,18 +9,31 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from app.application.ports.repositories import ProjectRepo
 from app.application.use_cases.checks_notes_media import (
     CreatePresignedUpload,
     CreatePresignedUploadInput,
     CreatePresignedUploadOutput,
 )
 from app.domain.entities import Media
+from app.infrastructure.archive import (
+    ArchiveAwareMediaRepo,
+    SqlAlchemyProjectArchiveRepo,
+)
 from app.infrastructure.media_s3 import S3MediaStorage
-from app.infrastructure.repositories import SqlAlchemyMediaRepo, SqlAlchemyProjectRepo
-from app.web.dependencies import get_current_user_id, get_db_session
+from app.infrastructure.repositories import SqlAlchemyMediaRepo
+from app.infrastructure.telemetry import timed
+from app.infrastructure.timing import TimedMediaStorage
+from app.web.dependencies import (
+    get_current_user_id,
+    get_db_session,
+    get_project_repo,
+)
+from app.web.rate_limit import rate_limit
+from app.web.routing import AppRoute
 
 
-router = APIRouter(prefix="/projects", tags=["media"])
+router = APIRouter(prefix="/projects", tags=["media"], route_class=AppRoute)
 
 
 class CreateMediaUploadBody(BaseModel):
@@ -40,15 +53,19 @@ class CreateMediaUploadResponse(BaseModel):
     "/{project_id}/media/upload",
     response_model=CreateMediaUploadResponse,
     status_code=status.HTTP_201_CREATED,
+    # Every call signs an S3 upload a client may then fill.
+    dependencies=[Depends(rate_limit("media_upload", user="30/m", ip="120/m"))],
 )
 def create_media_upload(
     project_id: str,
     body: CreateMediaUploadBody,
     user_id: Annotated[str, Depends(get_current_user_id)],
     db: Annotated[Session, Depends(get_db_session)],
+    project_repo: Annotated[ProjectRepo, Depends(get_project_repo)],
 ) -> CreateMediaUploadResponse:
-    project_repo = SqlAlchemyProjectRepo(db)
-    media_repo = SqlAlchemyMediaRepo(db)
+    media_repo = ArchiveAwareMediaRepo(
+        SqlAlchemyMediaRepo(db), SqlAlchemyProjectArchiveRepo(db)
+    )
 
     # מצב פיתוח בלי S3 אמיתי – שומרים רק מטא־דאטה בדאטהבייס ומשתמשים ב‑URI המקומי
     has_bucket = os.getenv("MEDIA_S3_BUCKET") or os.getenv("S3_BUCKET_NAME")
@@ -81,7 +98,10 @@ def create_media_upload(
 
     bucket = os.getenv("MEDIA_S3_BUCKET") or os.getenv("S3_BUCKET_NAME") or "dev-bucket"
     region = os.getenv("AWS_REGION")
-    storage = S3MediaStorage(bucket_name=bucket, region=region)
+    # The first upload per worker imports boto3 and builds the client; count it.
+    with timed("storage"):
+        s3 = S3MediaStorage(bucket_name=bucket, region=region)
+    storage = TimedMediaStorage(s3)
     use_case = CreatePresignedUpload(
         project_repo=project_repo,
         media_repo=media_repo,
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Response
+
+from app.infrastructure.metrics import render_latest
+
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
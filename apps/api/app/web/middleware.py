@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable
+
+from anyio.to_thread import current_default_thread_limiter
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.metrics import (
+    HTTP_IN_FLIGHT,
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    THREADPOOL_BUSY,
+    THREADPOOL_SIZE,
+)
+from app.infrastructure.profiling import (
+    PROFILE_MODES,
+    ProfileRequest,
+    ProfileStore,
+    reset_profile_request,
+    set_profile_request,
+)
+from app.infrastructure.replica import ReplicaRouter
+from app.infrastructure.telemetry import (
+    RequestStats,
+    install_query_tracking,
+    track_queries,
+)
+
+
+logger = logging.getLogger("app.requests")
+
+
+def server_timing(stats: RequestStats, total_seconds: float) -> str:
+    """Server-Timing value: db, each timed port, and the remaining app time."""
+    entries = [
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries"'
+    ]
+    accounted = stats.db_seconds
+    for category, seconds in sorted(stats.timings.items()):
+        entries.append(f"{category};dur={seconds * 1000:.1f}")
+        accounted += seconds
+    entries.append(f"app;dur={max(0.0, total_seconds - accounted) * 1000:.1f}")
+    entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class RequestStatsMiddleware:
+    """Per-request SQL statement count and time spent in DB, AI and storage.
+
+    Every request is logged as one key=value line (DEBUG, or WARNING above
+    `warn_statements`). `server_timing` adds a Server-Timing header and
+    `debug_headers` X-DB-Queries / X-DB-Time-ms.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        debug_headers: bool = False,
+        server_timing: bool = False,
+        warn_statements: int = 25,
+    ) -> None:
+        self.app = app
+        self.debug_headers = debug_headers
+        self.server_timing = server_timing
+        self.warn_statements = warn_statements
+        install_query_tracking()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        with track_queries() as stats:
+            stats.scope = scope
+
+            async def send_with_stats(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    if self.debug_headers or self.server_timing:
+                        headers = list(message.get("headers", []))
+                        if self.server_timing:
+                            value = server_timing(
+                                stats, time.perf_counter() - started
+                            )
+                            headers.append((b"server-timing", value.encode()))
+                        if self.debug_headers:
+                            headers.append(
+                                (b"x-db-queries", str(stats.statements).encode())
+                            )
+                            headers.append(
+                                (
+                                    b"x-db-time-ms",
+                                    f"{stats.db_seconds * 1000:.2f}".encode(),
+                                )
+                            )
+                        message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                elapsed = time.perf_counter() - started
+                level = (
+                    logging.WARNING
+                    if stats.statements > self.warn_statements
+                    else logging.DEBUG
+                )
+                if logger.isEnabledFor(level):
+                    timings = "".join(
+                        f" {category}_ms={seconds * 1000:.1f}"
+                        for category, seconds in sorted(stats.timings.items())
+                    )
+                    logger.log(
+                        level,
+                        "request method=%s path=%s status=%s total_ms=%.1f "
+                        "db_statements=%d db_ms=%.1f%s",
+                        scope["method"],
+                        scope["path"],
+                        status_code,
+                        elapsed * 1000,
+                        stats.statements,
+                        stats.db_seconds * 1000,
+                        timings,
+                    )
+
+
+class MetricsMiddleware:
+    """Prometheus request metrics labelled by route template.
+
+    The template (e.g. /projects/{project_id}/notes) is read from the route
+    FastAPI matched, keeping label cardinality bounded; requests that match
+    no route are counted as "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        limiter = current_default_thread_limiter()
+        THREADPOOL_SIZE.set(limiter.total_tokens)
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, template, str(status_code)).inc()
+            HTTP_LATENCY.labels(method, template).observe(
+                time.perf_counter() - started
+            )
+
+
+class ProfilingMiddleware:
+    """Profiles requests that carry `X-Profile: cprofile|sample` and a valid
+    X-Admin-Token; other requests pass straight through.
+
+    The endpoint call is profiled (see app/web/routing.py), the result kept
+    in the profile store and its id returned in X-Profile-Id. X-Profile-Mode
+    names the mode used: a cProfile request is sampled while another request
+    holds the profiler.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        store: ProfileStore,
+        check_admin_token: Callable[[str | None], object],
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.check_admin_token = check_admin_token
+
+    def _requested_mode(self, scope: Scope) -> str | None:
+        headers = Headers(scope=scope)
+        mode = headers.get("x-profile")
+        if mode is None:
+            return None
+        mode = "cprofile" if mode in {"1", "true"} else mode
+        if mode not in PROFILE_MODES:
+            return None
+        try:
+            self.check_admin_token(headers.get("x-admin-token"))
+        except HTTPException:
+            return None
+        return mode
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        mode = self._requested_mode(scope) if scope["type"] == "http" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        request = ProfileRequest(mode=mode)
+        started = time.perf_counter()
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start" and request.summary:
+                # The endpoint has returned by now; only streaming bodies are
+                # still running, and those are not profiled.
+                route = scope.get("route")
+                profile = self.store.add(
+                    request,
+                    method=scope["method"],
+                    path=scope["path"],
+                    route=getattr(route, "path", None),
+                    status_code=message["status"],
+                    duration_ms=(time.perf_counter() - started) * 1000,
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile.id.encode()))
+                headers.append((b"x-profile-mode", profile.mode.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = set_profile_request(request)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            reset_profile_request(token)
+
+
+class ReadYourWritesMiddleware:
+    """Answers successful writes with a signed X-Last-Write stamp.
+
+    Clients echo the latest stamp on every request; while it is recent, the
+    caller's reads skip the read replica (see app/infrastructure/replica.py).
+    Without a replica, or for anonymous callers, requests pass straight
+    through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        router: Callable[[], ReplicaRouter | None],
+        caller: Callable[[Headers], str | None],
+    ) -> None:
+        self.app = app
+        self.router = router
+        self.caller = caller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        router = self.router() if scope["type"] == "http" else None
+        caller = None
+        if router is not None and scope["method"] not in ("GET", "HEAD", "OPTIONS"):
+            caller = self.caller(Headers(scope=scope))
+        if router is None or caller is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_stamp(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-last-write", router.stamp_write(caller).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_stamp)
@@ -3,21 +3,36 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from app.application.ports.repositories import ProjectRepo
 from app.application.use_cases.checks_notes_media import (
     AddNote,
     AddNoteInput,
     ListNotesForProject,
     ListNotesForProjectInput,
+    SearchNotesForProject,
+    SearchNotesForProjectInput,
 )
-from app.infrastructure.repositories import SqlAlchemyNotesRepo, SqlAlchemyProjectRepo
-from app.web.dependencies import get_current_user_id, get_db_session
+from app.infrastructure.archive import (
+    ArchiveAwareNotesRepo,
+    SqlAlchemyProjectArchiveRepo,
+)
+from app.infrastructure.repositories import SqlAlchemyNotesRepo
+from app.web.dependencies import (
+    get_current_user_id,
+    get_db_session,
+    get_project_repo,
+    get_read_db_session,
+    get_read_project_repo,
+)
+from app.web.responses import FastJSONResponse
+from app.web.routing import AppRoute
 
 
-router = APIRouter(prefix="/projects", tags=["notes"])
+router = APIRouter(prefix="/projects", tags=["notes"], route_class=AppRoute)
 
 
 class CreateNoteBody(BaseModel):
@@ -32,15 +47,33 @@ class NoteOut(BaseModel):
     created_at: datetime
 
 
+class NoteSearchHitOut(BaseModel):
+    id: str
+    stage_id: str | None
+    body: str
+    snippet: str
+    rank: float
+    created_at: datetime
+
+
+class NoteSearchOut(BaseModel):
+    total: int
+    limit: int
+    offset: int
+    hits: list[NoteSearchHitOut]
+
+
 @router.post("/{project_id}/notes", status_code=status.HTTP_201_CREATED)
 def create_note(
     project_id: str,
     body: CreateNoteBody,
     user_id: Annotated[str, Depends(get_current_user_id)],
     db: Annotated[Session, Depends(get_db_session)],
+    project_repo: Annotated[ProjectRepo, Depends(get_project_repo)],
 ) -> None:
-    project_repo = SqlAlchemyProjectRepo(db)
-    notes_repo = SqlAlchemyNotesRepo(db)
+    notes_repo = ArchiveAwareNotesRepo(
+        SqlAlchemyNotesRepo(db), SqlAlchemyProjectArchiveRepo(db)
+    )
     use_case = AddNote(project_repo=project_repo, notes_repo=notes_repo)
     use_case.execute(
         AddNoteInput(
@@ -56,24 +89,78 @@ def create_note(
 def list_notes(
     project_id: str,
     user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Annotated[Session, Depends(get_db_session)],
+    db: Annotated[Session, Depends(get_read_db_session)],
+    project_repo: Annotated[ProjectRepo, Depends(get_read_project_repo)],
     stage_id: str | None = Query(default=None),
-) -> list[NoteOut]:
-    project_repo = SqlAlchemyProjectRepo(db)
-    notes_repo = SqlAlchemyNotesRepo(db)
+) -> FastJSONResponse:
+    notes_repo = ArchiveAwareNotesRepo(
+        SqlAlchemyNotesRepo(db), SqlAlchemyProjectArchiveRepo(db)
+    )
     use_case = ListNotesForProject(project_repo=project_repo, notes_repo=notes_repo)
     notes = use_case.execute(
         ListNotesForProjectInput(owner_user_id=user_id, project_id=project_id)
     )
     if stage_id is not None:
         notes = [n for n in notes if n.stage_id == stage_id]
-    return [
-        NoteOut(
-            id=n.id,
-            stage_id=n.stage_id,
-            body=n.body,
-            created_at=n.created_at,
-        )
-        for n in notes
-    ]
+    return FastJSONResponse(
+        [
+            {
+                "id": n.id,
+                "stage_id": n.stage_id,
+                "body": n.body,
+                "created_at": n.created_at,
+            }
+            for n in notes
+        ]
+    )
+
 
+@router.get("/{project_id}/notes/search", response_model=NoteSearchOut)
+def search_notes(
+    project_id: str,
+    user_id: Annotated[str, Depends(get_current_user_id)],
+    db: Annotated[Session, Depends(get_read_db_session)],
+    project_repo: Annotated[ProjectRepo, Depends(get_read_project_repo)],
+    q: str = Query(min_length=1, max_length=200),
+    stage_id: Annotated[list[str] | None, Query()] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+) -> FastJSONResponse:
+    notes_repo = ArchiveAwareNotesRepo(
+        SqlAlchemyNotesRepo(db), SqlAlchemyProjectArchiveRepo(db)
+    )
+    use_case = SearchNotesForProject(project_repo=project_repo, notes_repo=notes_repo)
+    try:
+        page = use_case.execute(
+            SearchNotesForProjectInput(
+                owner_user_id=user_id,
+                project_id=project_id,
+                query=q,
+                stage_ids=stage_id or [],
+                limit=limit,
+                offset=offset,
+            )
+        )
+    except PermissionError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Project not found for owner",
+        ) from exc
+    return FastJSONResponse(
+        {
+            "total": page.total,
+            "limit": limit,
+            "offset": offset,
+            "hits": [
+                {
+                    "id": h.note.id,
+                    "stage_id": h.note.stage_id,
+                    "body": h.note.body,
+                    "snippet": h.snippet,
+                    "rank": h.rank,
+                    "created_at": h.note.created_at,
+                }
+                for h in page.hits
+            ],
+        }
+    )
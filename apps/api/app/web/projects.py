@@ -4,19 +4,24 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, status
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
 
+from app.application.ports.repositories import ProjectRepo
 from app.application.use_cases.projects import (
     CreateProject,
     CreateProjectInput,
     ListProjects,
     ListProjectsInput,
 )
-from app.infrastructure.repositories import SqlAlchemyProjectRepo
-from app.web.dependencies import get_current_user_id, get_db_session
+from app.web.dependencies import (
+    get_current_user_id,
+    get_project_repo,
+    get_read_project_repo,
+)
+from app.web.responses import FastJSONResponse
+from app.web.routing import AppRoute
 
 
-router = APIRouter(prefix="/projects", tags=["projects"])
+router = APIRouter(prefix="/projects", tags=["projects"], route_class=AppRoute)
 
 
 class ProjectOut(BaseModel):
@@ -36,24 +41,24 @@ class CreateProjectBody(BaseModel):
 @router.get("", response_model=list[ProjectOut])
 def list_projects(
     user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Annotated[Session, Depends(get_db_session)],
-) -> list[ProjectOut]:
-    repo = SqlAlchemyProjectRepo(db)
+    repo: Annotated[ProjectRepo, Depends(get_read_project_repo)],
+) -> FastJSONResponse:
     use_case = ListProjects(project_repo=repo)
     result = use_case.execute(ListProjectsInput(owner_user_id=user_id))
-    return [
-        ProjectOut(id=p.id, name=p.name, location_text=p.location_text)
-        for p in result.projects
-    ]
+    return FastJSONResponse(
+        [
+            {"id": p.id, "name": p.name, "location_text": p.location_text}
+            for p in result.projects
+        ]
+    )
 
 
 @router.post("", response_model=ProjectOut, status_code=status.HTTP_201_CREATED)
 def create_project(
     body: CreateProjectBody,
     user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Annotated[Session, Depends(get_db_session)],
+    repo: Annotated[ProjectRepo, Depends(get_project_repo)],
 ) -> ProjectOut:
-    repo = SqlAlchemyProjectRepo(db)
     use_case = CreateProject(project_repo=repo)
     result = use_case.execute(
         CreateProjectInput(
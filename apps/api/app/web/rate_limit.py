@@ -0,0 +1,96 @@
+"""Per-route rate limits, per user and per client IP.
+
+Add `rate_limit(name, user=..., ip=...)` to a route's dependencies. The
+defaults can be overridden per deployment with RATE_LIMIT_<NAME>_USER and
+RATE_LIMIT_<NAME>_IP ("20/m", "100/1h"; "off" disables that bucket).
+Allowed responses carry RateLimit-Limit/-Remaining/-Reset for the tighter
+bucket; rejected ones are 429 with Retry-After.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from functools import lru_cache
+from typing import Annotated, Any, Callable, Coroutine
+
+import anyio
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from app.infrastructure.metrics import RATE_LIMITED
+from app.infrastructure.rate_limit import Decision, Limit
+from app.web.dependencies import get_current_user_id, get_rate_limiter
+
+
+@lru_cache
+def _configured(name: str, scope: str, default: str | None) -> Limit | None:
+    value = os.getenv(f"RATE_LIMIT_{name.upper()}_{scope.upper()}", default or "")
+    if not value or value.strip().lower() in ("0", "off"):
+        return None
+    return Limit.parse(value)
+
+
+def client_ip(request: Request) -> str:
+    # Behind the ALB the peer is the load balancer. It appends the address it
+    # saw to X-Forwarded-For, so only the last entry is not client-supplied.
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _headers(decision: Decision) -> dict[str, str]:
+    headers = {
+        "RateLimit-Limit": str(decision.limit),
+        "RateLimit-Remaining": str(decision.remaining),
+        "RateLimit-Reset": str(math.ceil(decision.reset_after)),
+    }
+    if not decision.allowed:
+        headers["Retry-After"] = str(max(1, math.ceil(decision.retry_after)))
+    return headers
+
+
+def rate_limit(
+    name: str, *, user: str | None = None, ip: str | None = None
+) -> Callable[..., Coroutine[Any, Any, None]]:
+    """Dependency enforcing the `name` limits for the current user and IP."""
+
+    # Async, and the limiter is not a dependency of its own: each sync
+    # dependency is a threadpool round trip, far slower than an in-memory
+    # check. Only a store that can block is called from a worker thread.
+    async def check(
+        request: Request,
+        response: Response,
+        user_id: Annotated[str, Depends(get_current_user_id)],
+    ) -> None:
+        scopes: list[str] = []
+        buckets: list[tuple[str, Limit]] = []
+        for scope, key, default in (
+            ("user", user_id, user),
+            ("ip", client_ip(request), ip),
+        ):
+            limit = _configured(name, scope, default)
+            if limit is not None:
+                scopes.append(scope)
+                buckets.append((f"{name}:{scope}:{key}", limit))
+        if not buckets:
+            return
+        # All buckets are checked before any is charged: a request the IP
+        # bucket refuses does not use up the user's allowance.
+        limiter = get_rate_limiter()
+        if limiter.store.blocking:
+            decisions = await anyio.to_thread.run_sync(limiter.hit_all, buckets)
+        else:
+            decisions = limiter.hit_all(buckets)
+        for scope, decision in zip(scopes, decisions, strict=True):
+            if not decision.allowed:
+                RATE_LIMITED.labels(name, scope).inc()
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Rate limit exceeded",
+                    headers=_headers(decision),
+                )
+        tightest = min(decisions, key=lambda d: d.remaining)
+        response.headers.update(_headers(tightest))
+
+    return check
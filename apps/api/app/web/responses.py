@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# status.HTTP_422_UNPROCESSABLE_ENTITY in older Starlette, renamed to this in
+# newer ones; the app supports both, so it spells the code out once here.
+HTTP_422_UNPROCESSABLE_CONTENT = 422
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON rendered with orjson; dataclasses, datetimes and enums natively.
+
+    It is the app's default response class. Routes on hot paths also return
+    it directly with content built from domain dataclasses, which skips
+    FastAPI's response_model validation and encoding; the `response_model`
+    on those routes then only documents the shape, so keep the two in sync.
+    UTC datetimes end in "Z", like Pydantic's output.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
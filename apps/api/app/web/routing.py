@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import functools
+import inspect
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+
+from app.infrastructure.profiling import current_profile_request
+
+
+def _profiled(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    # FastAPI reads the signature through functools.wraps (__wrapped__), so
+    # dependencies and parameters resolve exactly as for the original.
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def run_async(*args: Any, **kwargs: Any) -> Any:
+            request = current_profile_request()
+            if request is None:
+                return await endpoint(*args, **kwargs)
+            return await request.run_async(endpoint, *args, **kwargs)
+
+        return run_async
+
+    @functools.wraps(endpoint)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        # Sync endpoints run in the threadpool; profiling here (rather than in
+        # the middleware) captures the worker thread that does the work.
+        request = current_profile_request()
+        if request is None:
+            return endpoint(*args, **kwargs)
+        return request.run(endpoint, *args, **kwargs)
+
+    return run
+
+
+class AppRoute(APIRoute):
+    """Route class shared by all routers; hooks on-demand profiling."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _profiled(endpoint), **kwargs)
@@ -1,28 +1,47 @@
 from __future__ import annotations
 
-from typing import Annotated
+import os
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from app.application.ports.repositories import ProjectRepo, ProjectStageView
 from app.application.use_cases.stages import (
     GetProjectStageView,
     GetProjectStageViewInput,
-    ListStages,
+    SearchCatalog,
+    SearchCatalogInput,
 )
+from app.infrastructure.archive import (
+    ArchiveAwareCheckResultRepo,
+    ArchiveAwareMediaRepo,
+    ArchiveAwareNotesRepo,
+    ArchiveAwareStageStatusRepo,
+    SqlAlchemyProjectArchiveRepo,
+)
+from app.infrastructure.catalog_cache import CatalogCache
 from app.infrastructure.repositories import (
     SqlAlchemyCheckResultRepo,
     SqlAlchemyMediaRepo,
     SqlAlchemyNotesRepo,
-    SqlAlchemyProjectRepo,
     SqlAlchemyStageRepo,
     SqlAlchemyStageStatusRepo,
 )
-from app.web.dependencies import get_current_user_id, get_db_session
+from app.web.dependencies import (
+    get_catalog_cache,
+    get_current_user_id,
+    get_read_db_session,
+    get_read_project_repo,
+)
+from app.web.compression import precompressed_response
+from app.web.responses import FastJSONResponse
+from app.web.routing import AppRoute
 
 
-router = APIRouter(prefix="/stages", tags=["stages"])
+router = APIRouter(prefix="/stages", tags=["stages"], route_class=AppRoute)
 
 
 class StageOut(BaseModel):
@@ -35,14 +54,61 @@ class StageOut(BaseModel):
     order_index: int
 
 
+# Read endpoints return FastJSONResponse built straight from the domain
+# dataclasses (Stage serializes to exactly StageOut); response_model only
+# documents the shape.
+
+
 @router.get("", response_model=list[StageOut])
 def list_stages(
-    db: Annotated[Session, Depends(get_db_session)],
-) -> list[StageOut]:
-    stage_repo = SqlAlchemyStageRepo(db)
-    use_case = ListStages(stage_repo=stage_repo)
-    result = use_case.execute()
-    return [StageOut(**vars(s)) for s in result.stages]
+    request: Request,
+    db: Annotated[Session, Depends(get_read_db_session)],
+    catalog: Annotated[CatalogCache, Depends(get_catalog_cache)],
+) -> Response:
+    # The list only changes with the catalog revision: render and compress
+    # it once per cached snapshot.
+    snapshot = catalog.get(SqlAlchemyStageRepo(db))
+    return precompressed_response(
+        request,
+        snapshot.bodies,
+        "stages",
+        lambda: bytes(FastJSONResponse(snapshot.stages).body),
+    )
+
+
+class CatalogSearchCheckOut(BaseModel):
+    id: str
+    title: str
+
+
+class CatalogSearchHitOut(BaseModel):
+    stage: StageOut
+    checks: list[CatalogSearchCheckOut]
+    score: float
+
+
+@router.get("/search", response_model=list[CatalogSearchHitOut])
+def search_stages(
+    db: Annotated[Session, Depends(get_read_db_session)],
+    catalog: Annotated[CatalogCache, Depends(get_catalog_cache)],
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+) -> FastJSONResponse:
+    # Served from the in-memory index; the session is only used when the
+    # cached catalog is due for revalidation.
+    snapshot = catalog.get(SqlAlchemyStageRepo(db))
+    use_case = SearchCatalog(index=snapshot.search_index)
+    result = use_case.execute(SearchCatalogInput(query=q, limit=limit))
+    return FastJSONResponse(
+        [
+            {
+                "stage": h.stage,
+                "checks": [{"id": c.id, "title": c.title} for c in h.checks],
+                "score": h.score,
+            }
+            for h in result.hits
+        ]
+    )
 
 
 class CheckItemOut(BaseModel):
@@ -78,14 +144,16 @@ def get_project_stage_view(
     project_id: str,
     stage_id: str,
     user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Annotated[Session, Depends(get_db_session)],
-) -> ProjectStageViewOut:
-    project_repo = SqlAlchemyProjectRepo(db)
+    db: Annotated[Session, Depends(get_read_db_session)],
+    project_repo: Annotated[ProjectRepo, Depends(get_read_project_repo)],
+) -> FastJSONResponse:
     stage_repo = SqlAlchemyStageRepo(db)
-    status_repo = SqlAlchemyStageStatusRepo(db)
-    check_repo = SqlAlchemyCheckResultRepo(db)
-    notes_repo = SqlAlchemyNotesRepo(db)
-    media_repo = SqlAlchemyMediaRepo(db)
+    # Archived projects are served from their snapshot.
+    archive = SqlAlchemyProjectArchiveRepo(db)
+    status_repo = ArchiveAwareStageStatusRepo(SqlAlchemyStageStatusRepo(db), archive)
+    check_repo = ArchiveAwareCheckResultRepo(SqlAlchemyCheckResultRepo(db), archive)
+    notes_repo = ArchiveAwareNotesRepo(SqlAlchemyNotesRepo(db), archive)
+    media_repo = ArchiveAwareMediaRepo(SqlAlchemyMediaRepo(db), archive)
 
     use_case = GetProjectStageView(
         project_repo=project_repo,
@@ -103,49 +171,41 @@ def get_project_stage_view(
             stage_id=stage_id,
         )
     )
-    v = result.view
+    return FastJSONResponse(stage_view_body(result.view))
+
+
+def stage_view_body(v: ProjectStageView) -> dict[str, Any]:
+    """ProjectStageViewOut as plain data, ready for FastJSONResponse."""
     results_by_check_id = {r.check_item_id: r for r in v.check_results}
 
     # בניית URL ציבורי/לצורכי תצוגה לתמונות (בהנחה שהבאקט מאפשר GET)
-    import os
-
     bucket = os.getenv("MEDIA_S3_BUCKET") or os.getenv("S3_BUCKET_NAME")
     region = os.getenv("AWS_REGION") or "us-east-1"
-    return ProjectStageViewOut(
-        project_id=v.project.id,
-        stage=StageOut(
-            id=v.stage.id,
-            slug=v.stage.slug,
-            title=v.stage.title,
-            short_explanation=v.stage.short_explanation,
-            common_mistakes=v.stage.common_mistakes,
-            must_document=v.stage.must_document,
-            order_index=v.stage.order_index,
-        ),
-        check_items=[
-            CheckItemOut(
-                id=c.id,
-                title=c.title,
-                description=c.description,
-                order_index=c.order_index,
-                is_done=results_by_check_id.get(c.id).is_done
-                if c.id in results_by_check_id
-                else False,
-                note=results_by_check_id.get(c.id).note
-                if c.id in results_by_check_id
-                else None,
-            )
-            for c in v.check_items
-        ],
-        media=[
-            MediaOut(
-                id=m.id,
-                url=f"https://{bucket}.s3.{region}.amazonaws.com/{m.storage_path}"
+    check_items = []
+    for c in v.check_items:
+        r = results_by_check_id.get(c.id)
+        check_items.append(
+            {
+                "id": c.id,
+                "title": c.title,
+                "description": c.description,
+                "order_index": c.order_index,
+                "is_done": r.is_done if r is not None else False,
+                "note": r.note if r is not None else None,
+            }
+        )
+    return {
+        "project_id": v.project.id,
+        "stage": v.stage,
+        "check_items": check_items,
+        "media": [
+            {
+                "id": m.id,
+                "url": f"https://{bucket}.s3.{region}.amazonaws.com/{m.storage_path}"
                 if bucket
                 else m.storage_path,
-                caption=m.caption,
-            )
+                "caption": m.caption,
+            }
             for m in v.media
         ],
-    )
-
+    }
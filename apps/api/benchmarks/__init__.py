@@ -0,0 +1 @@
+"""Benchmarks for apps/api (run manually against a migrated database)."""
@@ -0,0 +1,174 @@
+"""Synthetic users/projects for the endpoint benchmarks.
+
+Every seeded project belongs to an owner named `<prefix>-user-<n>`, so a run
+can be removed again with `drop_dataset` (everything else cascades from
+`projects`). Needs a seeded stage catalog (`python -m
+app.infrastructure.db.seed`).
+"""
+
+from __future__ import annotations
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.infrastructure.db.models import (
+    ProjectCheckResultModel,
+    ProjectMediaModel,
+    ProjectModel,
+    ProjectNoteModel,
+    StageCheckItemModel,
+    StageModel,
+)
+
+_WORDS = [
+    "בטון", "יציקה", "ברזל", "טפסנות", "קבלן", "אינסטלטור", "חשמלאי", "איטום",
+    "רטיבות", "סדק", "חלון", "דלת", "ריצוף", "טיח", "צבע", "מפקח", "מהנדס",
+    "היתר", "תשלום", "חשבונית", "הזמנה", "משלוח", "מחר", "בבוקר", "להתקשר",
+]
+
+_BATCH = 5000
+
+
+@dataclass(frozen=True)
+class DatasetScale:
+    users: int = 20
+    projects_per_user: int = 3
+    notes_per_project: int = 50
+    media_per_project: int = 20
+    # Fraction of the catalog's check items that have a result per project.
+    checked_fraction: float = 0.5
+
+
+@dataclass
+class SeededProject:
+    id: str
+    owner_user_id: str
+
+
+@dataclass
+class Dataset:
+    prefix: str
+    users: list[str]
+    projects: list[SeededProject]
+    stage_ids: list[str]
+    check_ids_by_stage: dict[str, list[str]] = field(default_factory=dict)
+
+
+def _flush(session: Session, model: type[Any], rows: list[dict[str, Any]]) -> None:
+    if rows:
+        session.execute(insert(model), rows)
+        rows.clear()
+
+
+def seed_dataset(
+    session_factory: sessionmaker[Session],
+    scale: DatasetScale,
+    *,
+    seed: int = 1,
+    prefix: str | None = None,
+) -> Dataset:
+    rng = random.Random(seed)
+    prefix = prefix or f"bench-{uuid.uuid4().hex[:8]}"
+    now = datetime.now(timezone.utc)
+
+    with session_factory() as session:
+        stage_ids = list(
+            session.scalars(select(StageModel.id).order_by(StageModel.order_index))
+        )
+        if not stage_ids:
+            raise RuntimeError("Stage catalog is empty; run the seed script first.")
+        check_ids_by_stage: dict[str, list[str]] = {s: [] for s in stage_ids}
+        for stage_id, check_id in session.execute(
+            select(StageCheckItemModel.stage_id, StageCheckItemModel.id)
+        ):
+            check_ids_by_stage[stage_id].append(check_id)
+        all_checks = [c for checks in check_ids_by_stage.values() for c in checks]
+
+        users = [f"{prefix}-user-{n}" for n in range(scale.users)]
+        projects: list[SeededProject] = []
+        project_rows: list[dict[str, Any]] = []
+        for user in users:
+            for n in range(scale.projects_per_user):
+                project = SeededProject(id=str(uuid.uuid4()), owner_user_id=user)
+                projects.append(project)
+                project_rows.append(
+                    {
+                        "id": project.id,
+                        "owner_user_id": user,
+                        "name": f"פרויקט {n + 1}",
+                        "location_text": None,
+                        "created_at": now - timedelta(days=n),
+                    }
+                )
+        _flush(session, ProjectModel, project_rows)
+
+        results: list[dict[str, Any]] = []
+        notes: list[dict[str, Any]] = []
+        media: list[dict[str, Any]] = []
+        checked = int(len(all_checks) * scale.checked_fraction)
+        for project in projects:
+            for check_id in rng.sample(all_checks, checked):
+                results.append(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "project_id": project.id,
+                        "check_item_id": check_id,
+                        "is_done": rng.random() < 0.7,
+                        "note": None,
+                        "updated_at": now,
+                    }
+                )
+            for i in range(scale.notes_per_project):
+                notes.append(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "project_id": project.id,
+                        "stage_id": rng.choice(stage_ids),
+                        "body": " ".join(
+                            rng.choice(_WORDS) for _ in range(rng.randint(6, 40))
+                        ),
+                        "created_at": now - timedelta(minutes=i),
+                    }
+                )
+            for i in range(scale.media_per_project):
+                media.append(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "project_id": project.id,
+                        "stage_id": rng.choice(stage_ids),
+                        "storage_path": f"{project.id}/{i}.jpg",
+                        "caption": None,
+                        "taken_at": None,
+                        "created_at": now - timedelta(minutes=i),
+                    }
+                )
+            if len(results) + len(notes) + len(media) >= _BATCH:
+                _flush(session, ProjectCheckResultModel, results)
+                _flush(session, ProjectNoteModel, notes)
+                _flush(session, ProjectMediaModel, media)
+        _flush(session, ProjectCheckResultModel, results)
+        _flush(session, ProjectNoteModel, notes)
+        _flush(session, ProjectMediaModel, media)
+        session.commit()
+
+    return Dataset(
+        prefix=prefix,
+        users=users,
+        projects=projects,
+        stage_ids=stage_ids,
+        check_ids_by_stage=check_ids_by_stage,
+    )
+
+
+def drop_dataset(session_factory: sessionmaker[Session], dataset: Dataset) -> None:
+    with session_factory() as session:
+        session.execute(
+            delete(ProjectModel).where(ProjectModel.owner_user_id.in_(dataset.users))
+        )
+        session.commit()
@@ -0,0 +1,311 @@
+"""Replay scripted mobile sessions against a running API.
+
+Start the API without S3 settings (media uploads then stay in dev mode and
+only record metadata) and point the generator at it:
+
+    uvicorn app.main:app --port 8000 &
+    python -m benchmarks.load --base-url http://localhost:8000 \\
+        --users 200 --arrival-rate 20 --duration 120 --output load.json
+
+Each session is a new owner id: it lists its projects (creating one),
+opens a few stages, ticks checks, adds notes and requests an upload,
+pausing for an exponentially distributed think time between steps.
+Sessions arrive as a Poisson process at `--arrival-rate` per second until
+`--duration` is over (an open model: arrivals do not wait for the server),
+each runs once, and at most `--users` run at once. An arrival finding all
+of them busy is dropped and counted, rather than delayed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from benchmarks.stats import summarize_ms
+
+# Upper bounds in milliseconds; the last bucket catches everything slower.
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+@dataclass
+class RouteStats:
+    samples: list[float] = field(default_factory=list)
+    errors: int = 0
+    histogram: list[int] = field(
+        default_factory=lambda: [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+    )
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.samples.append(seconds)
+        if not ok:
+            self.errors += 1
+        ms = seconds * 1000
+        for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if ms <= bound:
+                self.histogram[i] += 1
+                return
+        self.histogram[-1] += 1
+
+
+@dataclass
+class Config:
+    think_time: float
+    stages_per_session: int
+    checks_per_stage: int
+    notes_per_session: int
+    uploads_per_session: int
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.routes: dict[str, RouteStats] = defaultdict(RouteStats)
+        self.sessions = 0
+        self.dropped_sessions = 0
+
+    async def call(
+        self,
+        client: httpx.AsyncClient,
+        route: str,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.routes[route].record(time.perf_counter() - started, ok=False)
+            return None
+        self.routes[route].record(
+            time.perf_counter() - started, ok=response.status_code < 400
+        )
+        return response
+
+
+async def _think(rng: random.Random, config: Config) -> None:
+    if config.think_time > 0:
+        await asyncio.sleep(rng.expovariate(1 / config.think_time))
+
+
+async def run_session(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    user_id: str,
+    rng: random.Random,
+    config: Config,
+) -> None:
+    headers = {"Authorization": f"Bearer {user_id}"}
+
+    response = await recorder.call(
+        client, "GET /projects", "GET", "/projects", headers=headers
+    )
+    projects = response.json() if response and response.is_success else []
+    if not projects:
+        response = await recorder.call(
+            client,
+            "POST /projects",
+            "POST",
+            "/projects",
+            headers=headers,
+            json={"name": "הבית שלי", "location_text": None},
+        )
+        if response is None or not response.is_success:
+            return
+        projects = [response.json()]
+    project_id = rng.choice(projects)["id"]
+
+    response = await recorder.call(client, "GET /stages", "GET", "/stages")
+    if response is None or not response.is_success:
+        return
+    stages = response.json()
+    await _think(rng, config)
+
+    for stage in rng.sample(stages, min(config.stages_per_session, len(stages))):
+        response = await recorder.call(
+            client,
+            "GET /stages/projects/{project_id}/{stage_id}",
+            "GET",
+            f"/stages/projects/{project_id}/{stage['id']}",
+            headers=headers,
+        )
+        if response is None or not response.is_success:
+            continue
+        check_items = response.json()["check_items"]
+        await _think(rng, config)
+
+        for item in rng.sample(
+            check_items, min(config.checks_per_stage, len(check_items))
+        ):
+            await recorder.call(
+                client,
+                "POST /projects/{project_id}/checks/{check_item_id}",
+                "POST",
+                f"/projects/{project_id}/checks/{item['id']}",
+                headers=headers,
+                json={"is_done": True, "note": None},
+            )
+            await _think(rng, config)
+
+        for _ in range(config.notes_per_session):
+            await recorder.call(
+                client,
+                "POST /projects/{project_id}/notes",
+                "POST",
+                f"/projects/{project_id}/notes",
+                headers=headers,
+                json={"stage_id": stage["id"], "body": "צריך לבדוק שוב מחר"},
+            )
+            await _think(rng, config)
+
+        for _ in range(config.uploads_per_session):
+            await recorder.call(
+                client,
+                "POST /projects/{project_id}/media/upload",
+                "POST",
+                f"/projects/{project_id}/media/upload",
+                headers=headers,
+                json={
+                    "stage_id": stage["id"],
+                    "filename": "photo.jpg",
+                    "content_type": "image/jpeg",
+                    "local_uri": f"file:///load/{uuid.uuid4()}.jpg",
+                },
+            )
+            await _think(rng, config)
+
+
+async def run_load(
+    *,
+    base_url: str,
+    users: int,
+    arrival_rate: float,
+    duration: float,
+    seed: int,
+    config: Config,
+) -> tuple[Recorder, float]:
+    recorder = Recorder()
+    rng = random.Random(seed)
+    run_id = uuid.uuid4().hex[:8]
+    deadline = time.monotonic() + duration
+    slots = asyncio.Semaphore(users)
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+
+    started = time.monotonic()
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=30.0
+    ) as client:
+
+        async def session(n: int) -> None:
+            try:
+                await run_session(
+                    client,
+                    recorder,
+                    f"load-{run_id}-{n}",
+                    random.Random(rng.random()),
+                    config,
+                )
+            finally:
+                slots.release()
+
+        tasks: list[asyncio.Task[None]] = []
+        n = 0
+        while True:
+            await asyncio.sleep(rng.expovariate(arrival_rate))
+            if time.monotonic() >= deadline:
+                break
+            n += 1
+            if slots.locked():
+                recorder.dropped_sessions += 1
+                continue
+            await slots.acquire()
+            recorder.sessions += 1
+            tasks.append(asyncio.create_task(session(n)))
+        await asyncio.gather(*tasks)
+    return recorder, time.monotonic() - started
+
+
+def report(recorder: Recorder, elapsed: float) -> dict[str, Any]:
+    total = sum(len(s.samples) for s in recorder.routes.values())
+    errors = sum(s.errors for s in recorder.routes.values())
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "sessions": recorder.sessions,
+        "dropped_sessions": recorder.dropped_sessions,
+        "histogram_buckets_ms": list(HISTOGRAM_BUCKETS_MS),
+        "routes": {
+            name: {
+                **summarize_ms(stats.samples),
+                "rps": round(len(stats.samples) / elapsed, 2) if elapsed else 0.0,
+                "errors": stats.errors,
+                "error_rate": round(stats.errors / len(stats.samples), 4),
+                "histogram": stats.histogram,
+            }
+            for name, stats in sorted(recorder.routes.items())
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument(
+        "--users", type=int, default=50, help="max concurrent sessions"
+    )
+    parser.add_argument("--arrival-rate", type=float, default=5.0, help="per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds")
+    parser.add_argument("--think-time", type=float, default=1.0, help="mean seconds")
+    parser.add_argument("--stages-per-session", type=int, default=2)
+    parser.add_argument("--checks-per-stage", type=int, default=3)
+    parser.add_argument("--notes-per-session", type=int, default=1)
+    parser.add_argument("--uploads-per-session", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    recorder, elapsed = asyncio.run(
+        run_load(
+            base_url=args.base_url,
+            users=args.users,
+            arrival_rate=args.arrival_rate,
+            duration=args.duration,
+            seed=args.seed,
+            config=Config(
+                think_time=args.think_time,
+                stages_per_session=args.stages_per_session,
+                checks_per_stage=args.checks_per_stage,
+                notes_per_session=args.notes_per_session,
+                uploads_per_session=args.uploads_per_session,
+            ),
+        )
+    )
+    result = report(recorder, elapsed)
+    print(
+        f"{result['requests']} requests in {result['elapsed_s']}s: "
+        f"{result['throughput_rps']} req/s, error rate {result['error_rate']:.2%},"
+        f" {result['sessions']} sessions ({result['dropped_sessions']} dropped)"
+    )
+    for name, route in result["routes"].items():
+        print(
+            f"{name:<55} {route['rps']:>7.1f}/s  p50 {route['p50_ms']:>8.2f}ms"
+            f"  p95 {route['p95_ms']:>8.2f}ms  p99 {route['p99_ms']:>8.2f}ms"
+            f"  errors {route['error_rate']:.2%}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
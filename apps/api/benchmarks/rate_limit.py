@@ -0,0 +1,117 @@
+"""Overhead of the rate limiter on POST /projects/{id}/media/upload.
+
+Run from apps/api (no database needed):
+
+    python -m benchmarks.rate_limit --requests 5000
+
+Reports the cost of one bucket take per store, then the route's latency
+with and without its `rate_limit` dependency. The endpoint itself is
+replaced by a no-op, so the difference is the limiter alone (two takes,
+user and IP, plus resolving the dependency). The route numbers include
+TestClient's own overhead and vary by a few hundred µs between runs; the
+limiter's share is the per-take cost above, times two.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from typing import Any
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.infrastructure.rate_limit import (
+    BucketStore,
+    Limit,
+    MemoryBucketStore,
+    RateLimiter,
+    SqliteBucketStore,
+)
+from app.web.dependencies import get_current_user_id, get_rate_limiter
+from app.web.rate_limit import rate_limit
+
+_PATH = "/projects/{project_id}/media/upload"
+
+
+def _stores(directory: str) -> dict[str, BucketStore]:
+    return {
+        "memory": MemoryBucketStore(),
+        "sqlite": SqliteBucketStore(os.path.join(directory, "buckets.sqlite3")),
+    }
+
+
+def bench_take(store: BucketStore, n: int, users: int) -> float:
+    limiter = RateLimiter(store)
+    limit = Limit.parse("1000000/m")
+    started = time.perf_counter()
+    for i in range(n):
+        limiter.hit(f"media_upload:user:u{i % users}", limit)
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def _app(limited: bool) -> FastAPI:
+    app = FastAPI()
+    dependencies: list[Any] = []
+    if limited:
+        dependencies.append(
+            Depends(rate_limit("bench_upload", user="1000000/m", ip="1000000/m"))
+        )
+
+    @app.post(_PATH, status_code=201, dependencies=dependencies)
+    def create_media_upload(
+        project_id: str, user_id: str = Depends(get_current_user_id)
+    ) -> dict[str, str]:
+        return {"upload_url": "DEV_LOCAL://x", "storage_path": "x"}
+
+    return app
+
+
+def bench_route(store: str, n: int, users: int) -> list[float]:
+    get_rate_limiter.cache_clear()
+    samples = []
+    # One event loop for all requests, as in a server worker.
+    with TestClient(_app(store != "none")) as client:
+        for i in range(n):
+            headers = {"Authorization": f"Bearer u{i % users}"}
+            started = time.perf_counter()
+            response = client.post(_PATH.format(project_id="p1"), headers=headers)
+            samples.append((time.perf_counter() - started) * 1e6)
+            assert response.status_code == 201, response.text
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        stores = _stores(directory)
+        print("one bucket take")
+        for name, store in stores.items():
+            per_take = bench_take(store, args.requests * 4, args.users)
+            print(f"  {name:<8} {per_take:8.1f} µs")
+
+        print(f"\nPOST {_PATH} ({args.requests} requests, µs)")
+        baseline: float | None = None
+        for name in ("none", *stores):
+            if name == "sqlite":
+                os.environ["RATE_LIMIT_DB"] = os.path.join(directory, "route.sqlite3")
+            else:
+                os.environ.pop("RATE_LIMIT_DB", None)
+            bench_route(name, 200, args.users)  # warm up
+            samples = bench_route(name, args.requests, args.users)
+            p50 = statistics.median(samples)
+            p99 = statistics.quantiles(samples, n=100)[98]
+            added = "" if baseline is None else f"  ({p50 - baseline:+.0f} µs p50)"
+            baseline = p50 if baseline is None else baseline
+            print(f"  {name:<8} p50 {p50:8.0f}  p99 {p99:8.0f}{added}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""CPU cost of rendering the stage view and admin catalog responses.
+
+Run from apps/api (no database needed):
+
+    python -m benchmarks.serialization --checks 40 --media 30 --stages 15
+
+Compares the previous path (build the Pydantic *Out models, let FastAPI
+validate them against response_model, encode and json.dumps) with the
+current one (plain data from the domain dataclasses rendered by
+FastJSONResponse). Times are process CPU time per response.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.application.ports.repositories import ProjectStageView
+from app.application.use_cases.admin_stages import AdminStageWithChecks
+from app.domain.entities import CheckItem, CheckResult, Media, Project, Stage
+from app.web.admin import (
+    AdminCheckItemBody,
+    AdminStageOut,
+    CatalogDocumentOut,
+    _stage_body,
+)
+from app.web.responses import FastJSONResponse
+from app.web.stages import (
+    CheckItemOut,
+    MediaOut,
+    ProjectStageViewOut,
+    StageOut,
+    stage_view_body,
+)
+
+_NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _id() -> str:
+    return str(uuid.uuid4())
+
+
+def _stage(order: int) -> Stage:
+    return Stage(
+        id=_id(),
+        slug=f"stage-{order}",
+        title=f"שלב {order}",
+        short_explanation="הסבר קצר על השלב " * 4,
+        common_mistakes="טעויות נפוצות בשלב זה " * 6,
+        must_document="יש לתעד " * 5,
+        order_index=order,
+    )
+
+
+def _checks(stage: Stage, count: int) -> list[CheckItem]:
+    return [
+        CheckItem(
+            id=_id(),
+            stage_id=stage.id,
+            title=f"בדיקה {i}",
+            description="תיאור הבדיקה " * 5 if i % 3 else None,
+            order_index=i,
+        )
+        for i in range(count)
+    ]
+
+
+def build_stage_view(checks: int, media: int) -> ProjectStageView:
+    project = Project(
+        id=_id(),
+        owner_user_id=_id(),
+        name="בית בחריש",
+        location_text="חריש",
+        created_at=_NOW,
+    )
+    stage = _stage(3)
+    items = _checks(stage, checks)
+    return ProjectStageView(
+        project=project,
+        stage=stage,
+        check_items=items,
+        status=None,
+        check_results=[
+            CheckResult(
+                id=_id(),
+                project_id=project.id,
+                check_item_id=c.id,
+                is_done=True,
+                note="הערה" if i % 2 else None,
+                updated_at=_NOW,
+            )
+            for i, c in enumerate(items[: checks // 2])
+        ],
+        notes=[],
+        media=[
+            Media(
+                id=_id(),
+                project_id=project.id,
+                stage_id=stage.id,
+                storage_path=f"projects/{project.id}/{_id()}.jpg",
+                caption="צילום" if i % 2 else None,
+                taken_at=None,
+                created_at=_NOW,
+            )
+            for i in range(media)
+        ],
+    )
+
+
+def build_catalog(stages: int, checks: int) -> list[AdminStageWithChecks]:
+    catalog = []
+    for order in range(stages):
+        stage = _stage(order)
+        items = _checks(stage, checks)
+        catalog.append(AdminStageWithChecks(stage=stage, checks=items))
+    return catalog
+
+
+def _pydantic_stage_view(v: ProjectStageView) -> ProjectStageViewOut:
+    results = {r.check_item_id: r for r in v.check_results}
+    return ProjectStageViewOut(
+        project_id=v.project.id,
+        stage=StageOut(**vars(v.stage)),
+        check_items=[
+            CheckItemOut(
+                id=c.id,
+                title=c.title,
+                description=c.description,
+                order_index=c.order_index,
+                is_done=results[c.id].is_done if c.id in results else False,
+                note=results[c.id].note if c.id in results else None,
+            )
+            for c in v.check_items
+        ],
+        media=[
+            MediaOut(id=m.id, url=m.storage_path, caption=m.caption) for m in v.media
+        ],
+    )
+
+
+def _pydantic_catalog(catalog: list[AdminStageWithChecks]) -> CatalogDocumentOut:
+    return CatalogDocumentOut(
+        stages=[
+            AdminStageOut(
+                **vars(sc.stage),
+                checks=[AdminCheckItemBody(**vars(c)) for c in sc.checks],
+            )
+            for sc in catalog
+        ]
+    )
+
+
+def _previous_path(build: Callable[[], Any], model: type) -> Callable[[], Any]:
+    # What FastAPI does with a returned model: validate it against
+    # response_model, dump it to JSON-able data, then json.dumps.
+    adapter: TypeAdapter[Any] = TypeAdapter(model)
+
+    def render() -> Any:
+        value = adapter.validate_python(build(), from_attributes=True)
+        return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+    return render
+
+
+def _cpu_us(render: Callable[[], Any], iterations: int) -> float:
+    for _ in range(min(50, iterations)):
+        render()
+    started = time.process_time()
+    for _ in range(iterations):
+        render()
+    return (time.process_time() - started) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checks", type=int, default=40)
+    parser.add_argument("--media", type=int, default=30)
+    parser.add_argument("--stages", type=int, default=15)
+    parser.add_argument("--checks-per-stage", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    # Media URLs then stay plain storage paths on both paths.
+    for name in ("MEDIA_S3_BUCKET", "S3_BUCKET_NAME"):
+        os.environ.pop(name, None)
+
+    view = build_stage_view(args.checks, args.media)
+    catalog = build_catalog(args.stages, args.checks_per_stage)
+    cases = {
+        "stage_view": (
+            _previous_path(lambda: _pydantic_stage_view(view), ProjectStageViewOut),
+            lambda: FastJSONResponse(stage_view_body(view)).body,
+        ),
+        "admin_catalog": (
+            _previous_path(lambda: _pydantic_catalog(catalog), CatalogDocumentOut),
+            lambda: FastJSONResponse(
+                {"stages": [_stage_body(sc) for sc in catalog]}
+            ).body,
+        ),
+    }
+
+    report: dict[str, Any] = {}
+    for name, (previous, current) in cases.items():
+        if json.loads(bytes(previous())) != json.loads(bytes(current())):
+            raise SystemExit(f"{name}: fast path output differs from response_model")
+        before = _cpu_us(previous, args.iterations)
+        after = _cpu_us(current, args.iterations)
+        report[name] = {
+            "bytes": len(current()),
+            "pydantic_cpu_us": round(before, 1),
+            "fast_cpu_us": round(after, 1),
+            "saved_cpu_us": round(before - after, 1),
+            "speedup": round(before / after, 2) if after else None,
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Cold start: import time of app.main and time to first successful request.
+
+Run from apps/api:
+
+    python -m benchmarks.startup --runs 10
+    DATABASE_URL=... python -m benchmarks.startup --server gunicorn \\
+        --path /stages --output startup.json
+
+Each run boots a fresh server process (uvicorn, or gunicorn with
+gunicorn.conf.py and one worker) on a free port and polls `--path` until it
+answers 200; the reported time runs from process spawn to that response,
+which is what a new ECS task adds to scale-out. Import time comes from
+`python -X importtime`, with the modules that cost the most listed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import time
+from typing import Any
+
+import httpx
+
+from benchmarks.stats import summarize_ms
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _server_command(server: str, port: int) -> list[str]:
+    if server == "gunicorn":
+        return [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "app.main:app",
+            "-k",
+            "uvicorn.workers.UvicornWorker",
+            "--workers",
+            "1",
+            "--bind",
+            f"127.0.0.1:{port}",
+        ]
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+    ]
+
+
+def time_to_first_request(server: str, path: str, timeout: float) -> float:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        _server_command(server, port),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"{server} exited with {process.returncode}")
+                try:
+                    if client.get(url).status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+        raise TimeoutError(f"no 200 from {url} within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def import_profile(module: str, top: int) -> dict[str, Any]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    self_us: dict[str, int] = {}
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        self_us[name.strip()] = int(own)
+        if name.strip() == module:
+            cumulative_us = int(cumulative)
+    heaviest = sorted(self_us.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "module": module,
+        "cumulative_ms": round(cumulative_us / 1000, 1),
+        "modules_loaded": len(self_us),
+        "heaviest_self_ms": {
+            name: round(us / 1000, 1) for name, us in heaviest[:top]
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", choices=("uvicorn", "gunicorn"), default="uvicorn")
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    samples = [
+        time_to_first_request(args.server, args.path, args.timeout)
+        for _ in range(args.runs)
+    ]
+    report = {
+        "server": args.server,
+        "path": args.path,
+        "time_to_first_request": summarize_ms(samples),
+        "import": import_profile("app.main", args.top),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Gunicorn settings; picked up automatically from the working directory.
+
+The app is preloaded in the master and shared state is built there before
+workers fork (see app/web/lifecycle.py). The worker count comes from the
+CPUs and memory the container may use, unless WEB_CONCURRENCY is set.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import shutil
+from typing import Any
+
+from prometheus_client import multiprocess
+
+
+def _reset_multiproc_dir() -> None:
+    # Runs as the config loads, before the preloaded app opens its metric
+    # files there. Samples from a previous run would be aggregated into
+    # /metrics otherwise. Only once: SIGHUP re-reads this file while the
+    # old workers are still writing.
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if path and os.environ.get("_PROMETHEUS_MULTIPROC_DIR_RESET") != path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+        os.environ["_PROMETHEUS_MULTIPROC_DIR_RESET"] = path
+
+
+_reset_multiproc_dir()
+
+
+def _cpu_limit() -> int:
+    cpus = len(os.sched_getaffinity(0))
+    # cgroup v2 CPU quota, as set by ECS task/container cpu units.
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as fh:
+            quota, period = fh.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def _memory_limit() -> int | None:
+    for path in (
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ):
+        try:
+            with open(path) as fh:
+                value = fh.read().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports "no limit" as a huge number.
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError):
+        return None
+
+
+def default_workers() -> int:
+    # Two per CPU: sync endpoints wait on Postgres in the threadpool, so one
+    # worker rarely keeps a core busy. Capped so workers (WORKER_MEMORY_MB
+    # each) plus the master fit in the memory limit, but never below two so
+    # one slow request or worker restart does not stall the whole task.
+    workers = 2 * _cpu_limit()
+    memory = _memory_limit()
+    if memory is not None:
+        per_worker = int(os.getenv("WORKER_MEMORY_MB", "256")) * 2**20
+        workers = min(workers, memory // per_worker - 1)
+    return max(2, workers)
+
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", "0")) or default_workers()
+preload_app = True
+timeout = 60
+
+
+def when_ready(server: Any) -> None:
+    # Runs in the master once listening, before the first worker forks.
+    from app.web.lifecycle import preload_shared_state
+
+    preload_shared_state()
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    from app.web.lifecycle import after_fork
+
+    after_fork()
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    # Drops the dead worker's live gauges (in-flight, pool, threadpool).
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
@@ -2,6 +2,9 @@ import { useAuth } from "@src/store/useAuth";
 
 const DEFAULT_BASE_URL = "http://localhost:8000";
 
+// Echoed so that reads right after a write see it (API read replica).
+let lastWrite: string | null = null;
+
 export function getBaseUrl(): string {
   return DEFAULT_BASE_URL;
 }
@@ -26,11 +29,15 @@ async function request<T>(
   if (state.token) {
     headers["Authorization"] = `Bearer ${state.token}`;
   }
+  if (lastWrite) {
+    headers["X-Last-Write"] = lastWrite;
+  }
 
   const res = await fetch(`${baseUrl}${path}`, {
     ...options,
     headers
   });
+  lastWrite = res.headers.get("X-Last-Write") ?? lastWrite;
 
   if (!res.ok) {
     const text = await res.text();
@@ -75,7 +75,7 @@ resource "aws_lb_target_group" "api" {
   vpc_id      = var.vpc_id
 
   health_check {
-    path                = "/health"
+    path                = "/readyz"
     healthy_threshold   = 2
     unhealthy_threshold = 2
     timeout             = 5